@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Gateway benchmark - Open-loop load tests of the MCP gateway against local stub servers
+
+Starts one stub MCP server per scenario and the gateway from
+docker/mcp-gateway/app.py on localhost, all inside this process, then drives
+the gateway at a fixed arrival rate and reports throughput and latency
+percentiles per scenario. Requests are scheduled independently of
+completions, and latency is measured from the scheduled send time, so a
+slow gateway shows up as latency instead of as a lower request rate.
+
+    python benchmarks/gateway_benchmark.py --rate 200 --duration 10 --output results.json
+
+Needs the gateway requirements (docker/mcp-gateway/requirements.txt).
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import socket
+import logging
+import asyncio
+import argparse
+import platform
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+
+GATEWAY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "docker", "mcp-gateway")
+
+@dataclass
+class StubConfig:
+    """Behaviour of a stub MCP server"""
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    payload_bytes: int = 256
+
+@dataclass
+class Scenario:
+    name: str
+    stub: StubConfig
+    method: str = "GET"
+    path: str = "tools/read"
+
+SCENARIOS = {
+    "small-json": Scenario("small-json", StubConfig(payload_bytes=256)),
+    "large-payload": Scenario("large-payload", StubConfig(payload_bytes=1024 * 1024)),
+    "slow-upstream": Scenario("slow-upstream", StubConfig(latency_ms=200, payload_bytes=1024)),
+    "failing-upstream": Scenario("failing-upstream", StubConfig(error_rate=0.5, payload_bytes=256)),
+    "post-json": Scenario("post-json", StubConfig(payload_bytes=256), method="POST"),
+}
+
+class StubServer:
+    """Minimal ASGI MCP server with configurable latency, error rate and payload size"""
+
+    def __init__(self, name: str, config: StubConfig, seed: int = 0):
+        self.name = name
+        self.config = config
+        self.random = random.Random(seed)
+        filler = "x" * max(0, config.payload_bytes - 64)
+        self.payload = json.dumps({"server": name, "data": filler}).encode()
+
+    async def __call__(self, scope, receive, send):
+        more_body = True
+        while more_body:
+            message = await receive()
+            more_body = message.get("more_body", False)
+
+        if scope["path"] == "/health":
+            status, body = 200, b'{"status": "ok"}'
+        elif scope["path"] == "/capabilities":
+            status, body = 200, b'{"capabilities": ["read"]}'
+        else:
+            if self.config.latency_ms:
+                await asyncio.sleep(self.config.latency_ms / 1000)
+            if self.random.random() < self.config.error_rate:
+                status, body = 500, b'{"error": "injected failure"}'
+            else:
+                status, body = 200, self.payload
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+@dataclass
+class ScenarioResult:
+    scenario: str
+    rate: float
+    duration_s: float
+    sent: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    errors: Dict[str, int] = field(default_factory=dict)
+    requests_per_second: float = 0.0
+    latency_ms: Dict[str, float] = field(default_factory=dict)
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def serve(app: Any, port: int, lifespan: str = "auto") -> Tuple[uvicorn.Server, asyncio.Task]:
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, lifespan=lifespan, log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    return server, task
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, rate: float,
+                       duration: float, warmup: float, poisson: bool, seed: int) -> ScenarioResult:
+    """Send requests at ``rate`` per second for ``duration`` seconds, after a warmup"""
+    url = f"/mcp/{scenario.name}/{scenario.path}"
+    body = {"content": b'{"arguments": {}}'} if scenario.method == "POST" else {}
+    arrivals = random.Random(seed)
+    loop = asyncio.get_running_loop()
+    result = ScenarioResult(scenario=scenario.name, rate=rate, duration_s=duration)
+    latencies: List[float] = []
+
+    async def one(scheduled: float, measured: bool):
+        try:
+            response = await client.request(scenario.method, url, **body)
+            await response.aread()
+            outcome = "ok" if response.status_code < 400 else f"http_{response.status_code}"
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        if not measured:
+            return
+        result.sent += 1
+        latencies.append((loop.time() - scheduled) * 1000)
+        if outcome == "ok":
+            result.succeeded += 1
+        else:
+            result.failed += 1
+            result.errors[outcome] = result.errors.get(outcome, 0) + 1
+
+    tasks = []
+    start = loop.time()
+    measure_from = start + warmup
+    end = measure_from + duration
+    scheduled = start
+    while scheduled < end:
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(scheduled, scheduled >= measure_from)))
+        scheduled += arrivals.expovariate(rate) if poisson else 1 / rate
+    await asyncio.gather(*tasks)
+
+    elapsed = loop.time() - measure_from
+    latencies.sort()
+    result.requests_per_second = round(result.sent / elapsed, 2) if elapsed > 0 else 0.0
+    result.latency_ms = {
+        "p50": round(percentile(latencies, 0.50), 3),
+        "p95": round(percentile(latencies, 0.95), 3),
+        "p99": round(percentile(latencies, 0.99), 3),
+        "max": round(latencies[-1], 3) if latencies else 0.0,
+    }
+    return result
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    scenarios = [SCENARIOS[name] for name in args.scenario]
+    stubs = []
+    entries = []
+    for index, scenario in enumerate(scenarios):
+        port = free_port()
+        stubs.append(await serve(StubServer(scenario.name, scenario.stub, seed=args.seed + index), port, lifespan="off"))
+        entries.append(f"{scenario.name}:http://127.0.0.1:{port}")
+
+    # The gateway reads its configuration when app.py is imported
+    os.environ["MCP_SERVERS"] = ",".join(entries)
+    os.environ.pop("MCP_SERVERS_FILE", None)
+    os.environ["GATEWAY_PROXY_MODE"] = args.proxy_mode
+    os.environ.setdefault("GATEWAY_STATE_BACKEND", "local")
+    sys.path.insert(0, GATEWAY_DIR)
+    logging.disable(logging.WARNING)
+    import app as gateway_app
+
+    gateway_port = free_port()
+    gateway = await serve(gateway_app.app, gateway_port)
+
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    results = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{gateway_port}", limits=limits,
+                                 timeout=args.timeout) as client:
+        for index, scenario in enumerate(scenarios):
+            result = await run_scenario(client, scenario, args.rate, args.duration, args.warmup,
+                                        args.poisson, args.seed + index)
+            results.append(result)
+            print(
+                f"{result.scenario:<18} {result.requests_per_second:>9.1f} req/s  "
+                f"p50 {result.latency_ms['p50']:>8.2f} ms  p95 {result.latency_ms['p95']:>8.2f} ms  "
+                f"p99 {result.latency_ms['p99']:>8.2f} ms  failed {result.failed}/{result.sent}",
+                flush=True,
+            )
+
+    for server, task in [gateway, *stubs]:
+        server.should_exit = True
+        await task
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "rate": args.rate,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "arrivals": "poisson" if args.poisson else "uniform",
+            "connections": args.connections,
+            "proxy_mode": args.proxy_mode,
+            "seed": args.seed,
+            "scenarios": {scenario.name: asdict(scenario) for scenario in scenarios},
+        },
+        "results": [asdict(result) for result in results],
+    }
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run, repeatable (default: all)")
+    parser.add_argument("--rate", type=float, default=100.0, help="Requests per second (default: 100)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per scenario (default: 10)")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each scenario (default: 2)")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals instead of evenly spaced ones")
+    parser.add_argument("--connections", type=int, default=256, help="Client connection limit (default: 256)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout in seconds (default: 30)")
+    parser.add_argument("--proxy-mode", choices=["stream", "buffered"], default="stream",
+                        help="GATEWAY_PROXY_MODE for the gateway under test (default: stream)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for arrivals and injected failures")
+    parser.add_argument("--output", default="benchmark-results.json", help="Where to write the JSON results")
+    args = parser.parse_args(argv)
+    args.scenario = args.scenario or list(SCENARIOS)
+    return args
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Access log - Sampled JSON access logs, written off the event loop through a queue
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import random
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional
+
+ACCESS_LOGGER = "mcp_gateway.access"
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Upstream details of the request being served, filled in by the gateway
+_current: ContextVar[Optional[Dict[str, Any]]] = ContextVar("access_log_entry", default=None)
+
+def record_upstream(server: str, replica: str, upstream_ms: float, attempts: int):
+    """Add one upstream call to the current access log entry
+
+    Requests making several calls (batches) are logged with every server
+    and replica called, the slowest call's latency and the attempts of all
+    calls together.
+    """
+    entry = _current.get()
+    if entry is None:
+        return
+    entry["upstream_calls"] = entry.get("upstream_calls", 0) + 1
+    for key, value in (("servers", server), ("replicas", replica)):
+        values = entry.setdefault(key, [])
+        if value not in values:
+            values.append(value)
+    entry["upstream_ms"] = max(entry.get("upstream_ms", 0.0), upstream_ms)
+    entry["attempts"] = entry.get("attempts", 0) + attempts
+
+class DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def setup_logging() -> DroppingQueueHandler:
+    """Route all logging through a bounded queue drained by a background thread
+
+    Records are only formatted and queued on the event loop, the listener
+    thread does the writing. Access log records are written as bare JSON
+    lines, everything else in the usual text format.
+    """
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.getenv("GATEWAY_LOG_QUEUE_SIZE", 10000)))
+    queue_handler = DroppingQueueHandler(log_queue)
+    # Only merge the message arguments here, the listener's handlers format
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    text_handler = logging.StreamHandler()
+    text_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    text_handler.addFilter(lambda record: record.name != ACCESS_LOGGER)
+    access_handler = logging.StreamHandler()
+    access_handler.setFormatter(logging.Formatter("%(message)s"))
+    access_handler.addFilter(lambda record: record.name == ACCESS_LOGGER)
+
+    listener = QueueListener(log_queue, text_handler, access_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    logging.basicConfig(level=os.getenv("GATEWAY_LOG_LEVEL", "INFO").upper(), handlers=[queue_handler])
+    return queue_handler
+
+@dataclass
+class AccessLogSettings:
+    # Share of successful requests logged, errors and slow requests always are
+    sample_rate: float = 1.0
+    slow_ms: float = 1000.0
+
+    @classmethod
+    def from_env(cls) -> Optional["AccessLogSettings"]:
+        """Build settings from GATEWAY_ACCESS_LOG_* variables, None when disabled"""
+        if os.getenv("GATEWAY_ACCESS_LOG", "true").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(
+            sample_rate=float(os.getenv("GATEWAY_ACCESS_LOG_SAMPLE_RATE", 1.0)),
+            slow_ms=float(os.getenv("GATEWAY_ACCESS_LOG_SLOW_MS", 1000.0)),
+        )
+
+    def reason(self, status_code: int, duration_ms: float) -> Optional[str]:
+        """Why a request gets logged, None when it is sampled out"""
+        if status_code >= 400:
+            return "error"
+        if duration_ms >= self.slow_ms:
+            return "slow"
+        if random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+class AccessLogMiddleware:
+    """ASGI middleware writing one JSON access log line per sampled request
+
+    Bytes are counted as received and sent on the wire, i.e. after
+    compression.
+    """
+
+    def __init__(self, app, get_gateway: Callable[[], Any], settings: AccessLogSettings):
+        self.app = app
+        self.get_gateway = get_gateway
+        self.settings = settings
+        self.logger = logging.getLogger(ACCESS_LOGGER)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        entry: Dict[str, Any] = {}
+        token = _current.set(entry)
+        status_code = 500
+        bytes_in = 0
+        bytes_out = 0
+
+        async def receive_logged():
+            nonlocal bytes_in
+            message = await receive()
+            if message["type"] == "http.request":
+                bytes_in += len(message.get("body", b""))
+            return message
+
+        async def send_logged(message):
+            nonlocal status_code, bytes_out
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                bytes_out += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_logged, send_logged)
+        finally:
+            _current.reset(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+            reason = self.settings.reason(status_code, duration_ms)
+            if reason is not None:
+                self._log(scope, status_code, duration_ms, bytes_in, bytes_out, reason, entry)
+
+    def _log(self, scope, status_code: int, duration_ms: float, bytes_in: int, bytes_out: int,
+             reason: str, entry: Dict[str, Any]):
+        path = scope["path"]
+        servers = entry.get("servers", [])
+        replicas = entry.get("replicas", [])
+        # A single server for requests that reached one, None for fan-outs
+        server = servers[0] if len(servers) == 1 else None
+        if not servers and path.startswith("/mcp/"):
+            name = path.split("/", 3)[2]
+            server = name if name in self.get_gateway().servers else None
+        client = scope.get("client")
+
+        self.logger.info(json.dumps({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()) + "Z",
+            "method": scope["method"],
+            "path": path,
+            "server": server,
+            "servers": servers,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 3),
+            "upstream_calls": entry.get("upstream_calls", 0),
+            "upstream_ms": entry.get("upstream_ms"),
+            "replica": replicas[0] if len(replicas) == 1 else None,
+            "attempts": entry.get("attempts"),
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "client": client[0] if client else None,
+            "logged": reason,
+        }))
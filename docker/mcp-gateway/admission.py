@@ -0,0 +1,81 @@
+"""
+Admission control - Per-server concurrency limits with a bounded wait queue
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Deque
+
+logger = logging.getLogger(__name__)
+
+class RequestShed(Exception):
+    """Raised when a request is rejected instead of queued or served"""
+
+    def __init__(self, server: str, reason: str):
+        super().__init__(f"MCP server '{server}' is overloaded ({reason.replace('_', ' ')})")
+        self.server = server
+        self.reason = reason
+
+class AdmissionController:
+    """Caps in-flight upstream requests for one server
+
+    Requests over ``max_in_flight`` wait in a FIFO queue of at most
+    ``max_queue`` entries for up to ``queue_timeout`` seconds. Anything that
+    doesn't fit or waits too long raises ``RequestShed`` right away, so
+    latency and memory stay bounded under bursts. ``max_in_flight`` of 0
+    disables the limit.
+    """
+
+    def __init__(self, name: str, max_in_flight: int = 0, max_queue: int = 100, queue_timeout: float = 5.0):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self.waiters)
+
+    async def acquire(self):
+        """Take an in-flight slot, waiting in the queue if needed"""
+        if not self.max_in_flight or (self.in_flight < self.max_in_flight and not self.waiters):
+            self.in_flight += 1
+            return
+
+        if len(self.waiters) >= self.max_queue:
+            raise RequestShed(self.name, "queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await asyncio.wait([waiter], timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+        if not waiter.done():
+            self._abandon(waiter)
+            raise RequestShed(self.name, "queue_timeout")
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done() and not waiter.cancelled():
+            # A slot was handed over just as we gave up, pass it on
+            self.release()
+            return
+        waiter.cancel()
+        try:
+            self.waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self):
+        """Give an in-flight slot to the next waiter, or free it"""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
@@ -4,106 +4,824 @@ MCP Gateway - Central routing and management for MCP servers
 """
 
 import os
+import time
+import random
+import json
+import itertools
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Collection, Dict, List, Any, Optional, Sequence, Set
 from contextlib import asynccontextmanager
+from urllib.parse import urlencode
 
 import httpx
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 import uvicorn
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from access_log import AccessLogMiddleware, AccessLogSettings, record_upstream, setup_logging
+from admission import AdmissionController, RequestShed
+from batch import BatchRequest, BatchRunner
+from breaker import OPEN, CircuitBreaker
+from cache import CREDENTIAL_HEADERS, CacheEntry, ResponseCache, parse_cache_control
+from capability_index import CapabilityIndex
+from compression import CompressionMiddleware, CompressionSettings
+from deadline import DEADLINE_HEADER, DeadlineMiddleware, remaining
+from mcp_session import SESSION_HEADER, SessionManager, rpc_error
+from metrics import GatewayMetrics, MetricsMiddleware, RequestMeasurement, monitor_event_loop_lag, set_request_server
+from retry import RETRY_STATUSES, RetryPolicy
+from registry import (
+    MCPServerInfo,
+    PoolSettings,
+    RegistryWatcher,
+    ReplicaInfo,
+    load_registry_file,
+    parse_servers_env,
+    server_config,
 )
+from scheduler import HealthScheduler, health_fingerprint
+from shared_state import StateCoordinator
+from singleflight import SingleFlight
+from snapshot import RegistrySnapshot
+from tracing import SPAN_KIND_CLIENT, Span, Tracer, TracingMiddleware, start_span
+
+# Configure logging, records are written by a background thread
+setup_logging()
 logger = logging.getLogger(__name__)
 
-class MCPServerInfo(BaseModel):
-    name: str
-    url: str
-    status: str = "unknown"
-    capabilities: List[str] = []
+# Proxy mode for /mcp/{server_name}/{path}: "stream" passes upstream bytes
+# straight through, "buffered" decodes the upstream body and re-encodes it
+PROXY_MODE = os.getenv("GATEWAY_PROXY_MODE", "stream").lower()
+
+# Seconds a removed or re-pooled server gets to finish in-flight requests
+DRAIN_TIMEOUT = float(os.getenv("GATEWAY_DRAIN_TIMEOUT", 30.0))
+
+# Status returned when admission control sheds a request
+SHED_STATUS = int(os.getenv("GATEWAY_SHED_STATUS", 503))
+
+# Upstream path POST /tools/{tool} is forwarded to on the chosen provider
+TOOL_PATH = os.getenv("GATEWAY_TOOL_PATH", "tools/{tool}")
+
+# Static part of the / response
+GATEWAY_INFO = {
+    "service": "MCP Gateway",
+    "version": "1.0.0",
+    "endpoints": {
+        "health": "/health",
+        "servers": "/servers",
+        "session": "/mcp/{server_name}",
+        "proxy": "/mcp/{server_name}/{path}",
+        "batch": "/mcp/batch",
+        "capabilities": "/capabilities",
+        "tools": "/tools/{tool}"
+    }
+}
+
+# Headers that only apply to a single connection and must not be forwarded
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+})
+
+def filter_headers(headers, *extra: str) -> Dict[str, str]:
+    """Drop hop-by-hop headers (and any extra names) from a header mapping"""
+    excluded = HOP_BY_HOP_HEADERS.union(extra)
+    return {k: v for k, v in headers.items() if k.lower() not in excluded}
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+def create_client(pool: PoolSettings) -> httpx.AsyncClient:
+    """Create a dedicated HTTP client for an upstream server"""
+    http2 = pool.http2
+    if http2 and not HTTP2_AVAILABLE:
+        logger.warning("HTTP/2 requested but the 'h2' package is not installed, using HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=pool.max_connections,
+            max_keepalive_connections=pool.max_keepalive_connections,
+            keepalive_expiry=pool.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(
+            pool.read_timeout,
+            connect=pool.connect_timeout,
+            pool=pool.pool_timeout,
+        ),
+    )
 
 class MCPGateway:
     def __init__(self):
         self.servers: Dict[str, MCPServerInfo] = {}
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # One client per upstream so a slow server can only exhaust its own pool
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        # Circuit breakers are kept per replica URL
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.admission: Dict[str, AdmissionController] = {}
+        self.retry = RetryPolicy.from_env()
+        # Capability name -> servers advertising it, kept in step with discovery
+        self.capability_index = CapabilityIndex()
+        # Small separate client for health checks and capability discovery
+        self.control_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+        # Opt-in response cache for idempotent routes, None when disabled
+        self.cache = ResponseCache.from_env()
+        # Opt-in coalescing of concurrent identical reads, None when disabled
+        self.single_flight = SingleFlight.from_env()
+        self.metrics = GatewayMetrics()
+        self.metrics.register_pool_collector(lambda: self)
+        self.metrics.register_admission_collector(lambda: self)
+        # Last health fingerprint seen per replica URL
+        self.health_fingerprints: Dict[str, Optional[str]] = {}
+        self.scheduler = HealthScheduler.from_env(self)
+        # Decides which worker runs the scheduler when several are started
+        self.coordinator = StateCoordinator.from_env(self)
+        # Span exporter, None unless GATEWAY_TRACING_EXPORTER is set
+        self.tracer = Tracer.from_env()
+        # MCP clients served at /mcp/{server_name} share one upstream session per server
+        self.sessions = SessionManager(self)
+        self._drain_tasks: Set[asyncio.Task] = set()
+        # Serialized view of the registry, rebuilt after health or discovery changes
+        self._snapshot: Optional[RegistrySnapshot] = None
         self._load_servers()
 
-    def _load_servers(self):
-        """Load MCP servers from environment configuration"""
+    def _read_registry(self) -> Dict[str, MCPServerInfo]:
+        """Read server definitions from MCP_SERVERS_FILE, falling back to MCP_SERVERS"""
+        registry_file = os.getenv("MCP_SERVERS_FILE", "")
+        if registry_file:
+            return load_registry_file(registry_file)
+
         servers_config = os.getenv("MCP_SERVERS", "")
         if not servers_config:
             logger.warning("No MCP_SERVERS configuration found")
+        return parse_servers_env(servers_config)
+
+    def _load_servers(self):
+        """Load MCP servers from the registry file or environment configuration"""
+        self.apply_registry(self._read_registry())
+
+    def _create_pool(self, server: MCPServerInfo):
+        self.clients[server.name] = create_client(server.pool)
+        self.admission[server.name] = AdmissionController(
+            server.name,
+            max_in_flight=server.pool.max_in_flight,
+            max_queue=server.pool.max_queue,
+            queue_timeout=server.pool.queue_timeout,
+        )
+
+    def _register(self, server: MCPServerInfo):
+        self.servers[server.name] = server
+        self._create_pool(server)
+        for replica in server.replicas:
+            self.breakers.setdefault(replica.url, CircuitBreaker.from_env(f"{server.name} ({replica.url})"))
+        logger.info(f"Registered MCP server: {server.name} -> {', '.join(r.url for r in server.replicas)}")
+
+    def _update(self, current: MCPServerInfo, server: MCPServerInfo):
+        """Apply a changed definition in place, keeping what didn't change"""
+        if current.pool != server.pool:
+            self._retire(current.name)
+            current.pool = server.pool
+            self._create_pool(current)
+
+        # Replicas that stay keep their health state and outstanding counts
+        existing = {replica.url: replica for replica in current.replicas}
+        replicas = []
+        for replica in server.replicas:
+            if replica.url in existing:
+                existing[replica.url].weight = replica.weight
+                replica = existing[replica.url]
+            else:
+                self.breakers.setdefault(replica.url, CircuitBreaker.from_env(f"{current.name} ({replica.url})"))
+            replicas.append(replica)
+
+        if [r.url for r in replicas] != [r.url for r in current.replicas]:
+            # Probe the new topology right away
+            self.scheduler.states.pop(current.name, None)
+        current.replicas = replicas
+        current.url = replicas[0].url
+        logger.info(f"Updated MCP server: {current.name} -> {', '.join(r.url for r in replicas)}")
+
+    def _retire(self, server_name: str):
+        """Close a server's pool in the background once in-flight requests finish"""
+        client = self.clients.pop(server_name)
+        admission = self.admission.pop(server_name)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Nothing can be in flight before the event loop runs
             return
 
-        for server_config in servers_config.split(","):
-            if ":" not in server_config:
-                continue
-            
-            name, url = server_config.split(":", 1)
-            self.servers[name] = MCPServerInfo(name=name, url=url)
-            logger.info(f"Registered MCP server: {name} -> {url}")
+        async def drain():
+            deadline = loop.time() + DRAIN_TIMEOUT
+            while (admission.in_flight or admission.queue_depth) and loop.time() < deadline:
+                await asyncio.sleep(0.1)
+            await client.aclose()
+            logger.info(f"Closed connection pool of {server_name}")
 
-    async def health_check_server(self, server: MCPServerInfo) -> bool:
-        """Check if an MCP server is healthy"""
+        task = loop.create_task(drain())
+        self._drain_tasks.add(task)
+        task.add_done_callback(self._drain_tasks.discard)
+
+    def apply_registry(self, servers: Dict[str, MCPServerInfo]) -> Dict[str, List[str]]:
+        """Make the registry match ``servers``, touching only what changed
+
+        Unchanged servers keep their connection pools, health state and
+        capabilities, removed servers stop receiving new requests at once and
+        have their pools drained in the background.
+        """
+        diff: Dict[str, List[str]] = {"added": [], "updated": [], "removed": [], "unchanged": []}
+        for name, server in servers.items():
+            current = self.servers.get(name)
+            if current is None:
+                self._register(server)
+                diff["added"].append(name)
+            elif server_config(current) == server_config(server):
+                diff["unchanged"].append(name)
+            else:
+                self._update(current, server)
+                diff["updated"].append(name)
+
+        for name in list(self.servers):
+            if name not in servers:
+                del self.servers[name]
+                self._retire(name)
+                self.capability_index.remove(name)
+                self.retry.budgets.pop(name, None)
+                diff["removed"].append(name)
+                logger.info(f"Removed MCP server: {name}")
+
+        in_use = {replica.url for server in self.servers.values() for replica in server.replicas}
+        for url in list(self.breakers):
+            if url not in in_use:
+                del self.breakers[url]
+                self.health_fingerprints.pop(url, None)
+        if diff["added"] or diff["updated"] or diff["removed"]:
+            self._snapshot = None
+        return diff
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        """The current registry snapshot, rebuilt if something changed since the last one"""
+        if self._snapshot is None:
+            self._snapshot = RegistrySnapshot(self.servers, GATEWAY_INFO)
+        return self._snapshot
+
+    def _set_status(self, target: Any, status: str):
+        """Set a server or replica status, invalidating the snapshot on change"""
+        if target.status != status:
+            target.status = status
+            self._snapshot = None
+
+    async def reload(self) -> Dict[str, List[str]]:
+        """Re-read the registry and apply it as a diff"""
+        return self.apply_registry(self._read_registry())
+
+    async def aclose(self):
+        """Close all upstream and control-plane clients"""
+        for task in self._drain_tasks:
+            task.cancel()
+        await self.sessions.aclose()
+        if self.tracer is not None:
+            await self.tracer.aclose()
+        await asyncio.gather(
+            self.control_client.aclose(),
+            *(client.aclose() for client in self.clients.values()),
+            return_exceptions=True
+        )
+
+    async def _health_check_replica(self, server: MCPServerInfo, replica: ReplicaInfo) -> bool:
+        start = time.perf_counter()
         try:
-            response = await self.client.get(f"{server.url}/health", timeout=5.0)
-            server.status = "healthy" if response.status_code == 200 else "unhealthy"
-            return response.status_code == 200
+            response = await self.control_client.get(f"{replica.url}/health", timeout=5.0)
+            healthy = response.status_code == 200
+            self.health_fingerprints[replica.url] = health_fingerprint(response) if healthy else None
         except Exception as e:
-            logger.warning(f"Health check failed for {server.name}: {e}")
-            server.status = "unhealthy"
-            return False
+            logger.warning(f"Health check failed for {server.name} ({replica.url}): {e}")
+            healthy = False
+        self.metrics.health_check_duration.labels(server.name).observe(time.perf_counter() - start)
 
-    async def discover_capabilities(self, server: MCPServerInfo):
-        """Discover capabilities of an MCP server"""
+        self._set_status(replica, "healthy" if healthy else "unhealthy")
+        if replica.url in self.breakers:
+            self.breakers[replica.url].record_health(healthy)
+        return healthy
+
+    async def health_check_server(self, server: MCPServerInfo) -> bool:
+        """Check if an MCP server is healthy, i.e. at least one replica is"""
+        results = await asyncio.gather(*(self._health_check_replica(server, r) for r in server.replicas))
+        healthy = any(results)
+        self._set_status(server, "healthy" if healthy else "unhealthy")
+        return healthy
+
+    async def discover_capabilities(self, server: MCPServerInfo) -> bool:
+        """Discover capabilities of an MCP server, returning whether it succeeded"""
+        healthy = [r for r in server.replicas if r.status == "healthy"]
+        url = healthy[0].url if healthy else server.url
         try:
-            response = await self.client.get(f"{server.url}/capabilities")
+            response = await self.control_client.get(f"{url}/capabilities")
             if response.status_code == 200:
                 data = response.json()
-                server.capabilities = data.get("capabilities", [])
+                self._set_capabilities(server, data.get("capabilities", []))
+                return True
         except Exception as e:
             logger.warning(f"Failed to discover capabilities for {server.name}: {e}")
+        return False
 
-    async def route_request(self, server_name: str, path: str, method: str, **kwargs) -> Dict[str, Any]:
-        """Route a request to a specific MCP server"""
+    def update_server_state(self, server: MCPServerInfo, status: str, capabilities: List[str],
+                            replica_status: Dict[str, str]):
+        """Apply health and discovery results published by the leader worker"""
+        self._set_status(server, status)
+        self._set_capabilities(server, capabilities)
+        for replica in server.replicas:
+            published = replica_status.get(replica.url)
+            if published is None or published == replica.status:
+                continue
+            self._set_status(replica, published)
+            if published in ("healthy", "unhealthy") and replica.url in self.breakers:
+                self.breakers[replica.url].record_health(published == "healthy")
+
+    def _set_capabilities(self, server: MCPServerInfo, capabilities: List[str]):
+        if server.capabilities != capabilities:
+            server.capabilities = capabilities
+            self._snapshot = None
+        if self.capability_index.update(server.name, capabilities):
+            logger.info(f"Capabilities of {server.name} changed, {len(capabilities)} advertised")
+
+    def provider_for(self, capability: str) -> MCPServerInfo:
+        """Pick the least loaded healthy server advertising a capability
+
+        Servers in an unknown state are used only when no provider is known
+        to be healthy, unhealthy ones never.
+        """
+        providers = [self.servers[name] for name in self.capability_index.providers_for(capability)
+                     if name in self.servers]
+        if not providers:
+            raise HTTPException(status_code=404, detail=f"No MCP server provides '{capability}'")
+
+        candidates = ([s for s in providers if s.status == "healthy"]
+                      or [s for s in providers if s.status != "unhealthy"])
+        if not candidates:
+            raise HTTPException(
+                status_code=503,
+                detail=f"No healthy MCP server provides '{capability}'",
+                headers={"Retry-After": "1"},
+            )
+        return min(candidates, key=lambda s: (sum(r.outstanding for r in s.replicas), random.random()))
+
+    def _get_server(self, server_name: str) -> MCPServerInfo:
+        """Look up a registered server or raise a 404"""
         if server_name not in self.servers:
             raise HTTPException(status_code=404, detail=f"MCP server '{server_name}' not found")
+        return self.servers[server_name]
+
+    def _acquire_replica(self, server: MCPServerInfo, tried: Collection[str] = ()) -> ReplicaInfo:
+        """Pick the replica with the fewest outstanding requests per unit of weight
 
-        server = self.servers[server_name]
-        url = f"{server.url}/{path.lstrip('/')}"
+        Replicas marked unhealthy by health checks are only used when no other
+        replica is left, and replicas whose circuit is open are skipped.
+        Replicas in ``tried`` come last. When nothing is available the request
+        fails fast with a 503. The returned replica must be handed back with
+        ``_release_replica``.
+        """
+        healthy = [r for r in server.replicas if r.status != "unhealthy"]
+        candidates = healthy or server.replicas
+        ranked = sorted(
+            candidates,
+            key=lambda r: (r.url in tried, (r.outstanding + 1) / r.weight, random.random()),
+        )
+
+        for replica in ranked:
+            if self.breakers[replica.url].allow_request():
+                replica.outstanding += 1
+                return replica
+
+        open_breakers = [self.breakers[r.url] for r in server.replicas if self.breakers[r.url].state == OPEN]
+        retry_after = min((b.retry_after() for b in open_breakers), default=1)
+        self.metrics.errors.labels(server.name, "circuit_open").inc()
+        raise HTTPException(
+            status_code=503,
+            detail=f"MCP server '{server.name}' is unavailable (circuit open)",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    @staticmethod
+    def _release_replica(replica: ReplicaInfo):
+        replica.outstanding -= 1
+
+    def _record_outcome(self, server_name: str, breaker: CircuitBreaker, status_code: int):
+        if status_code >= 500:
+            breaker.record_failure()
+            self.metrics.errors.labels(server_name, "status").inc()
+        else:
+            breaker.record_success()
+
+    def _record_request_error(self, server_name: str, breaker: CircuitBreaker, error: httpx.RequestError):
+        breaker.record_failure()
+        kind = "timeout" if isinstance(error, httpx.TimeoutException) else "connection"
+        self.metrics.errors.labels(server_name, kind).inc()
+
+    async def _admit(self, server_name: str) -> AdmissionController:
+        """Wait for an in-flight slot on the server or shed the request"""
+        admission = self.admission[server_name]
+        span = start_span("queue", **{"mcp.server": server_name})
+        budget = remaining()
+        shed_reason = None
+        try:
+            if budget is None:
+                await admission.acquire()
+            else:
+                await asyncio.wait_for(admission.acquire(), budget)
+        except RequestShed as e:
+            shed_reason = e.reason
+            self.metrics.shed.labels(server_name, e.reason).inc()
+            raise HTTPException(status_code=SHED_STATUS, detail=str(e), headers={"Retry-After": "1"})
+        except asyncio.TimeoutError:
+            shed_reason = "deadline"
+            self.metrics.shed.labels(server_name, "deadline").inc()
+            raise self._deadline_exceeded(server_name)
+        finally:
+            if span is not None:
+                span.end(error=shed_reason)
+        return admission
+
+    async def route_request(self, server_name: str, path: str, method: str, **kwargs) -> Dict[str, Any]:
+        """Route a request to a specific MCP server, returning its decoded body"""
+        response = await self._send(server_name, path, method, **kwargs)
+        try:
+            await response.aread()
+        except httpx.RequestError as e:
+            logger.error(f"Reading response from {server_name} failed: {e}")
+            raise HTTPException(status_code=502, detail=f"Upstream request failed: {str(e)}")
+        finally:
+            await self._close(response)
 
         try:
-            response = await self.client.request(method, url, **kwargs)
             response.raise_for_status()
-            
+
             if response.headers.get("content-type", "").startswith("application/json"):
                 return response.json()
             else:
                 return {"content": response.text, "content_type": response.headers.get("content-type")}
-                
+
         except httpx.HTTPStatusError as e:
             raise HTTPException(status_code=e.response.status_code, detail=str(e))
         except Exception as e:
             logger.error(f"Request to {server_name} failed: {e}")
             raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+    @staticmethod
+    def _deadline_exceeded(server_name: str) -> HTTPException:
+        return HTTPException(status_code=504, detail=f"Deadline exceeded waiting for MCP server '{server_name}'")
+
+    def _build_request(self, server: MCPServerInfo, replica: ReplicaInfo, path: str, method: str,
+                       kwargs: Dict[str, Any], span: Optional[Span] = None) -> httpx.Request:
+        """Build an upstream request carrying the caller's deadline and trace context"""
+        client = self.clients[server.name]
+        url = f"{replica.url}/{path.lstrip('/')}"
+        kwargs = dict(kwargs)
+        headers = dict(kwargs.get("headers") or {})
+
+        if span is not None:
+            headers["traceparent"] = span.traceparent
+            if span.tracestate:
+                headers["tracestate"] = span.tracestate
+            kwargs["extensions"] = {"trace": span.trace_hook()}
+
+        budget = remaining()
+        if budget is not None:
+            if budget <= 0:
+                raise self._deadline_exceeded(server.name)
+            headers[DEADLINE_HEADER] = f"{budget:.3f}"
+            kwargs["timeout"] = httpx.Timeout(
+                min(server.pool.read_timeout, budget),
+                connect=min(server.pool.connect_timeout, budget),
+                pool=min(server.pool.pool_timeout, budget),
+            )
+        return client.build_request(method, url, **{**kwargs, "headers": headers})
+
+    def _retry_delay(self, server_name: str, attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, None when no retry is allowed"""
+        if attempt >= self.retry.max_retries:
+            return None
+        delay = self.retry.backoff(attempt)
+        budget = remaining()
+        if budget is not None and delay >= budget:
+            return None
+        if not self.retry.budget(server_name).try_spend():
+            self.metrics.retries.labels(server_name, "budget_exhausted").inc()
+            return None
+        self.metrics.retries.labels(server_name, "retried").inc()
+        return delay
+
+    async def _attempt(self, server: MCPServerInfo, path: str, method: str,
+                       replica: Optional[ReplicaInfo], kwargs: Dict[str, Any]) -> httpx.Response:
+        """Send upstream, retrying idempotent calls on connection errors and 502/503/504
+
+        Retries prefer replicas not tried yet and stop when the attempts, the
+        server's retry budget or the caller's deadline run out.
+        """
+        client = self.clients[server.name]
+        self.retry.budget(server.name).record_request()
+        retryable = replica is None and self.retry.retryable(method, kwargs)
+        tried: Set[str] = set()
+
+        for attempt in itertools.count():
+            if replica is not None:
+                target = replica
+                target.outstanding += 1
+            else:
+                target = self._acquire_replica(server, tried)
+            tried.add(target.url)
+            breaker = self.breakers[target.url]
+            span = start_span(
+                f"upstream {method}", SPAN_KIND_CLIENT,
+                **{"mcp.server": server.name, "server.address": target.url, "mcp.attempt": attempt + 1},
+            )
+
+            try:
+                send = client.send(self._build_request(server, target, path, method, kwargs, span), stream=True)
+                sent_at = time.perf_counter()
+                budget = remaining()
+                # httpx timeouts apply per phase, this bounds the whole wait for
+                # headers. Bodies are bounded where the gateway buffers them, a
+                # body streamed through runs on the upstream's own deadline.
+                response = await (send if budget is None else asyncio.wait_for(send, budget))
+            except BaseException as e:
+                self._release_replica(target)
+                if span is not None:
+                    span.end_exchange(error=type(e).__name__)
+                if not isinstance(e, httpx.RequestError) and replica is None:
+                    # Abandoned without an outcome, give back the trial slot
+                    # _acquire_replica may have taken on a half-open circuit
+                    breaker.release()
+                if isinstance(e, asyncio.TimeoutError):
+                    # The caller gave up, which says nothing about the upstream's health
+                    raise self._deadline_exceeded(server.name)
+                if not isinstance(e, httpx.RequestError):
+                    raise
+                self._record_request_error(server.name, breaker, e)
+                delay = self._retry_delay(server.name, attempt) if retryable else None
+                if delay is not None:
+                    logger.info(f"Retrying {method} to {server.name} after {type(e).__name__}")
+                    await asyncio.sleep(delay)
+                    continue
+                if remaining() == 0:
+                    raise self._deadline_exceeded(server.name)
+                logger.error(f"Request to {server.name} failed: {e}")
+                raise HTTPException(status_code=502, detail=f"Upstream request failed: {str(e)}")
+
+            self._record_outcome(server.name, breaker, response.status_code)
+            if span is not None:
+                span.marks.setdefault("first_byte", time.time_ns())
+                span.attributes["http.response.status_code"] = response.status_code
+            upstream_ms = round((time.perf_counter() - sent_at) * 1000, 3)
+            if response.status_code in RETRY_STATUSES and retryable:
+                delay = self._retry_delay(server.name, attempt)
+                if delay is not None:
+                    await response.aclose()
+                    self._release_replica(target)
+                    if span is not None:
+                        span.end_exchange(error=f"HTTP {response.status_code}")
+                    logger.info(f"Retrying {method} to {server.name} after HTTP {response.status_code}")
+                    await asyncio.sleep(delay)
+                    continue
+
+            record_upstream(server=server.name, replica=target.url, upstream_ms=upstream_ms, attempts=attempt + 1)
+            response.extensions["mcp_replica"] = target
+            response.extensions["mcp_span"] = span
+            return response
+
+    async def _send(self, server_name: str, path: str, method: str,
+                    replica: Optional[ReplicaInfo] = None, **kwargs) -> httpx.Response:
+        """Send a request upstream and return the response with its body unread
+
+        The request goes to ``replica`` when given, otherwise to the least
+        loaded one, with retries for idempotent calls. The response must be
+        closed with ``_close`` so the replica it was sent to stops counting it
+        as outstanding and its admission slot is freed.
+        """
+        server = self._get_server(server_name)
+        admission = await self._admit(server_name)
+        try:
+            response = await self._attempt(server, path, method, replica, kwargs)
+        except BaseException:
+            admission.release()
+            raise
+        response.extensions["mcp_admission"] = admission
+        return response
+
+    async def _close(self, response: httpx.Response):
+        """Close an upstream response and release its replica, safe to call twice"""
+        await response.aclose()
+        replica = response.extensions.pop("mcp_replica", None)
+        if replica is not None:
+            self._release_replica(replica)
+        admission = response.extensions.pop("mcp_admission", None)
+        if admission is not None:
+            admission.release()
+        span = response.extensions.pop("mcp_span", None)
+        if span is not None:
+            span.end_exchange(error=f"HTTP {response.status_code}" if response.status_code >= 500 else None)
+
+    def _streaming_response(self, response: httpx.Response, body: Optional[AsyncIterator[bytes]] = None,
+                            head: Sequence[bytes] = (), headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+        """Stream an upstream response back, optionally after already-read chunks"""
+        raw = body if body is not None else response.aiter_raw()
+
+        async def content():
+            try:
+                for chunk in head:
+                    yield chunk
+                async for chunk in raw:
+                    yield chunk
+            finally:
+                await self._close(response)
+
+        return StreamingResponse(
+            content(),
+            status_code=response.status_code,
+            headers={**filter_headers(response.headers), **(headers or {})},
+            background=BackgroundTask(self._close, response),
+        )
+
+    async def _read_within_deadline(self, server_name: str, raw: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+        """Chunks of a body being buffered, raising a 504 once the caller's deadline passes"""
+        while True:
+            budget = remaining()
+            read = raw.__anext__()
+            try:
+                chunk = await (read if budget is None else asyncio.wait_for(read, budget))
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                raise self._deadline_exceeded(server_name)
+            yield chunk
+
+    async def stream_request(self, server_name: str, path: str, method: str, **kwargs) -> StreamingResponse:
+        """Route a request to a specific MCP server, streaming the response back
+
+        The upstream status, headers and raw body chunks are passed through
+        unchanged, so the body is never held in memory or re-encoded. The
+        upstream response is closed once the client has consumed it.
+        """
+        response = await self._send(server_name, path, method, **kwargs)
+        return self._streaming_response(response)
+
+    async def coalesced_request(self, server_name: str, path: str, method: str,
+                                params: Dict[str, str], headers: Dict[str, str]) -> Response:
+        """Share one upstream call between concurrent identical reads
+
+        The leader buffers the raw upstream body so every waiting client can
+        be answered with the same bytes. Bodies larger than the single-flight
+        limit are streamed to the leader instead, and its waiters make their
+        own upstream calls.
+        """
+        key = self.single_flight.key(server_name, method, path, params, headers)
+        max_bytes = self.single_flight.max_body_bytes
+        streamed: List[StreamingResponse] = []
+
+        async def fetch():
+            response = await self._send(server_name, path, method, params=params, headers=headers)
+            if int(response.headers.get("content-length") or 0) > max_bytes:
+                streamed.append(self._streaming_response(response))
+                return None
+
+            raw = response.aiter_raw()
+            chunks: List[bytes] = []
+            size = 0
+            try:
+                async for chunk in raw:
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size > max_bytes:
+                        streamed.append(self._streaming_response(response, body=raw, head=chunks))
+                        return None
+            except httpx.RequestError as e:
+                logger.error(f"Reading the response of {server_name} failed: {e}")
+                raise HTTPException(status_code=502, detail=f"Upstream request failed: {str(e)}")
+            finally:
+                if not streamed:
+                    await self._close(response)
+            return response.status_code, filter_headers(response.headers), b"".join(chunks)
+
+        result, shared = await self.single_flight.do(key, fetch)
+        if result is None:
+            if streamed:
+                return streamed[0]
+            # Too large to share, the leader kept its stream to itself
+            return await self.stream_request(server_name, path, method, params=params, headers=headers)
+        if shared:
+            self.metrics.coalesced.labels(server_name).inc()
+        status_code, response_headers, body = result
+        return Response(content=body, status_code=status_code, headers=response_headers)
+
+    def _cached_response(self, entry: CacheEntry, cache_status: str) -> Response:
+        headers = dict(entry.headers)
+        headers["age"] = str(int(time.monotonic() - entry.stored_at))
+        headers["x-cache"] = cache_status
+        return Response(content=entry.body, status_code=entry.status_code, headers=headers)
+
+    async def cached_request(self, server_name: str, path: str, params: Dict[str, str],
+                             headers: Dict[str, str], ttl: float) -> Response:
+        """Serve a GET from the response cache, revalidating stale entries upstream
+
+        Responses that turn out not to be storable (Cache-Control, Vary,
+        credentials, status or size) are streamed through exactly like ``stream_request`` does.
+        """
+        self._get_server(server_name)
+        key = (
+            server_name,
+            "/" + path.lstrip("/"),
+            urlencode(sorted(params.items())),
+            headers.get("accept-encoding", ""),
+        )
+
+        credentials = any(name in headers for name in CREDENTIAL_HEADERS)
+        entry = self.cache.get(key)
+        if entry is not None and credentials and "public" not in parse_cache_control(entry.headers.get("cache-control")):
+            # Stored for an anonymous caller, which may not be what this one gets
+            entry = None
+        if entry is not None and entry.is_fresh() and "no-cache" not in parse_cache_control(headers.get("cache-control")):
+            self.cache.hits += 1
+            return self._cached_response(entry, "HIT")
+
+        if entry is not None and (entry.etag or entry.last_modified):
+            headers = dict(headers)
+            if entry.etag:
+                headers["if-none-match"] = entry.etag
+            if entry.last_modified:
+                headers["if-modified-since"] = entry.last_modified
+        else:
+            entry = None
+
+        response = await self._send(server_name, path, "GET", params=params, headers=headers)
+
+        if entry is not None and response.status_code == 304:
+            await self._close(response)
+            self.cache.revalidations += 1
+            validated_headers = filter_headers(response.headers)
+            entry_ttl = self.cache.response_ttl(ttl, {**entry.headers, **validated_headers}, credentials)
+            if entry_ttl is None:
+                self.cache.discard(key)
+            else:
+                self.cache.refresh(key, validated_headers, entry_ttl)
+            return self._cached_response(entry, "REVALIDATED")
+
+        self.cache.misses += 1
+        miss_headers = {"x-cache": "MISS"}
+        response_headers = filter_headers(response.headers)
+        entry_ttl = self.cache.response_ttl(ttl, response_headers, credentials) if response.status_code == 200 else None
+        content_length = int(response.headers.get("content-length") or 0)
+        if entry_ttl is None or content_length > self.cache.max_entry_bytes:
+            return self._streaming_response(response, headers=miss_headers)
+
+        # Buffer the raw body for the cache within the caller's deadline,
+        # falling back to streaming the rest of it once it outgrows the
+        # per-entry limit
+        raw = response.aiter_raw()
+        chunks: List[bytes] = []
+        size = 0
+        try:
+            async for chunk in self._read_within_deadline(server_name, raw):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > self.cache.max_entry_bytes:
+                    return self._streaming_response(response, body=raw, head=chunks, headers=miss_headers)
+        except httpx.RequestError as e:
+            await self._close(response)
+            logger.error(f"Reading the response of {server_name} failed: {e}")
+            raise HTTPException(status_code=502, detail=f"Upstream request failed: {str(e)}")
+        except BaseException:
+            await self._close(response)
+            raise
+        await self._close(response)
+
+        entry = CacheEntry(
+            status_code=response.status_code,
+            headers=response_headers,
+            body=b"".join(chunks),
+            expires_at=time.monotonic() + entry_ttl,
+        )
+        self.cache.put(key, entry)
+        return Response(content=entry.body, status_code=entry.status_code, headers={**response_headers, **miss_headers})
+
     async def refresh_server_status(self):
         """Refresh status and capabilities for all servers"""
-        tasks = []
-        for server in self.servers.values():
-            tasks.extend([
-                self.health_check_server(server),
-                self.discover_capabilities(server)
-            ])
-        
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        await self.scheduler.probe_all()
 
 # Initialize gateway
 gateway = MCPGateway()
@@ -113,21 +831,31 @@ async def lifespan(app: FastAPI):
     """Application lifespan management"""
     # Startup
     logger.info("Starting MCP Gateway...")
-    await gateway.refresh_server_status()
+    # The first round probes all servers on the leader worker, which then
+    # runs the adaptive per-server health checks in the background
+    await gateway.coordinator.step()
     
-    # Background task for periodic health checks
-    async def periodic_health_check():
-        while True:
-            await asyncio.sleep(60)  # Check every minute
-            await gateway.refresh_server_status()
-    
-    task = asyncio.create_task(periodic_health_check())
+    task = asyncio.create_task(gateway.coordinator.run())
+    lag_task = asyncio.create_task(monitor_event_loop_lag(gateway.metrics))
+    background = [task, lag_task]
+    if gateway.tracer is not None:
+        background.append(asyncio.create_task(gateway.tracer.run()))
+
+    registry_file = os.getenv("MCP_SERVERS_FILE", "")
+    if registry_file:
+        watcher = RegistryWatcher(
+            registry_file,
+            on_change=gateway.reload,
+            interval=float(os.getenv("GATEWAY_REGISTRY_POLL_INTERVAL", 5.0)),
+        )
+        background.append(asyncio.create_task(watcher.run()))
     
     yield
     
     # Shutdown
-    task.cancel()
-    await gateway.client.aclose()
+    for background_task in background:
+        background_task.cancel()
+    await gateway.aclose()
     logger.info("MCP Gateway stopped")
 
 # FastAPI app
@@ -137,27 +865,40 @@ app = FastAPI(
     version="1.0.0",
     lifespan=lifespan
 )
+app.add_middleware(MetricsMiddleware, get_gateway=lambda: gateway)
+compression_settings = CompressionSettings.from_env()
+if compression_settings is not None:
+    app.add_middleware(CompressionMiddleware, settings=compression_settings)
+app.add_middleware(DeadlineMiddleware)
+access_log_settings = AccessLogSettings.from_env()
+if access_log_settings is not None:
+    app.add_middleware(AccessLogMiddleware, get_gateway=lambda: gateway, settings=access_log_settings)
+if gateway.tracer is not None:
+    app.add_middleware(TracingMiddleware, tracer=gateway.tracer)
 
 @app.get("/health")
 async def health():
     """Gateway health check"""
     return {"status": "healthy", "gateway": "mcp-gateway", "version": "1.0.0"}
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(content=gateway.metrics.render(), media_type=gateway.metrics.content_type)
+
 @app.get("/servers")
-async def list_servers():
+async def list_servers(request: Request):
     """List all registered MCP servers"""
-    return {
-        "servers": {name: server.dict() for name, server in gateway.servers.items()},
-        "total": len(gateway.servers)
-    }
+    return RegistrySnapshot.respond(gateway.snapshot.listing, request.headers.get("if-none-match"))
 
 @app.get("/servers/{server_name}")
-async def get_server_info(server_name: str):
+async def get_server_info(server_name: str, request: Request):
     """Get information about a specific MCP server"""
-    if server_name not in gateway.servers:
+    entry = gateway.snapshot.servers.get(server_name)
+    if entry is None:
         raise HTTPException(status_code=404, detail=f"Server '{server_name}' not found")
     
-    return gateway.servers[server_name].dict()
+    return RegistrySnapshot.respond(entry, request.headers.get("if-none-match"))
 
 @app.post("/servers/{server_name}/refresh")
 async def refresh_server(server_name: str):
@@ -171,22 +912,154 @@ async def refresh_server(server_name: str):
     
     return server.dict()
 
+@app.get("/admin/cache")
+async def cache_stats():
+    """Response cache counters"""
+    if gateway.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **gateway.cache.stats()}
+
+@app.delete("/admin/cache")
+async def clear_cache():
+    """Drop every cached response"""
+    if gateway.cache is None:
+        raise HTTPException(status_code=404, detail="Response cache is not enabled")
+    gateway.cache.clear()
+    return {"enabled": True, **gateway.cache.stats()}
+
+@app.post("/admin/reload")
+async def reload_registry():
+    """Re-read the server registry and apply the changes without a restart"""
+    try:
+        diff = await gateway.reload()
+    except Exception as e:
+        logger.error(f"Registry reload failed: {e}")
+        raise HTTPException(status_code=400, detail=f"Registry reload failed: {str(e)}")
+    return {**diff, "total": len(gateway.servers)}
+
+@app.get("/admin/coalescing")
+async def coalescing_stats():
+    """Request coalescing counters"""
+    if gateway.single_flight is None:
+        return {"enabled": False}
+    return {"enabled": True, **gateway.single_flight.stats()}
+
+@app.post("/mcp/batch")
+async def batch(batch_request: BatchRequest, request: Request):
+    """Run many MCP calls concurrently and return a result per item
+
+    Results come back in request order, or as NDJSON lines in completion
+    order when ``stream`` is set or the client accepts application/x-ndjson.
+    """
+    async def route(server_name: str, path: str, method: str, **kwargs) -> Dict[str, Any]:
+        # Measured per item, under the server each one goes to
+        server = server_name if server_name in gateway.servers else "unknown"
+        measurement = RequestMeasurement(gateway.metrics, method, server)
+        status_code = 500
+        try:
+            result = await gateway.route_request(server_name, path, method, **kwargs)
+            status_code = 200
+            return result
+        except HTTPException as e:
+            status_code = e.status_code
+            raise
+        except asyncio.CancelledError:
+            status_code = 504
+            raise
+        finally:
+            measurement.finish(status_code)
+
+    runner = BatchRunner(route, batch_request)
+    if batch_request.stream or "application/x-ndjson" in request.headers.get("accept", ""):
+        async def lines():
+            async for result in runner.results():
+                yield json.dumps(result) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    return await runner.run()
+
+@app.get("/capabilities")
+async def search_capabilities(q: Optional[str] = None):
+    """Capabilities whose name contains ``q``, with the servers providing each"""
+    capabilities = gateway.capability_index.search(q)
+    return {"capabilities": capabilities, "total": len(capabilities)}
+
+@app.post("/tools/{tool}")
+async def call_tool(tool: str, request: Request):
+    """Call a tool on whichever healthy server provides it"""
+    server = gateway.provider_for(tool)
+    set_request_server(request.scope, server.name)
+    path = TOOL_PATH.format(tool=tool)
+    headers = filter_headers(request.headers, "host")
+    headers.setdefault("accept-encoding", "identity")
+    response = await gateway.stream_request(
+        server_name=server.name,
+        path=path,
+        method="POST",
+        params=dict(request.query_params),
+        headers=headers,
+        content=request.stream(),
+    )
+    response.headers["x-mcp-server"] = server.name
+    return response
+
+@app.post("/mcp/{server_name}")
+async def mcp_session_message(server_name: str, request: Request):
+    """MCP streamable HTTP endpoint for a server, backed by a shared upstream session"""
+    gateway._get_server(server_name)
+    try:
+        message = await request.json()
+    except ValueError:
+        return JSONResponse(rpc_error(None, -32700, "Parse error"), status_code=400)
+    return await gateway.sessions.handle(
+        server_name, message, request.headers.get(SESSION_HEADER), request.headers.get("accept", "")
+    )
+
+@app.delete("/mcp/{server_name}")
+async def mcp_session_close(server_name: str, request: Request):
+    """End a client's MCP session, the upstream session stays open for others"""
+    if not gateway.sessions.close_client(request.headers.get(SESSION_HEADER)):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return Response(status_code=204)
+
 @app.api_route("/mcp/{server_name}/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def proxy_to_mcp_server(server_name: str, path: str, request: Request):
     """Proxy requests to MCP servers"""
     # Get request data
     query_params = dict(request.query_params)
-    headers = dict(request.headers)
     
     # Remove hop-by-hop headers
-    headers.pop("host", None)
-    headers.pop("connection", None)
+    headers = filter_headers(request.headers, "host")
     
     kwargs = {
         "params": query_params,
         "headers": headers,
     }
     
+    if PROXY_MODE == "stream":
+        # Don't let httpx advertise compression the client never asked for,
+        # the raw upstream bytes are forwarded as-is
+        headers.setdefault("accept-encoding", "identity")
+        if gateway.cache is not None and request.method == "GET":
+            ttl = gateway.cache.ttl_for(server_name, path)
+            request_cache_control = parse_cache_control(headers.get("cache-control"))
+            conditional = "if-none-match" in headers or "if-modified-since" in headers
+            if ttl is not None and "no-store" not in request_cache_control and not conditional:
+                return await gateway.cached_request(server_name, path, query_params, headers, ttl)
+        # Callers with a deadline aren't coalesced, a shared call would run
+        # on whichever deadline the leader brought
+        if gateway.single_flight is not None and request.method in ["GET", "HEAD"] and remaining() is None:
+            return await gateway.coalesced_request(server_name, path, request.method, query_params, headers)
+        if request.method in ["POST", "PUT", "PATCH"]:
+            kwargs["content"] = request.stream()
+        return await gateway.stream_request(
+            server_name=server_name,
+            path=path,
+            method=request.method,
+            **kwargs
+        )
+    
     # Add body for POST/PUT/PATCH requests
     if request.method in ["POST", "PUT", "PATCH"]:
         body = await request.body()
@@ -208,18 +1081,9 @@ async def proxy_to_mcp_server(server_name: str, path: str, request: Request):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Gateway information"""
-    return {
-        "service": "MCP Gateway",
-        "version": "1.0.0",
-        "servers": len(gateway.servers),
-        "endpoints": {
-            "health": "/health",
-            "servers": "/servers",
-            "proxy": "/mcp/{server_name}/{path}"
-        }
-    }
+    return RegistrySnapshot.respond(gateway.snapshot.info, request.headers.get("if-none-match"))
 
 if __name__ == "__main__":
     port = int(os.getenv("GATEWAY_PORT", 8080))
@@ -228,5 +1092,9 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=port,
         log_level="info",
-        access_log=True
+        # Requests are logged by AccessLogMiddleware, uvicorn's own loggers
+        # go through the gateway's queue-backed handler
+        access_log=False,
+        log_config=None,
+        workers=int(os.getenv("GATEWAY_WORKERS", 1))
     )
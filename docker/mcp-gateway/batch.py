@@ -0,0 +1,110 @@
+"""
+Batch - Fan out many MCP calls from one gateway round trip
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+MAX_ITEMS = int(os.getenv("GATEWAY_BATCH_MAX_ITEMS", 100))
+MAX_CONCURRENCY = int(os.getenv("GATEWAY_BATCH_MAX_CONCURRENCY", 16))
+DEFAULT_TIMEOUT = float(os.getenv("GATEWAY_BATCH_TIMEOUT", 30.0))
+
+class BatchItem(BaseModel):
+    server: str
+    method: str = "GET"
+    path: str = ""
+    params: Dict[str, Any] = {}
+    body: Optional[Any] = None
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    # Upper bound on items running at once, capped by GATEWAY_BATCH_MAX_CONCURRENCY
+    concurrency: Optional[int] = None
+    # Seconds before unfinished items are reported as timed out
+    timeout: Optional[float] = None
+    # Return results as NDJSON lines in completion order
+    stream: bool = False
+
+Route = Callable[..., Awaitable[Any]]
+
+class BatchRunner:
+    """Runs the items of a batch concurrently under a limit and a deadline"""
+
+    def __init__(self, route: Route, batch: BatchRequest):
+        if len(batch.items) > MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_ITEMS} items")
+
+        self.route = route
+        self.items = batch.items
+        self.concurrency = max(1, min(batch.concurrency or MAX_CONCURRENCY, MAX_CONCURRENCY))
+        self.timeout = batch.timeout if batch.timeout is not None else DEFAULT_TIMEOUT
+
+    async def _run_item(self, index: int, item: BatchItem, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        start = time.perf_counter()
+        async with semaphore:
+            kwargs: Dict[str, Any] = {"params": item.params}
+            if item.body is not None:
+                kwargs["json"] = item.body
+            try:
+                outcome = {"status": 200, "result": await self.route(item.server, item.path, item.method.upper(), **kwargs)}
+            except HTTPException as e:
+                outcome = {"status": e.status_code, "error": e.detail}
+            except Exception as e:
+                logger.error(f"Batch item {index} to {item.server} failed: {e}")
+                outcome = {"status": 500, "error": str(e)}
+
+        return {
+            "index": index,
+            "server": item.server,
+            **outcome,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    async def results(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield item results as they complete, then time out whatever is left"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = {
+            asyncio.create_task(self._run_item(index, item, semaphore)): index
+            for index, item in enumerate(self.items)
+        }
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        pending = set(tasks)
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        for index in sorted(tasks[task] for task in pending):
+            yield {
+                "index": index,
+                "server": self.items[index].server,
+                "status": 504,
+                "error": "Batch deadline exceeded",
+            }
+
+    async def run(self) -> Dict[str, Any]:
+        """Run the whole batch and return results in request order"""
+        results = sorted([result async for result in self.results()], key=lambda r: r["index"])
+        return {
+            "results": results,
+            "total": len(results),
+            "succeeded": sum(1 for r in results if r["status"] < 400),
+        }
@@ -0,0 +1,103 @@
+"""
+Circuit breaker - Fast-fail routing to MCP servers that keep failing
+"""
+
+import os
+import math
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+class CircuitBreaker:
+    """Per-upstream circuit breaker with closed, open and half-open states
+
+    The circuit opens after ``failure_threshold`` consecutive errors or
+    timeouts, or when a health check reports the server as unhealthy. While
+    open every request is rejected until ``reset_timeout`` has elapsed, then
+    up to ``half_open_max_calls`` trial requests are let through: a success
+    closes the circuit again, a failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.half_open_calls = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        """Build a breaker from GATEWAY_BREAKER_* settings"""
+        return cls(
+            name,
+            failure_threshold=int(os.getenv("GATEWAY_BREAKER_FAILURE_THRESHOLD", 5)),
+            reset_timeout=float(os.getenv("GATEWAY_BREAKER_RESET_TIMEOUT", 30.0)),
+            half_open_max_calls=int(os.getenv("GATEWAY_BREAKER_HALF_OPEN_CALLS", 1)),
+        )
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: str):
+        if state == self._state:
+            return
+        logger.info(f"Circuit for {self.name} is now {state}")
+        self._state = state
+        self.half_open_calls = 0
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+        elif state == CLOSED:
+            self.consecutive_failures = 0
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent upstream right now"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self.half_open_calls < self.half_open_max_calls:
+            self.half_open_calls += 1
+            return True
+        return False
+
+    def release(self):
+        """Hand back a half-open trial slot whose request ended without an outcome (deadline, cancellation)"""
+        if self._state == HALF_OPEN and self.half_open_calls > 0:
+            self.half_open_calls -= 1
+
+    def retry_after(self) -> int:
+        """Seconds until the circuit lets a trial request through"""
+        remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+        return max(1, math.ceil(remaining))
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self._state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self._state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._transition(OPEN)
+
+    def record_health(self, healthy: bool):
+        """Fold a periodic health check result into the circuit state"""
+        if not healthy:
+            self._transition(OPEN)
+        elif self.state == OPEN:
+            # The server answers health checks again, let trial traffic probe it
+            self._transition(HALF_OPEN)
+        elif self._state == HALF_OPEN:
+            # Trials that never reported back must not hold the circuit half-open
+            self.half_open_calls = 0
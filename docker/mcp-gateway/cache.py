@@ -0,0 +1,199 @@
+"""
+Response cache - Bounded TTL/LRU cache for idempotent MCP gateway routes
+"""
+
+import os
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, str, str, str]
+
+# Request headers whose values are part of the cache key
+KEY_HEADERS = frozenset({"accept-encoding"})
+# Request headers that make a response personal unless it is marked public
+CREDENTIAL_HEADERS = ("authorization", "cookie")
+
+@dataclass
+class CacheRule:
+    """TTL applied to GET responses of one server under a path prefix"""
+    server: str
+    prefix: str
+    ttl: float
+
+@dataclass
+class CacheEntry:
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    expires_at: float
+    stored_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+    def is_fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+def parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    """Parse a Cache-Control header into a directive -> argument mapping"""
+    directives: Dict[str, Optional[str]] = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, argument = part.partition("=")
+        directives[name.strip().lower()] = argument.strip().strip('"') or None
+    return directives
+
+def parse_rules(config: str) -> List[CacheRule]:
+    """Parse ``server:prefix=ttl`` rules separated by commas
+
+    ``git:/log=30,time:/=1`` caches ``/mcp/git/log...`` for 30 seconds and
+    everything under ``/mcp/time/`` for one second.
+    """
+    rules = []
+    for rule_config in config.split(","):
+        rule_config = rule_config.strip()
+        if ":" not in rule_config or "=" not in rule_config:
+            continue
+
+        target, ttl = rule_config.rsplit("=", 1)
+        server, prefix = target.split(":", 1)
+        try:
+            rules.append(CacheRule(server=server, prefix="/" + prefix.lstrip("/"), ttl=float(ttl)))
+        except ValueError:
+            logger.error(f"Invalid cache rule '{rule_config}', ignoring it")
+
+    # Longest prefix wins when several rules match the same path
+    rules.sort(key=lambda rule: len(rule.prefix), reverse=True)
+    return rules
+
+class ResponseCache:
+    """In-memory response cache, evicting least recently used entries by size"""
+
+    def __init__(self, rules: List[CacheRule], max_bytes: int = 64 * 1024 * 1024,
+                 max_entry_bytes: int = 4 * 1024 * 1024):
+        self.rules = rules
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        """Build the cache from GATEWAY_CACHE_* settings, None when disabled"""
+        if os.getenv("GATEWAY_CACHE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+
+        return cls(
+            rules=parse_rules(os.getenv("GATEWAY_CACHE_RULES", "")),
+            max_bytes=int(os.getenv("GATEWAY_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+            max_entry_bytes=int(os.getenv("GATEWAY_CACHE_MAX_ENTRY_BYTES", 4 * 1024 * 1024)),
+        )
+
+    def ttl_for(self, server: str, path: str) -> Optional[float]:
+        """Return the configured TTL for a request, None if it is not cacheable"""
+        path = "/" + path.lstrip("/")
+        for rule in self.rules:
+            if rule.server in (server, "*") and path.startswith(rule.prefix):
+                return rule.ttl
+        return None
+
+    def response_ttl(self, rule_ttl: float, headers: Dict[str, str],
+                     credentials: bool = False) -> Optional[float]:
+        """Combine a rule TTL with the upstream Cache-Control, None if not storable
+
+        Responses to requests with credentials are only stored when marked
+        ``public``, and responses varying on headers outside the cache key
+        (including ``Vary: *``) are never stored.
+        """
+        directives = parse_cache_control(headers.get("cache-control"))
+        if "no-store" in directives or "private" in directives:
+            return None
+        if credentials and "public" not in directives:
+            return None
+        vary = {name.strip().lower() for name in headers.get("vary", "").split(",") if name.strip()}
+        if vary - KEY_HEADERS:
+            return None
+        if "no-cache" in directives:
+            # Storable, but must be revalidated before every use
+            return 0.0
+
+        max_age = directives.get("s-maxage") or directives.get("max-age")
+        if max_age is not None:
+            try:
+                return min(rule_ttl, float(max_age))
+            except ValueError:
+                pass
+        return rule_ttl
+
+    def get(self, key: CacheKey) -> Optional[CacheEntry]:
+        """Return an entry, fresh or stale, and mark it as recently used"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: CacheKey, entry: CacheEntry):
+        """Store an entry, evicting least recently used ones to stay in budget"""
+        if entry.size > self.max_entry_bytes:
+            return
+
+        self.discard(key)
+        self.entries[key] = entry
+        self.current_bytes += entry.size
+
+        while self.current_bytes > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.current_bytes -= evicted.size
+            self.evictions += 1
+
+    def refresh(self, key: CacheKey, headers: Dict[str, str], ttl: float):
+        """Extend a revalidated entry using the headers of a 304 response"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return
+
+        for name in ("cache-control", "etag", "expires", "last-modified", "date"):
+            if name in headers:
+                entry.headers[name] = headers[name]
+        entry.stored_at = time.monotonic()
+        entry.expires_at = entry.stored_at + ttl
+
+    def discard(self, key: CacheKey):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry.size
+
+    def clear(self):
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self.entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+        }
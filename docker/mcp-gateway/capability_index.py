@@ -0,0 +1,55 @@
+"""
+Capability index - Inverted index from capability or tool name to the servers providing it
+"""
+
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+class CapabilityIndex:
+    """Maps each capability name to the servers that advertise it
+
+    Updates are incremental: only the capabilities a server gained or lost
+    since its last discovery touch the index.
+    """
+
+    def __init__(self):
+        self.providers: Dict[str, Set[str]] = {}
+        self.by_server: Dict[str, FrozenSet[str]] = {}
+
+    def update(self, server: str, capabilities: Iterable[str]) -> bool:
+        """Record a server's current capabilities, returning whether anything changed"""
+        current = frozenset(capabilities)
+        previous = self.by_server.get(server, frozenset())
+        if current == previous and server in self.by_server:
+            return False
+
+        for capability in previous - current:
+            providers = self.providers.get(capability)
+            if providers is not None:
+                providers.discard(server)
+                if not providers:
+                    del self.providers[capability]
+        for capability in current - previous:
+            self.providers.setdefault(capability, set()).add(server)
+
+        self.by_server[server] = current
+        return True
+
+    def remove(self, server: str):
+        """Forget a server that left the registry"""
+        self.update(server, ())
+        del self.by_server[server]
+
+    def providers_for(self, capability: str) -> List[str]:
+        return sorted(self.providers.get(capability, ()))
+
+    def search(self, query: Optional[str] = None) -> Dict[str, List[str]]:
+        """Capabilities whose name contains ``query`` (case-insensitive), with providers"""
+        needle = (query or "").lower()
+        return {
+            capability: sorted(servers)
+            for capability, servers in sorted(self.providers.items())
+            if needle in capability.lower()
+        }
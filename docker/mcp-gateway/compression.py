@@ -0,0 +1,197 @@
+"""
+Compression - Per-client response compression that leaves encoded upstream bodies alone
+"""
+
+import os
+import zlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def encode(self, data: bytes, final: bool) -> bytes:
+        mode = zstandard.COMPRESSOBJ_FLUSH_FINISH if final else zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        return self.compressor.compress(data) + self.compressor.flush(mode)
+
+ENCODERS = {"gzip": GzipEncoder, "zstd": ZstdEncoder}
+
+def parse_accept_encoding(value: Optional[str]) -> Dict[str, float]:
+    """Map each coding of an Accept-Encoding header to its q-value"""
+    codings = {}
+    for part in (value or "").split(","):
+        coding, *params = [p.strip() for p in part.split(";")]
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, number = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        codings[coding.lower()] = q
+    return codings
+
+@dataclass
+class CompressionSettings:
+    """Which responses get compressed, and how"""
+    # Supported codings in order of preference
+    encodings: Tuple[str, ...] = ("zstd", "gzip")
+    min_size: int = 1024
+    gzip_level: int = 6
+    zstd_level: int = 3
+    content_types: Tuple[str, ...] = ("application/json", "application/x-ndjson", "text/")
+
+    @classmethod
+    def from_env(cls) -> Optional["CompressionSettings"]:
+        """Build settings from GATEWAY_COMPRESSION_* variables, None when disabled"""
+        encodings = []
+        for encoding in os.getenv("GATEWAY_COMPRESSION_ENCODINGS", "zstd,gzip").split(","):
+            encoding = encoding.strip().lower()
+            if encoding == "zstd" and not ZSTD_AVAILABLE:
+                logger.info("zstd compression unavailable, the 'zstandard' package is not installed")
+            elif encoding in ENCODERS:
+                encodings.append(encoding)
+        if not encodings:
+            return None
+
+        return cls(
+            encodings=tuple(encodings),
+            min_size=int(os.getenv("GATEWAY_COMPRESSION_MIN_SIZE", 1024)),
+            gzip_level=int(os.getenv("GATEWAY_COMPRESSION_GZIP_LEVEL", 6)),
+            zstd_level=int(os.getenv("GATEWAY_COMPRESSION_ZSTD_LEVEL", 3)),
+            content_types=tuple(
+                t.strip() for t in os.getenv(
+                    "GATEWAY_COMPRESSION_TYPES", "application/json,application/x-ndjson,text/"
+                ).split(",") if t.strip()
+            ),
+        )
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """The preferred coding the client accepts, if any"""
+        accepted = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for encoding in self.encodings:
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    @staticmethod
+    def streamed(headers: Headers) -> bool:
+        """Whether a body arrives piece by piece, each piece to be delivered as it comes"""
+        content_type = headers.get("content-type", "").lower()
+        return "content-length" not in headers or content_type.startswith("application/x-ndjson")
+
+    def encoder(self, encoding: str):
+        level = self.zstd_level if encoding == "zstd" else self.gzip_level
+        return ENCODERS[encoding](level)
+
+    def compressible(self, status_code: int, headers: Headers) -> bool:
+        content_type = headers.get("content-type", "").lower()
+        content_length = headers.get("content-length")
+        return (
+            # Byte ranges refer to the identity body
+            status_code not in (204, 206, 304)
+            and headers.get("content-encoding", "identity").lower() == "identity"
+            and "no-transform" not in headers.get("cache-control", "").lower()
+            # Compressing an event stream would hold back events
+            and not content_type.startswith("text/event-stream")
+            and any(content_type.startswith(t) for t in self.content_types)
+            and (content_length is None or int(content_length) >= self.min_size)
+        )
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses for clients that accept it
+
+    Responses that are already encoded (e.g. compressed by the upstream
+    server, which sees the client's Accept-Encoding) are passed through
+    untouched. Other compressible responses are compressed once their body
+    reaches ``min_size``. Streamed responses (no Content-Length, or NDJSON)
+    are compressed from their first chunk with a flush after each, so
+    nothing is held back.
+    """
+
+    def __init__(self, app, settings: CompressionSettings):
+        self.app = app
+        self.settings = settings
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.settings.negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        held = []
+        held_size = 0
+        encoder = None
+        passthrough = False
+        streamed = False
+
+        async def send_compressed(message):
+            nonlocal start, held_size, encoder, passthrough, streamed
+            if passthrough or message["type"] not in ("http.response.start", "http.response.body"):
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if self.settings.compressible(message["status"], headers):
+                    start = message
+                    streamed = self.settings.streamed(headers)
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                held.append(body)
+                held_size += len(body)
+                small = held_size < self.settings.min_size and not streamed
+                if more_body and small:
+                    return
+                body = b"".join(held)
+                if small:
+                    passthrough = True
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body, "more_body": more_body})
+                    return
+
+                encoder = self.settings.encoder(encoding)
+                headers = MutableHeaders(raw=start["headers"])
+                del headers["content-length"]
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("accept-encoding")
+                await send(start)
+
+            await send({"type": "http.response.body", "body": encoder.encode(body, not more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
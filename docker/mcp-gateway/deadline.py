@@ -0,0 +1,59 @@
+"""
+Deadlines - Per-request time budgets set by clients and passed on upstream
+"""
+
+import os
+import time
+import logging
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.datastructures import Headers
+
+logger = logging.getLogger(__name__)
+
+# Header carrying the caller's remaining budget in seconds, both from
+# clients and towards upstream servers
+DEADLINE_HEADER = os.getenv("GATEWAY_DEADLINE_HEADER", "x-request-timeout").lower()
+# Upper bound on any client supplied budget
+MAX_TIMEOUT = float(os.getenv("GATEWAY_MAX_REQUEST_TIMEOUT", 300.0))
+
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+def parse_timeout(value: Optional[str]) -> Optional[float]:
+    """Seconds from a deadline header, None when absent or malformed"""
+    if not value:
+        return None
+    try:
+        timeout = float(value)
+    except ValueError:
+        return None
+    return min(timeout, MAX_TIMEOUT) if timeout >= 0 else None
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, None without one"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+class DeadlineMiddleware:
+    """ASGI middleware starting each request's deadline from its header
+
+    Code handling the request reads the budget left with ``remaining()``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timeout = parse_timeout(Headers(scope=scope).get(DEADLINE_HEADER))
+        token = _deadline.set(time.monotonic() + timeout if timeout is not None else None)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
@@ -0,0 +1,332 @@
+"""
+MCP sessions - JSON-RPC over streamable HTTP, multiplexed onto long-lived upstream sessions
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+from breaker import OPEN
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = "2025-06-18"
+CLIENT_INFO = {"name": "mcp-gateway", "version": "1.0.0"}
+SESSION_HEADER = "mcp-session-id"
+
+# Path of the streamable HTTP endpoint on every upstream server
+UPSTREAM_PATH = os.getenv("GATEWAY_MCP_PATH", "mcp")
+# Seconds a client session may stay unused before it is forgotten
+SESSION_IDLE_TIMEOUT = float(os.getenv("GATEWAY_MCP_SESSION_IDLE", 1800.0))
+
+def rpc_error(message_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": message_id, "error": {"code": code, "message": message}}
+
+@dataclass
+class UpstreamSession:
+    """An initialized session with one replica, shared by all clients of a server"""
+    server: str
+    replica: Any
+    session_id: Optional[str]
+    protocol_version: str
+    initialize_result: Dict[str, Any]
+    _ids: Any = field(default_factory=lambda: itertools.count(1))
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+@dataclass
+class ClientSession:
+    """A session the gateway handed out to a client"""
+    id: str
+    server: str
+    last_used: float = field(default_factory=time.monotonic)
+    # Client request id -> the upstream session and id it was sent as
+    in_flight: Dict[Any, Tuple[UpstreamSession, int]] = field(default_factory=dict)
+
+def decode_messages(text) -> List[Dict[str, Any]]:
+    """JSON-RPC messages of a JSON body or SSE event, ValueError if it holds anything else"""
+    data = json.loads(text)
+    messages = data if isinstance(data, list) else [data]
+    if not all(isinstance(message, dict) for message in messages):
+        raise ValueError("not a JSON-RPC message")
+    return messages
+
+async def read_messages(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """JSON-RPC messages of an upstream response, either a JSON body or an SSE stream
+
+    Raises ValueError on a body or event that isn't JSON-RPC (an HTML
+    error page, a truncated event).
+    """
+    if not response.headers.get("content-type", "").startswith("text/event-stream"):
+        body = await response.aread()
+        if body:
+            for message in decode_messages(body):
+                yield message
+        return
+
+    data = []
+    async for line in response.aiter_lines():
+        if line.startswith("data:"):
+            data.append(line[5:].lstrip())
+        elif not line and data:
+            for message in decode_messages("\n".join(data)):
+                yield message
+            data = []
+    if data:
+        for message in decode_messages("\n".join(data)):
+            yield message
+
+class SessionManager:
+    """Terminates MCP client sessions at the gateway
+
+    Each server gets one upstream session, opened lazily with a single
+    ``initialize`` handshake and pinned to the replica it was opened on.
+    Client requests are forwarded over it with their ids and progress tokens
+    rewritten, so any number of client sessions share it without
+    collisions, and responses and progress notifications stream back as SSE.
+    Sessions that expire upstream, or whose replica goes unhealthy, are
+    replaced transparently. Requests from servers to clients (sampling,
+    elicitation) are not relayed.
+    """
+
+    def __init__(self, gateway: Any):
+        self.gateway = gateway
+        self.upstream: Dict[str, UpstreamSession] = {}
+        self.clients: Dict[str, ClientSession] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _usable(self, session: UpstreamSession) -> bool:
+        server = self.gateway.servers.get(session.server)
+        breaker = self.gateway.breakers.get(session.replica.url)
+        return (
+            server is not None
+            and any(replica is session.replica for replica in server.replicas)
+            and session.replica.status != "unhealthy"
+            and breaker is not None and breaker.state != OPEN
+        )
+
+    async def _post(self, server_name: str, message: Dict[str, Any],
+                    session: Optional[UpstreamSession] = None) -> httpx.Response:
+        headers = {
+            "accept": "application/json, text/event-stream",
+            "content-type": "application/json",
+            "mcp-protocol-version": session.protocol_version if session else PROTOCOL_VERSION,
+        }
+        if session is not None and session.session_id:
+            headers[SESSION_HEADER] = session.session_id
+        return await self.gateway._send(
+            server_name, UPSTREAM_PATH, "POST",
+            replica=session.replica if session else None,
+            headers=headers,
+            content=json.dumps(message).encode(),
+        )
+
+    async def _open(self, server_name: str) -> UpstreamSession:
+        """Run the initialize handshake with one replica of the server"""
+        response = await self._post(server_name, {
+            "jsonrpc": "2.0",
+            "id": 0,
+            "method": "initialize",
+            "params": {"protocolVersion": PROTOCOL_VERSION, "capabilities": {}, "clientInfo": CLIENT_INFO},
+        })
+        replica = response.extensions["mcp_replica"]
+        reply = None
+        try:
+            if response.status_code == 200:
+                async for message in read_messages(response):
+                    if message.get("id") == 0:
+                        reply = message
+                        break
+        except ValueError as e:
+            raise HTTPException(status_code=502, detail=f"MCP initialize with '{server_name}' failed: malformed reply ({e})")
+        finally:
+            await self.gateway._close(response)
+
+        if reply is None or "result" not in reply:
+            error = reply.get("error") if reply is not None else f"HTTP {response.status_code}"
+            if isinstance(error, dict):
+                error = error.get("message")
+            error = error or "no result"
+            raise HTTPException(status_code=502, detail=f"MCP initialize with '{server_name}' failed: {error}")
+
+        session = UpstreamSession(
+            server=server_name,
+            replica=replica,
+            session_id=response.headers.get(SESSION_HEADER),
+            protocol_version=reply["result"].get("protocolVersion", PROTOCOL_VERSION),
+            initialize_result=reply["result"],
+        )
+        response = await self._post(server_name, {"jsonrpc": "2.0", "method": "notifications/initialized"}, session)
+        await self.gateway._close(response)
+        logger.info(f"Opened MCP session with {server_name} ({replica.url})")
+        return session
+
+    async def session_for(self, server_name: str) -> UpstreamSession:
+        """The server's upstream session, opened or replaced as needed"""
+        session = self.upstream.get(server_name)
+        if session is not None and self._usable(session):
+            return session
+
+        async with self._locks.setdefault(server_name, asyncio.Lock()):
+            session = self.upstream.get(server_name)
+            if session is None or not self._usable(session):
+                session = await self._open(server_name)
+                self.upstream[server_name] = session
+        return session
+
+    def _expire(self, session: UpstreamSession):
+        if self.upstream.get(session.server) is session:
+            del self.upstream[session.server]
+
+    def open_client(self, server_name: str) -> ClientSession:
+        now = time.monotonic()
+        for session_id in [s.id for s in self.clients.values() if now - s.last_used > SESSION_IDLE_TIMEOUT]:
+            del self.clients[session_id]
+
+        client = ClientSession(id=uuid.uuid4().hex, server=server_name)
+        self.clients[client.id] = client
+        return client
+
+    async def _send_request(self, client: ClientSession, message: Dict[str, Any]):
+        """Forward a client request, retrying once on a fresh session if upstream forgot ours"""
+        for attempt in range(2):
+            session = await self.session_for(client.server)
+            upstream_id = session.next_id()
+            outgoing = {**message, "id": upstream_id}
+            params = message.get("params")
+            meta = params.get("_meta") if isinstance(params, dict) else None
+            token = meta.get("progressToken") if isinstance(meta, dict) else None
+            if token is not None:
+                outgoing["params"] = {**params, "_meta": {**meta, "progressToken": f"gw-{upstream_id}"}}
+
+            response = await self._post(client.server, outgoing, session)
+            if response.status_code == 404 and session.session_id and attempt == 0:
+                await self.gateway._close(response)
+                logger.info(f"MCP session with {client.server} expired upstream, reopening")
+                self._expire(session)
+                continue
+            return response, session, upstream_id, token
+
+    async def _replies(self, client: ClientSession, message_id: Any, response: httpx.Response,
+                       upstream_id: int, token: Any) -> AsyncIterator[Dict[str, Any]]:
+        """Upstream messages for one request with the client's ids restored"""
+        try:
+            if response.status_code >= 400:
+                yield rpc_error(message_id, -32603, f"MCP server '{client.server}' returned HTTP {response.status_code}")
+                return
+            try:
+                async for message in read_messages(response):
+                    if "method" not in message:
+                        if message.get("id") == upstream_id:
+                            yield {**message, "id": message_id}
+                            return
+                    elif "id" in message:
+                        logger.debug(f"Dropping {message['method']} request from {client.server}")
+                    elif message["method"] == "notifications/progress":
+                        yield {**message, "params": {**message.get("params", {}), "progressToken": token}}
+                    else:
+                        yield message
+            except ValueError as e:
+                logger.error(f"Malformed message from {client.server}: {e}")
+                yield rpc_error(message_id, -32603, f"MCP server '{client.server}' sent a malformed response")
+        finally:
+            client.in_flight.pop(message_id, None)
+            await self.gateway._close(response)
+
+    async def _notify(self, client: ClientSession, message: Dict[str, Any]):
+        if message["method"] == "notifications/initialized":
+            # The upstream session was initialized when it was opened
+            return
+        params = message.get("params") or {}
+        if message["method"] == "notifications/cancelled":
+            target = client.in_flight.get(params.get("requestId"))
+            if target is None:
+                return
+            session, upstream_id = target
+            message = {**message, "params": {**params, "requestId": upstream_id}}
+        else:
+            session = await self.session_for(client.server)
+        response = await self._post(client.server, message, session)
+        await self.gateway._close(response)
+
+    async def handle(self, server_name: str, message: Any, session_id: Optional[str], accept: str) -> Response:
+        """Answer one JSON-RPC message a client POSTed to the server's endpoint"""
+        if not isinstance(message, dict):
+            return JSONResponse(rpc_error(None, -32600, "Only single JSON-RPC messages are supported"), status_code=400)
+
+        method = message.get("method")
+        message_id = message.get("id")
+        if method == "initialize":
+            session = await self.session_for(server_name)
+            client = self.open_client(server_name)
+            return JSONResponse(
+                {"jsonrpc": "2.0", "id": message_id, "result": session.initialize_result},
+                headers={SESSION_HEADER: client.id},
+            )
+
+        if not session_id:
+            return JSONResponse(rpc_error(message_id, -32600, "Missing Mcp-Session-Id header"), status_code=400)
+        client = self.clients.get(session_id)
+        if client is None or client.server != server_name:
+            return JSONResponse(rpc_error(message_id, -32001, "Session not found"), status_code=404)
+        client.last_used = time.monotonic()
+
+        if method is None:
+            # A reply to a server request, which are never relayed
+            return Response(status_code=202)
+        if message_id is None:
+            await self._notify(client, message)
+            return Response(status_code=202)
+        if method == "ping":
+            return JSONResponse({"jsonrpc": "2.0", "id": message_id, "result": {}})
+
+        response, session, upstream_id, token = await self._send_request(client, message)
+        client.in_flight[message_id] = (session, upstream_id)
+        replies = self._replies(client, message_id, response, upstream_id, token)
+
+        if "text/event-stream" in accept and response.headers.get("content-type", "").startswith("text/event-stream"):
+            async def events():
+                async for reply in replies:
+                    yield f"event: message\ndata: {json.dumps(reply)}\n\n"
+
+            return StreamingResponse(
+                events(),
+                media_type="text/event-stream",
+                background=BackgroundTask(self.gateway._close, response),
+            )
+
+        final = None
+        async for reply in replies:
+            if "method" not in reply:
+                final = reply
+        return JSONResponse(final or rpc_error(message_id, -32603, "MCP server closed the stream without a response"))
+
+    def close_client(self, session_id: Optional[str]) -> bool:
+        return self.clients.pop(session_id or "", None) is not None
+
+    async def aclose(self):
+        """Terminate every upstream session, best effort"""
+        sessions, self.upstream = list(self.upstream.values()), {}
+
+        async def terminate(session: UpstreamSession):
+            client = self.gateway.clients.get(session.server)
+            if client is not None and session.session_id:
+                await client.delete(
+                    f"{session.replica.url}/{UPSTREAM_PATH}",
+                    headers={SESSION_HEADER: session.session_id},
+                    timeout=2.0,
+                )
+
+        await asyncio.gather(*(terminate(s) for s in sessions), return_exceptions=True)
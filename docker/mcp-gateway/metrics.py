@@ -0,0 +1,234 @@
+"""
+Metrics - Prometheus instrumentation for the MCP gateway
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Request scope state key of the current request's RequestMeasurement
+MEASUREMENT_STATE = "metrics_measurement"
+# Routes fanning out to several servers, their calls are measured one by one
+FAN_OUT_PATHS = ("/mcp/batch",)
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+class PoolCollector:
+    """Reports connection pool usage of each upstream client at scrape time"""
+
+    def __init__(self, get_gateway: Callable[[], Any]):
+        self.get_gateway = get_gateway
+
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "mcp_gateway_upstream_connections",
+            "Open upstream connections per server",
+            labels=["server", "state"],
+        )
+        max_connections = GaugeMetricFamily(
+            "mcp_gateway_upstream_max_connections",
+            "Configured upstream connection pool size per server",
+            labels=["server"],
+        )
+
+        gateway = self.get_gateway()
+        for name, client in list(gateway.clients.items()):
+            server = gateway.servers.get(name)
+            if server is not None:
+                max_connections.add_metric([name], server.pool.max_connections)
+            # httpx does not expose its pool publicly, read the httpcore one
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            pool_connections = getattr(pool, "connections", None)
+            if pool_connections is None:
+                continue
+            idle = sum(1 for connection in pool_connections if connection.is_idle())
+            connections.add_metric([name, "idle"], idle)
+            connections.add_metric([name, "active"], len(pool_connections) - idle)
+
+        yield connections
+        yield max_connections
+
+class AdmissionCollector:
+    """Reports admission control queues of each server at scrape time"""
+
+    def __init__(self, get_gateway: Callable[[], Any]):
+        self.get_gateway = get_gateway
+
+    def collect(self):
+        queue_depth = GaugeMetricFamily(
+            "mcp_gateway_admission_queue_depth",
+            "Requests waiting for an in-flight slot per server",
+            labels=["server"],
+        )
+        admitted = GaugeMetricFamily(
+            "mcp_gateway_admission_in_flight",
+            "Requests holding an in-flight slot per server",
+            labels=["server"],
+        )
+
+        for name, admission in list(self.get_gateway().admission.items()):
+            queue_depth.add_metric([name], admission.queue_depth)
+            admitted.add_metric([name], admission.in_flight)
+
+        yield queue_depth
+        yield admitted
+
+class GatewayMetrics:
+    """Prometheus metrics owned by one gateway instance"""
+
+    content_type = CONTENT_TYPE_LATEST
+
+    def __init__(self):
+        self.registry = CollectorRegistry()
+        self.requests = Counter(
+            "mcp_gateway_requests_total",
+            "Proxied requests",
+            ["server", "method", "status_class"],
+            registry=self.registry,
+        )
+        self.errors = Counter(
+            "mcp_gateway_upstream_errors_total",
+            "Failed upstream requests by kind (timeout, connection, circuit_open, status)",
+            ["server", "kind"],
+            registry=self.registry,
+        )
+        self.latency = Histogram(
+            "mcp_gateway_request_duration_seconds",
+            "Time from receiving a proxied request until its last body byte is sent",
+            ["server", "method", "status_class"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.coalesced = Counter(
+            "mcp_gateway_coalesced_requests_total",
+            "Requests answered by sharing an identical in-flight upstream call",
+            ["server"],
+            registry=self.registry,
+        )
+        self.shed = Counter(
+            "mcp_gateway_shed_requests_total",
+            "Requests rejected by admission control by reason (queue_full, queue_timeout, deadline)",
+            ["server", "reason"],
+            registry=self.registry,
+        )
+        self.retries = Counter(
+            "mcp_gateway_retries_total",
+            "Upstream retries by outcome (retried, budget_exhausted)",
+            ["server", "outcome"],
+            registry=self.registry,
+        )
+        self.in_flight = Gauge(
+            "mcp_gateway_in_flight_requests",
+            "Proxied requests currently being served",
+            ["server"],
+            registry=self.registry,
+        )
+        self.health_check_duration = Histogram(
+            "mcp_gateway_health_check_duration_seconds",
+            "Duration of upstream health checks",
+            ["server"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.event_loop_lag = Gauge(
+            "mcp_gateway_event_loop_lag_seconds",
+            "Delay of the last event loop lag probe beyond its scheduled wake-up",
+            registry=self.registry,
+        )
+
+    def register_pool_collector(self, get_gateway: Callable[[], Any]):
+        self.registry.register(PoolCollector(get_gateway))
+
+    def register_admission_collector(self, get_gateway: Callable[[], Any]):
+        self.registry.register(AdmissionCollector(get_gateway))
+
+    def render(self) -> bytes:
+        return generate_latest(self.registry)
+
+async def monitor_event_loop_lag(metrics: GatewayMetrics, interval: float = 1.0):
+    """Measure how late the event loop wakes a sleeping task, forever"""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        metrics.event_loop_lag.set(max(0.0, loop.time() - start - interval))
+
+class RequestMeasurement:
+    """Count, latency and in-flight gauge of one request to one server
+
+    Routes that pick the server themselves (``/tools/{tool}``) name it with
+    ``set_server`` once resolved, the in-flight gauge counts from then on.
+    """
+
+    def __init__(self, metrics: "GatewayMetrics", method: str, server: Optional[str] = None):
+        self.metrics = metrics
+        self.method = method
+        self.server: Optional[str] = None
+        self.start = time.perf_counter()
+        if server is not None:
+            self.set_server(server)
+
+    def set_server(self, server: str):
+        if self.server is None:
+            self.server = server
+            self.metrics.in_flight.labels(server).inc()
+
+    def finish(self, status_code: int):
+        if self.server is not None:
+            self.metrics.in_flight.labels(self.server).dec()
+        labels = (self.server or "unknown", self.method, status_class(status_code))
+        self.metrics.requests.labels(*labels).inc()
+        self.metrics.latency.labels(*labels).observe(time.perf_counter() - self.start)
+
+def set_request_server(scope, server: str):
+    """Name the server the current request was routed to, for metrics"""
+    measurement = scope.get("state", {}).get(MEASUREMENT_STATE)
+    if measurement is not None:
+        measurement.set_server(server)
+
+class MetricsMiddleware:
+    """ASGI middleware recording count, latency and in-flight gauges for /mcp/ and /tools/ routes
+
+    Timing ends when the last body chunk has been sent, so streamed responses
+    are measured in full.
+    """
+
+    def __init__(self, app, get_gateway: Callable[[], Any]):
+        self.app = app
+        self.get_gateway = get_gateway
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not scope["path"].startswith(("/mcp/", "/tools/"))
+                or scope["path"] in FAN_OUT_PATHS):
+            await self.app(scope, receive, send)
+            return
+
+        gateway = self.get_gateway()
+        server = None
+        if scope["path"].startswith("/mcp/"):
+            segments = scope["path"].split("/", 3)
+            # Unknown names are folded into one label to keep cardinality bounded
+            server = segments[2] if segments[2] in gateway.servers else "unknown"
+        measurement = RequestMeasurement(gateway.metrics, scope["method"], server)
+        scope.setdefault("state", {})[MEASUREMENT_STATE] = measurement
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            measurement.finish(status_code)
@@ -0,0 +1,185 @@
+"""
+Registry - MCP server definitions loaded from MCP_SERVERS or a watched file
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+logger = logging.getLogger(__name__)
+
+class PoolSettings(BaseModel):
+    """Connection pool and timeout settings for one upstream server"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 5.0
+    http2: bool = False
+    connect_timeout: float = 10.0
+    read_timeout: float = 30.0
+    pool_timeout: float = 10.0
+    # Admission control, a max_in_flight of 0 means unlimited
+    max_in_flight: int = Field(default_factory=lambda: int(os.getenv("GATEWAY_MAX_IN_FLIGHT", 0)))
+    max_queue: int = Field(default_factory=lambda: int(os.getenv("GATEWAY_MAX_QUEUE", 100)))
+    queue_timeout: float = Field(default_factory=lambda: float(os.getenv("GATEWAY_QUEUE_TIMEOUT", 5.0)))
+
+class ReplicaInfo(BaseModel):
+    """One upstream instance serving an MCP server name"""
+    url: str
+    # Share of traffic relative to the other replicas, must be positive
+    weight: float = Field(1.0, gt=0)
+    status: str = "unknown"
+    outstanding: int = 0
+
+class MCPServerInfo(BaseModel):
+    name: str
+    url: str
+    status: str = "unknown"
+    capabilities: List[str] = []
+    pool: PoolSettings = Field(default_factory=PoolSettings)
+    replicas: List[ReplicaInfo] = []
+
+def parse_replica(replica_config: str) -> Optional[ReplicaInfo]:
+    """Parse a replica URL with an optional ``*weight`` suffix, None if the weight is invalid"""
+    url, _, weight = replica_config.strip().rpartition("*")
+    if url:
+        try:
+            weight = float(weight)
+        except ValueError:
+            return ReplicaInfo(url=replica_config.strip())
+        try:
+            return ReplicaInfo(url=url, weight=weight)
+        except ValidationError:
+            logger.warning(f"Invalid weight {weight:g} for replica {url}, ignoring it")
+            return None
+    return ReplicaInfo(url=replica_config.strip())
+
+def parse_replica_definition(definition: Any) -> Optional[ReplicaInfo]:
+    """Parse a registry file replica, a URL string or a ``{url, weight}`` mapping"""
+    if isinstance(definition, str):
+        return ReplicaInfo(url=definition)
+    try:
+        return ReplicaInfo(**definition)
+    except (TypeError, ValidationError) as e:
+        logger.warning(f"Invalid replica {definition!r}, ignoring it: {e}")
+        return None
+
+def parse_server_entry(server_config: str) -> Optional[MCPServerInfo]:
+    """Parse one ``name:url[|url...][;key=value...]`` MCP_SERVERS entry"""
+    if ":" not in server_config:
+        return None
+
+    server_config, *options = server_config.split(";")
+    name, urls = server_config.split(":", 1)
+    replicas = [parse_replica(url) for url in urls.split("|") if url.strip()]
+    replicas = [replica for replica in replicas if replica is not None]
+    if not replicas:
+        logger.warning(f"MCP server '{name}' has no usable URL, ignoring it")
+        return None
+    try:
+        pool = PoolSettings(**dict(option.split("=", 1) for option in options if "=" in option))
+    except ValidationError as e:
+        logger.error(f"Invalid pool settings for {name}, using defaults: {e}")
+        pool = PoolSettings()
+
+    return MCPServerInfo(name=name, url=replicas[0].url, pool=pool, replicas=replicas)
+
+def parse_servers_env(servers_config: str) -> Dict[str, MCPServerInfo]:
+    """Parse a comma separated MCP_SERVERS value
+
+    Each entry is ``name:url`` optionally followed by ``;key=value``
+    pool settings, e.g. ``github:http://mcp-github:8000;max_connections=10;http2=true``.
+    Several replica URLs can be given with ``|``, each with an optional
+    ``*weight``, e.g. ``git:http://mcp-git-1:8000*2|http://mcp-git-2:8000``.
+    """
+    servers = {}
+    for server_config in servers_config.split(","):
+        server = parse_server_entry(server_config)
+        if server is not None:
+            servers[server.name] = server
+    return servers
+
+def parse_server_definition(name: str, definition: Any) -> Optional[MCPServerInfo]:
+    """Parse one server of a registry file, None if it has no usable URL
+
+    A definition is either a URL string or a mapping with ``url`` or
+    ``replicas`` (URL strings or ``{url, weight}`` mappings) and an optional
+    ``pool`` mapping of pool settings.
+    """
+    if isinstance(definition, str):
+        definition = {"url": definition}
+    if not isinstance(definition, dict):
+        definition = {}
+
+    urls = definition.get("replicas") or ([definition["url"]] if definition.get("url") else [])
+    replicas = [parse_replica_definition(replica) for replica in urls if replica]
+    replicas = [replica for replica in replicas if replica is not None]
+    if not replicas:
+        logger.warning(f"MCP server '{name}' has no usable URL, ignoring it")
+        return None
+    return MCPServerInfo(
+        name=name,
+        url=replicas[0].url,
+        pool=PoolSettings(**(definition.get("pool") or {})),
+        replicas=replicas,
+    )
+
+def load_registry_file(path: str) -> Dict[str, MCPServerInfo]:
+    """Load servers from a YAML or JSON registry file with a ``servers`` mapping"""
+    with open(path, "r") as f:
+        content = f.read()
+
+    if path.endswith(".json"):
+        data = json.loads(content)
+    else:
+        import yaml
+        data = yaml.safe_load(content)
+
+    servers = {}
+    for name, definition in ((data or {}).get("servers") or {}).items():
+        server = parse_server_definition(name, definition)
+        if server is not None:
+            servers[name] = server
+    return servers
+
+def server_config(server: MCPServerInfo) -> Dict[str, Any]:
+    """The configured part of a server, ignoring runtime state"""
+    return {
+        "replicas": [(replica.url, replica.weight) for replica in server.replicas],
+        "pool": server.pool.model_dump(),
+    }
+
+class RegistryWatcher:
+    """Polls a registry file and calls ``on_change`` when its content changes"""
+
+    def __init__(self, path: str, on_change: Callable[[], Awaitable[Any]], interval: float = 5.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.digest = self._digest()
+
+    def _digest(self) -> Optional[str]:
+        try:
+            with open(self.path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    async def run(self):
+        """Watch the file forever"""
+        while True:
+            await asyncio.sleep(self.interval)
+            digest = self._digest()
+            if digest is None or digest == self.digest:
+                continue
+
+            self.digest = digest
+            logger.info(f"Registry file {self.path} changed, reloading")
+            try:
+                await self.on_change()
+            except Exception as e:
+                logger.error(f"Failed to reload registry from {self.path}: {e}")
@@ -0,0 +1,88 @@
+"""
+Retries - Jittered retries of idempotent upstream calls, limited by a per-server budget
+"""
+
+import os
+import time
+import random
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# Upstream statuses worth another attempt, anything else is final
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+class RetryBudget:
+    """Token bucket capping retries to a share of a server's traffic
+
+    Every request deposits ``ratio`` tokens and every retry spends one, so
+    retries can't exceed ``ratio`` of requests once a server starts failing.
+    ``min_per_second`` tokens trickle in regardless so low-traffic servers
+    can still retry, and the balance never exceeds ``max_tokens``.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 1.0, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.updated = time.monotonic()
+
+    def _deposit(self, amount: float):
+        now = time.monotonic()
+        amount += (now - self.updated) * self.min_per_second
+        self.updated = now
+        self.tokens = min(self.max_tokens, self.tokens + amount)
+
+    def record_request(self):
+        self._deposit(self.ratio)
+
+    def try_spend(self) -> bool:
+        self._deposit(0.0)
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+class RetryPolicy:
+    """Which calls may be retried, how often and after how long"""
+
+    def __init__(self, max_retries: int = 2, base_delay: float = 0.05, max_delay: float = 1.0,
+                 budget_ratio: float = 0.2, budget_min_per_second: float = 1.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_min_per_second = budget_min_per_second
+        self.budgets: Dict[str, RetryBudget] = {}
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=int(os.getenv("GATEWAY_RETRY_MAX", 2)),
+            base_delay=float(os.getenv("GATEWAY_RETRY_BASE_DELAY", 0.05)),
+            max_delay=float(os.getenv("GATEWAY_RETRY_MAX_DELAY", 1.0)),
+            budget_ratio=float(os.getenv("GATEWAY_RETRY_BUDGET_PERCENT", 20)) / 100,
+            budget_min_per_second=float(os.getenv("GATEWAY_RETRY_MIN_PER_SECOND", 1.0)),
+        )
+
+    def retryable(self, method: str, kwargs: Dict[str, Any]) -> bool:
+        """Idempotent calls whose request body can be sent again"""
+        content = kwargs.get("content")
+        return (
+            self.max_retries > 0
+            and method.upper() in IDEMPOTENT_METHODS
+            and (content is None or isinstance(content, (bytes, str)))
+        )
+
+    def budget(self, server_name: str) -> RetryBudget:
+        budget = self.budgets.get(server_name)
+        if budget is None:
+            budget = self.budgets[server_name] = RetryBudget(self.budget_ratio, self.budget_min_per_second)
+        return budget
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential delay before retry number ``attempt`` (from 0)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
@@ -0,0 +1,158 @@
+"""
+Health scheduler - Adaptive, jittered health probing of MCP servers
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Health response fields that identify a particular server build or process
+FINGERPRINT_FIELDS = ("version", "instance_id", "started_at", "capabilities_version")
+
+def health_fingerprint(response) -> Optional[str]:
+    """Identify the server instance behind a health response, if it says"""
+    if "etag" in response.headers:
+        return response.headers["etag"]
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    return "|".join(str(data[field]) for field in FINGERPRINT_FIELDS if field in data) or None
+
+@dataclass
+class ProbeState:
+    next_due: float = 0.0
+    consecutive_failures: int = 0
+    consecutive_successes: int = 0
+    probing: bool = False
+    healthy: Optional[bool] = None
+    fingerprint: Optional[Tuple[Optional[str], ...]] = None
+    capabilities_stale: bool = True
+
+class HealthScheduler:
+    """Schedules health checks per server instead of on one global beat
+
+    Failing servers are re-probed quickly with exponential backoff up to the
+    base interval, servers that keep passing are probed less and less often
+    up to the max interval, every interval is jittered, and no more than
+    ``max_concurrency`` probes run at once. Capabilities are re-discovered
+    only when a server (re)appears or its health fingerprint changes.
+    """
+
+    def __init__(self, gateway: Any, base_interval: float = 60.0, min_interval: float = 5.0,
+                 max_interval: float = 300.0, stable_after: int = 3, jitter: float = 0.2,
+                 max_concurrency: int = 4):
+        self.gateway = gateway
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.stable_after = stable_after
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.states: Dict[str, ProbeState] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def from_env(cls, gateway: Any) -> "HealthScheduler":
+        """Build a scheduler from GATEWAY_HEALTH_* settings"""
+        return cls(
+            gateway,
+            base_interval=float(os.getenv("GATEWAY_HEALTH_INTERVAL", 60.0)),
+            min_interval=float(os.getenv("GATEWAY_HEALTH_MIN_INTERVAL", 5.0)),
+            max_interval=float(os.getenv("GATEWAY_HEALTH_MAX_INTERVAL", 300.0)),
+            jitter=float(os.getenv("GATEWAY_HEALTH_JITTER", 0.2)),
+            max_concurrency=int(os.getenv("GATEWAY_HEALTH_CONCURRENCY", 4)),
+        )
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def interval_for(self, state: ProbeState) -> float:
+        """Jittered delay until the next probe of a server"""
+        if state.consecutive_failures:
+            interval = min(self.base_interval, self.min_interval * 2 ** (state.consecutive_failures - 1))
+        elif state.consecutive_successes > self.stable_after:
+            stable_for = min(state.consecutive_successes - self.stable_after, 16)
+            interval = min(self.max_interval, self.base_interval * 2 ** stable_for)
+        else:
+            interval = self.base_interval
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _sync_states(self):
+        """Track servers added to or removed from the registry"""
+        for name in self.gateway.servers:
+            self.states.setdefault(name, ProbeState())
+        for name in list(self.states):
+            if name not in self.gateway.servers:
+                del self.states[name]
+
+    async def probe(self, name: str):
+        """Health-check one server and re-discover capabilities if it changed"""
+        server = self.gateway.servers.get(name)
+        state = self.states.setdefault(name, ProbeState())
+        if server is None:
+            return
+
+        state.probing = True
+        try:
+            async with self.semaphore:
+                healthy = await self.gateway.health_check_server(server)
+                fingerprint = tuple(self.gateway.health_fingerprints.get(r.url) for r in server.replicas)
+
+                recovered = healthy and state.healthy is not True
+                changed = fingerprint != state.fingerprint
+                if healthy and (recovered or changed or state.capabilities_stale):
+                    state.capabilities_stale = not await self.gateway.discover_capabilities(server)
+
+            state.healthy = healthy
+            state.fingerprint = fingerprint
+            if healthy:
+                state.consecutive_failures = 0
+                state.consecutive_successes += 1
+            else:
+                state.consecutive_successes = 0
+                state.consecutive_failures += 1
+        except Exception as e:
+            logger.warning(f"Health probe for {name} failed: {e}")
+        finally:
+            state.probing = False
+            state.next_due = time.monotonic() + self.interval_for(state)
+
+    async def probe_all(self):
+        """Probe every server now, still bounded by the concurrency cap"""
+        self._sync_states()
+        await asyncio.gather(*(self.probe(name) for name in list(self.states)), return_exceptions=True)
+
+    async def run(self):
+        """Probe servers as they fall due, forever"""
+        try:
+            while True:
+                self._sync_states()
+                now = time.monotonic()
+                for name, state in self.states.items():
+                    if not state.probing and state.next_due <= now:
+                        state.probing = True
+                        task = asyncio.create_task(self.probe(name))
+                        self._tasks.add(task)
+                        task.add_done_callback(self._tasks.discard)
+
+                pending = [s.next_due for s in self.states.values() if not s.probing]
+                # Wake at least every second to notice registry changes
+                delay = min([1.0] + [due - now for due in pending])
+                await asyncio.sleep(max(delay, 0.05))
+        finally:
+            for task in self._tasks:
+                task.cancel()
@@ -0,0 +1,213 @@
+"""
+Shared state - One worker probes MCP servers and publishes the results to the others
+"""
+
+import os
+import json
+import time
+import socket
+import asyncio
+import logging
+import tempfile
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+class LocalStore:
+    """Single-process store, this worker is always the leader"""
+
+    async def acquire_leadership(self) -> bool:
+        return True
+
+    async def publish(self, state: Dict[str, Any]):
+        pass
+
+    async def fetch(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    async def close(self):
+        pass
+
+class FileStore:
+    """Store for workers on one host, backed by files in a shared directory
+
+    Leadership is an exclusive ``flock`` on a lock file, released by the OS
+    when the leader exits. The state is a JSON file replaced atomically, put
+    in /dev/shm by default so it lives in shared memory.
+    """
+
+    def __init__(self, directory: str):
+        self.lock_path = os.path.join(directory, "mcp-gateway.lock")
+        self.state_path = os.path.join(directory, "mcp-gateway-state.json")
+        self.lock_file = None
+
+    async def acquire_leadership(self) -> bool:
+        import fcntl
+
+        if self.lock_file is not None:
+            return True
+
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+
+    async def publish(self, state: Dict[str, Any]):
+        directory = os.path.dirname(self.state_path)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".mcp-gateway-state")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    async def fetch(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    async def close(self):
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+
+# Extend the leader key only if this worker still owns it
+RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+class RedisStore:
+    """Networked store, leadership is a Redis key with a TTL the leader keeps renewing"""
+
+    def __init__(self, url: str, prefix: str = "mcp-gateway", lease: float = 10.0):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.leader_key = f"{prefix}:leader"
+        self.state_key = f"{prefix}:state"
+        self.lease_ms = int(lease * 1000)
+
+    async def acquire_leadership(self) -> bool:
+        if await self.redis.set(self.leader_key, WORKER_ID, nx=True, px=self.lease_ms):
+            return True
+        return bool(await self.redis.eval(RENEW_SCRIPT, 1, self.leader_key, WORKER_ID, self.lease_ms))
+
+    async def publish(self, state: Dict[str, Any]):
+        await self.redis.set(self.state_key, json.dumps(state))
+
+    async def fetch(self) -> Optional[Dict[str, Any]]:
+        data = await self.redis.get(self.state_key)
+        return json.loads(data) if data else None
+
+    async def close(self):
+        await self.redis.aclose()
+
+def create_store():
+    """Build the state store selected by GATEWAY_STATE_BACKEND"""
+    backend = os.getenv("GATEWAY_STATE_BACKEND", "")
+    if not backend:
+        backend = "file" if int(os.getenv("GATEWAY_WORKERS", 1)) > 1 else "local"
+
+    if backend == "file":
+        default_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        return FileStore(os.getenv("GATEWAY_STATE_DIR", default_dir))
+    if backend == "redis":
+        return RedisStore(
+            os.getenv("GATEWAY_REDIS_URL", "redis://redis:6379/0"),
+            lease=float(os.getenv("GATEWAY_LEADER_LEASE", 10.0)),
+        )
+    return LocalStore()
+
+class StateCoordinator:
+    """Runs health probing on the leader worker and mirrors its results elsewhere
+
+    Every ``interval`` seconds each worker tries to take or keep leadership.
+    The leader runs the health scheduler and publishes server status and
+    capabilities, followers stop any scheduler they ran and apply the
+    published state to their own registry.
+    """
+
+    def __init__(self, gateway: Any, store, interval: float = 2.0):
+        self.gateway = gateway
+        self.store = store
+        self.interval = interval
+        self.is_leader = False
+        self.published_at: Optional[float] = None
+        self._scheduler_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_env(cls, gateway: Any) -> "StateCoordinator":
+        return cls(gateway, create_store(), interval=float(os.getenv("GATEWAY_STATE_SYNC_INTERVAL", 2.0)))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "leader": WORKER_ID,
+            "published_at": time.time(),
+            "servers": {
+                name: {
+                    "status": server.status,
+                    "capabilities": server.capabilities,
+                    "replicas": {replica.url: replica.status for replica in server.replicas},
+                }
+                for name, server in self.gateway.servers.items()
+            },
+        }
+
+    def apply(self, state: Dict[str, Any]):
+        """Mirror the leader's view onto the servers this worker knows"""
+        self.published_at = state.get("published_at")
+        for name, published in state.get("servers", {}).items():
+            server = self.gateway.servers.get(name)
+            if server is None:
+                continue
+            self.gateway.update_server_state(
+                server,
+                status=published["status"],
+                capabilities=published["capabilities"],
+                replica_status=published["replicas"],
+            )
+
+    async def step(self):
+        """Run one election and publish or fetch round"""
+        if await self.store.acquire_leadership():
+            if not self.is_leader:
+                logger.info(f"Worker {WORKER_ID} is now the health check leader")
+                self.is_leader = True
+                await self.gateway.refresh_server_status()
+                self._scheduler_task = asyncio.create_task(self.gateway.scheduler.run())
+            await self.store.publish(self.snapshot())
+            return
+
+        if self.is_leader:
+            logger.info(f"Worker {WORKER_ID} lost health check leadership")
+            self.is_leader = False
+        if self._scheduler_task is not None:
+            self._scheduler_task.cancel()
+            self._scheduler_task = None
+
+        state = await self.store.fetch()
+        if state:
+            self.apply(state)
+
+    async def run(self):
+        """Keep electing and syncing forever"""
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.step()
+                except Exception as e:
+                    logger.warning(f"Shared state sync failed: {e}")
+        finally:
+            if self._scheduler_task is not None:
+                self._scheduler_task.cancel()
+            await self.store.close()
@@ -0,0 +1,99 @@
+"""
+Single-flight - Coalesce concurrent identical upstream reads into one call
+"""
+
+import os
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, Tuple
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+FlightKey = Tuple[str, str, str, str, Tuple[Tuple[str, str], ...]]
+
+# Headers that can change the upstream answer and therefore split flights
+DEFAULT_KEY_HEADERS = "accept,accept-encoding,authorization,cookie"
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one in-flight call
+
+    The first caller (the leader) runs the call, every caller arriving while
+    it is in flight awaits the same result or exception. If the leader is
+    cancelled, a waiting caller takes over and runs the call itself. A call
+    returning None has nothing to share, its waiters get None back.
+    """
+
+    def __init__(self, key_headers: FrozenSet[str], max_body_bytes: int = 1024 * 1024):
+        self.key_headers = key_headers
+        # Larger responses are streamed to the leader instead of shared
+        self.max_body_bytes = max_body_bytes
+        self.flights: Dict[FlightKey, asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["SingleFlight"]:
+        """Build from GATEWAY_COALESCE_* settings, None when disabled"""
+        if os.getenv("GATEWAY_COALESCE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+
+        headers = os.getenv("GATEWAY_COALESCE_HEADERS", DEFAULT_KEY_HEADERS)
+        return cls(
+            frozenset(h.strip().lower() for h in headers.split(",") if h.strip()),
+            max_body_bytes=int(os.getenv("GATEWAY_COALESCE_MAX_BYTES", 1024 * 1024)),
+        )
+
+    def key(self, server: str, method: str, path: str, params: Dict[str, str],
+            headers: Dict[str, str]) -> FlightKey:
+        """Build a flight key from the request parts that affect its response"""
+        return (
+            server,
+            method.upper(),
+            "/" + path.lstrip("/"),
+            urlencode(sorted(params.items())),
+            tuple(sorted((k.lower(), v) for k, v in headers.items() if k.lower() in self.key_headers)),
+        )
+
+    async def do(self, key: FlightKey, call: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Run ``call`` unless an identical one is already in flight
+
+        Returns the result and whether it was shared from another caller,
+        only shared results and exceptions count as coalesced.
+        """
+        flight = self.flights.get(key)
+        if flight is not None:
+            # asyncio.wait doesn't propagate the leader's cancellation to us
+            await asyncio.wait([flight])
+            if flight.cancelled():
+                return await self.do(key, call)
+            if flight.exception() is None and flight.result() is None:
+                return None, False
+            self.coalesced += 1
+            return flight.result(), True
+
+        flight = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting, so don't warn about unretrieved exceptions
+        flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.flights[key] = flight
+        self.leaders += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result, False
+        finally:
+            del self.flights[key]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self.flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,59 @@
+"""
+Registry snapshots - Pre-serialized registry views served with ETags
+"""
+
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from starlette.responses import Response
+
+from registry import MCPServerInfo
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    def dumps(data: Any) -> bytes:
+        return orjson.dumps(data)
+except ImportError:
+    def dumps(data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode()
+
+# Outstanding request counts change with every request, live load is in /metrics
+SNAPSHOT_EXCLUDE = {"replicas": {"__all__": {"outstanding"}}}
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+class RegistrySnapshot:
+    """Immutable serialized view of the registry for the polled read endpoints
+
+    Each body gets an ETag derived from its content, so a rebuild that
+    changes nothing a client sees keeps its ETag, and a change to one server
+    leaves the other servers' ETags alone.
+    """
+
+    def __init__(self, servers: Mapping[str, MCPServerInfo], info: Dict[str, Any]):
+        dumped = {name: server.model_dump(exclude=SNAPSHOT_EXCLUDE) for name, server in servers.items()}
+        self.servers: Dict[str, Tuple[bytes, str]] = {}
+        for name, data in dumped.items():
+            body = dumps(data)
+            self.servers[name] = (body, etag_for(body))
+
+        body = dumps({"servers": dumped, "total": len(dumped)})
+        self.listing = (body, etag_for(body))
+        body = dumps({**info, "servers": len(dumped)})
+        self.info = (body, etag_for(body))
+
+    @staticmethod
+    def respond(entry: Tuple[bytes, str], if_none_match: Optional[str]) -> Response:
+        """The body, or a 304 when the client already holds this version"""
+        body, etag = entry
+        headers = {"etag": etag, "cache-control": "no-cache"}
+        if if_none_match and (if_none_match.strip() == "*" or etag in
+                              [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,278 @@
+"""
+Tracing - W3C trace context propagation and per-hop spans exported as OTLP JSON
+"""
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from starlette.datastructures import Headers
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_PATTERN = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+_current: ContextVar[Optional["Span"]] = ContextVar("span", default=None)
+
+def otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+@dataclass
+class Span:
+    tracer: "Tracer"
+    name: str
+    trace_id: str
+    parent_id: Optional[str] = None
+    kind: int = SPAN_KIND_INTERNAL
+    sampled: bool = True
+    tracestate: Optional[str] = None
+    span_id: str = field(default_factory=lambda: os.urandom(8).hex())
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    # Timestamps of upstream exchange phases, from httpcore trace events
+    marks: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def child(self, name: str, kind: int = SPAN_KIND_INTERNAL, start_ns: Optional[int] = None, **attributes) -> "Span":
+        return Span(
+            tracer=self.tracer,
+            name=name,
+            trace_id=self.trace_id,
+            parent_id=self.span_id,
+            kind=kind,
+            sampled=self.sampled,
+            tracestate=self.tracestate,
+            start_ns=start_ns or time.time_ns(),
+            attributes=attributes,
+        )
+
+    def end(self, end_ns: Optional[int] = None, error: Optional[str] = None):
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns or time.time_ns()
+        self.error = error
+        self.tracer.record(self)
+
+    def trace_hook(self) -> Callable:
+        """httpcore ``trace`` extension marking when request headers go out and response headers arrive"""
+        async def trace(event_name: str, info: Dict[str, Any]):
+            if event_name.endswith(".send_request_headers.started"):
+                self.marks.setdefault("request_sent", time.time_ns())
+            elif event_name.endswith(".receive_response_headers.complete"):
+                self.marks.setdefault("first_byte", time.time_ns())
+        return trace
+
+    def end_exchange(self, error: Optional[str] = None):
+        """End an upstream span, split into connection, time-to-first-byte and body phases
+
+        The connection phase covers waiting for a pooled connection and
+        connecting, it ends when the request headers are written.
+        """
+        end_ns = time.time_ns()
+        request_sent = self.marks.get("request_sent")
+        first_byte = self.marks.get("first_byte")
+        if request_sent:
+            self.child("connection", start_ns=self.start_ns).end(request_sent)
+        if first_byte:
+            self.child("ttfb", start_ns=request_sent or self.start_ns).end(first_byte)
+            self.child("body", start_ns=first_byte).end(end_ns)
+        self.end(end_ns, error)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": otlp_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.tracestate:
+            span["traceState"] = self.tracestate
+        return span
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+def start_span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes) -> Optional[Span]:
+    """A child of the current request's span, None when the request isn't traced"""
+    parent = _current.get()
+    return parent.child(name, kind, **attributes) if parent is not None else None
+
+class Tracer:
+    """Buffers finished spans and exports them in batches
+
+    ``exporter`` is ``otlp`` (OTLP/HTTP JSON POSTed to ``endpoint``) or
+    ``file`` (one OTLP JSON document per line appended to ``path``).
+    Incoming sampling decisions are honoured, new traces are sampled at
+    ``sample_rate``.
+    """
+
+    def __init__(self, exporter: str, endpoint: str = "", path: str = "", headers: Optional[Dict[str, str]] = None,
+                 sample_rate: float = 1.0, interval: float = 5.0, max_pending: int = 10000,
+                 service_name: str = "mcp-gateway"):
+        self.exporter = exporter
+        self.endpoint = endpoint
+        self.path = path
+        self.headers = headers or {}
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_pending = max_pending
+        self.service_name = service_name
+        self.pending: List[Span] = []
+        self.dropped = 0
+        self.client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["Tracer"]:
+        """Build a tracer from GATEWAY_TRACING_* variables, None when tracing is off"""
+        exporter = os.getenv("GATEWAY_TRACING_EXPORTER", "").lower()
+        if exporter not in ("otlp", "file"):
+            return None
+
+        headers = {}
+        for pair in os.getenv("GATEWAY_OTLP_HEADERS", "").split(","):
+            if "=" in pair:
+                key, value = pair.split("=", 1)
+                headers[key.strip()] = value.strip()
+        return cls(
+            exporter,
+            endpoint=os.getenv("GATEWAY_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"),
+            path=os.getenv("GATEWAY_TRACE_FILE", "/tmp/mcp-gateway-traces.jsonl"),
+            headers=headers,
+            sample_rate=float(os.getenv("GATEWAY_TRACE_SAMPLE_RATE", 1.0)),
+            interval=float(os.getenv("GATEWAY_TRACE_EXPORT_INTERVAL", 5.0)),
+            service_name=os.getenv("GATEWAY_SERVICE_NAME", "mcp-gateway"),
+        )
+
+    def start_request(self, name: str, traceparent: Optional[str], tracestate: Optional[str]) -> Span:
+        """Server span for an incoming request, continuing the caller's trace if it sent one"""
+        match = TRACEPARENT_PATTERN.match((traceparent or "").strip().lower())
+        if match and match.group(1) != "ff" and set(match.group(2)) != {"0"} and set(match.group(3)) != {"0"}:
+            return Span(
+                tracer=self,
+                name=name,
+                trace_id=match.group(2),
+                parent_id=match.group(3),
+                kind=SPAN_KIND_SERVER,
+                sampled=bool(int(match.group(4), 16) & 1),
+                tracestate=tracestate,
+            )
+        return Span(
+            tracer=self,
+            name=name,
+            trace_id=os.urandom(16).hex(),
+            kind=SPAN_KIND_SERVER,
+            sampled=random.random() < self.sample_rate,
+        )
+
+    def record(self, span: Span):
+        if not span.sampled:
+            return
+        if len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self.pending.append(span)
+
+    def _document(self, spans: List[Span]) -> Dict[str, Any]:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": otlp_value(self.service_name)}]},
+                "scopeSpans": [{"scope": {"name": "mcp-gateway"}, "spans": [s.to_otlp() for s in spans]}],
+            }]
+        }
+
+    def _append(self, document: Dict[str, Any]):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(document) + "\n")
+
+    async def flush(self):
+        """Export every finished span"""
+        spans, self.pending = self.pending, []
+        if not spans:
+            return
+        document = self._document(spans)
+        if self.exporter == "file":
+            await asyncio.to_thread(self._append, document)
+            return
+        if self.client is None:
+            self.client = httpx.AsyncClient(timeout=10.0)
+        response = await self.client.post(self.endpoint, json=document, headers=self.headers)
+        response.raise_for_status()
+
+    async def run(self):
+        """Export periodically forever"""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"Trace export failed: {e}")
+
+    async def aclose(self):
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Trace export failed: {e}")
+        if self.client is not None:
+            await self.client.aclose()
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per request from its ``traceparent``"""
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        span = self.tracer.start_request(
+            f"{scope['method']} {scope['path']}", headers.get("traceparent"), headers.get("tracestate")
+        )
+        span.attributes.update({"http.request.method": scope["method"], "url.path": scope["path"]})
+        status_code = 500
+
+        async def send_traced(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        token = _current.set(span)
+        try:
+            await self.app(scope, receive, send_traced)
+        finally:
+            _current.reset(token)
+            span.attributes["http.response.status_code"] = status_code
+            span.end(error=f"HTTP {status_code}" if status_code >= 500 else None)
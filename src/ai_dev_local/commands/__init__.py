@@ -0,0 +1 @@
+"""Command groups loaded on demand by ai_dev_local.cli."""
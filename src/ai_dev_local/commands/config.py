@@ -0,0 +1,389 @@
+import click
+import subprocess
+import sys
+
+@click.group()
+def config():
+    """Manage configuration and .env file."""
+    pass
+
+@config.command()
+def init():
+    """Initialize .env file from .env.example template."""
+    import os
+    import shutil
+    
+    env_example = '.env.example'
+    env_file = '.env'
+    
+    if not os.path.exists(env_example):
+        click.echo("❌ .env.example file not found", err=True)
+        sys.exit(1)
+    
+    if os.path.exists(env_file):
+        if not click.confirm(f"⚠️  {env_file} already exists. Overwrite?"):
+            click.echo("✅ Configuration initialization cancelled")
+            return
+    
+    try:
+        shutil.copy2(env_example, env_file)
+        click.echo(f"✅ Created {env_file} from {env_example}")
+        click.echo("\n📝 Next steps:")
+        click.echo("  1. Edit .env file with your API keys and settings")
+        click.echo("  2. Use 'ai-dev-local config set' to update specific values")
+        click.echo("  3. Use 'ai-dev-local config show' to view current settings")
+    except Exception as e:
+        click.echo(f"❌ Failed to create .env file: {e}", err=True)
+        sys.exit(1)
+
+@config.command()
+@click.argument('key')
+@click.argument('value')
+def set(key, value):
+    """Set a configuration value in .env file."""
+    import os
+    import re
+    
+    env_file = '.env'
+    
+    if not os.path.exists(env_file):
+        if click.confirm("📝 .env file doesn't exist. Create it from template?"):
+            ctx = click.get_current_context()
+            ctx.invoke(init)
+        else:
+            click.echo("❌ .env file is required", err=True)
+            sys.exit(1)
+    
+    try:
+        # Read current .env file
+        with open(env_file, 'r') as f:
+            content = f.read()
+        
+        lines = content.split('\n')
+        key_found = False
+        updated_lines = []
+        
+        # Process each line to find and update the key
+        for line in lines:
+            # Check if this line contains our key (handle comments and whitespace)
+            if re.match(rf'^\s*{re.escape(key)}\s*=', line):
+                # Preserve any inline comments
+                if '#' in line and '=' in line:
+                    # Split on = first, then check for # in the value part
+                    key_part, value_part = line.split('=', 1)
+                    if '#' in value_part:
+                        # Preserve the comment
+                        comment_match = re.search(r'\s*#(.*)$', value_part)
+                        if comment_match:
+                            comment = comment_match.group(1)
+                            updated_lines.append(f"{key}={value}  # {comment}")
+                        else:
+                            updated_lines.append(f"{key}={value}")
+                    else:
+                        updated_lines.append(f"{key}={value}")
+                else:
+                    updated_lines.append(f"{key}={value}")
+                key_found = True
+            else:
+                updated_lines.append(line)
+        
+        # If key not found, add it in appropriate section or at the end
+        if not key_found:
+            # Try to find appropriate section to add the key
+            section_added = False
+            
+            # Define key categories for intelligent placement
+            api_keys = ['OPENAI_API_KEY', 'ANTHROPIC_API_KEY', 'GEMINI_API_KEY', 'COHERE_API_KEY']
+            host_port_keys = ['HOST', 'POSTGRES_PORT', 'REDIS_PORT', 'LANGFUSE_PORT', 'FLOWISE_PORT', 
+                             'OPENWEBUI_PORT', 'LITELLM_PORT', 'OLLAMA_PORT', 'DASHBOARD_PORT', 'MKDOCS_PORT']
+            
+            if key in api_keys:
+                # Add to LLM Provider API Keys section
+                for i, line in enumerate(updated_lines):
+                    if '# LLM Provider API Keys' in line:
+                        # Find the end of this section
+                        j = i + 1
+                        while j < len(updated_lines) and not updated_lines[j].startswith('# ============='):
+                            j += 1
+                        # Insert before the next section
+                        updated_lines.insert(j - 1, f"{key}={value}")
+                        section_added = True
+                        break
+            elif key in host_port_keys:
+                # Add to Host and Port Configuration section
+                for i, line in enumerate(updated_lines):
+                    if '# Host and Port Configuration' in line:
+                        # Find the end of this section
+                        j = i + 1
+                        while j < len(updated_lines) and not updated_lines[j].startswith('# ============='):
+                            j += 1
+                        # Insert before the next section
+                        updated_lines.insert(j - 1, f"{key}={value}")
+                        section_added = True
+                        break
+            
+            # If no appropriate section found, add at the end with a comment
+            if not section_added:
+                updated_lines.extend([
+                    '',
+                    '# Added by ai-dev-local config',
+                    f'{key}={value}'
+                ])
+        
+        # Write back to file
+        with open(env_file, 'w') as f:
+            f.write('\n'.join(updated_lines))
+        
+        click.echo(f"✅ Set {key}={value}")
+        
+    except Exception as e:
+        click.echo(f"❌ Failed to update .env file: {e}", err=True)
+        sys.exit(1)
+
+@config.command()
+@click.argument('key', required=False)
+def show(key):
+    """Show configuration values from .env file."""
+    import os
+    
+    env_file = '.env'
+    
+    if not os.path.exists(env_file):
+        click.echo("❌ .env file not found. Run 'ai-dev-local config init' first.", err=True)
+        sys.exit(1)
+    
+    try:
+        with open(env_file, 'r') as f:
+            lines = f.readlines()
+        
+        if key:
+            # Show specific key
+            for line in lines:
+                if line.strip().startswith(f"{key}="):
+                    value = line.split('=', 1)[1].strip()
+                    # Mask sensitive values
+                    if any(sensitive in key.upper() for sensitive in ['KEY', 'SECRET', 'PASSWORD', 'TOKEN']):
+                        if value and value != 'your-api-key-here' and not value.startswith('*'):
+                            masked_value = value[:8] + '*' * (len(value) - 8) if len(value) > 8 else '*' * len(value)
+                            click.echo(f"{key}={masked_value}")
+                        else:
+                            click.echo(f"{key}={value}")
+                    else:
+                        click.echo(f"{key}={value}")
+                    return
+            click.echo(f"❌ Key '{key}' not found in .env file")
+        else:
+            # Show all non-empty, non-comment lines
+            click.echo("📋 Current configuration:")
+            click.echo("=" * 50)
+            
+            for line in lines:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key_part, value_part = line.split('=', 1)
+                    # Mask sensitive values
+                    if any(sensitive in key_part.upper() for sensitive in ['KEY', 'SECRET', 'PASSWORD', 'TOKEN']):
+                        if value_part and value_part != 'your-api-key-here' and not value_part.startswith('*'):
+                            masked_value = value_part[:8] + '*' * (len(value_part) - 8) if len(value_part) > 8 else '*' * len(value_part)
+                            click.echo(f"{key_part}={masked_value}")
+                        else:
+                            click.echo(f"{key_part}={value_part}")
+                    else:
+                        click.echo(f"{key_part}={value_part}")
+            
+    except Exception as e:
+        click.echo(f"❌ Failed to read .env file: {e}", err=True)
+        sys.exit(1)
+
+@config.command()
+def validate():
+    """Validate .env file configuration."""
+    import os
+    
+    env_file = '.env'
+    
+    if not os.path.exists(env_file):
+        click.echo("❌ .env file not found. Run 'ai-dev-local config init' first.", err=True)
+        sys.exit(1)
+    
+    try:
+        # Define required and optional keys with their categories
+        required_keys = {
+            'OPENAI_API_KEY': 'OpenAI API access',
+            'WEBUI_SECRET_KEY': 'Open WebUI security',
+            'LITELLM_MASTER_KEY': 'LiteLLM proxy access'
+        }
+        
+        optional_keys = {
+            'ANTHROPIC_API_KEY': 'Claude models',
+            'GEMINI_API_KEY': 'Google Gemini models',
+            'COHERE_API_KEY': 'Cohere models',
+            'LANGFUSE_PUBLIC_KEY': 'Langfuse observability',
+            'LANGFUSE_SECRET_KEY': 'Langfuse observability'
+        }
+        
+        # Read .env file
+        env_vars = {}
+        with open(env_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    env_vars[key.strip()] = value.strip()
+        
+        click.echo("🔍 Validating configuration...")
+        click.echo("=" * 50)
+        
+        all_valid = True
+        
+        # Check required keys
+        click.echo("\n📋 Required Settings:")
+        for key, description in required_keys.items():
+            value = env_vars.get(key, '')
+            if not value or value in ['your-api-key-here', '*' * 20]:
+                click.echo(f"  ❌ {key}: Missing or placeholder ({description})")
+                all_valid = False
+            else:
+                click.echo(f"  ✅ {key}: Configured ({description})")
+        
+        # Check optional keys
+        click.echo("\n🔧 Optional Settings:")
+        for key, description in optional_keys.items():
+            value = env_vars.get(key, '')
+            if not value or value in ['your-api-key-here', '*' * 20]:
+                click.echo(f"  ⚠️  {key}: Not configured ({description})")
+            else:
+                click.echo(f"  ✅ {key}: Configured ({description})")
+        
+        # Summary
+        click.echo("\n" + "=" * 50)
+        if all_valid:
+            click.echo("✅ Configuration is valid! All required settings are present.")
+        else:
+            click.echo("❌ Configuration needs attention. Please set the missing required values.")
+            click.echo("\n💡 Use 'ai-dev-local config set KEY VALUE' to update settings")
+        
+    except Exception as e:
+        click.echo(f"❌ Failed to validate .env file: {e}", err=True)
+        sys.exit(1)
+
+@config.command()
+@click.option('--category', '-c', help='Show only variables from specific category (api-keys, ports, services, mcp)')
+def list(category):
+    """List configuration variables by category."""
+    import os
+    
+    env_file = '.env'
+    
+    if not os.path.exists(env_file):
+        click.echo("❌ .env file not found. Run 'ai-dev-local config init' first.", err=True)
+        sys.exit(1)
+    
+    # Define categories
+    categories = {
+        'api-keys': {
+            'title': '🔑 LLM Provider API Keys',
+            'keys': ['OPENAI_API_KEY', 'ANTHROPIC_API_KEY', 'GEMINI_API_KEY', 'COHERE_API_KEY']
+        },
+        'ports': {
+            'title': '🌐 Host and Port Configuration',
+            'keys': ['HOST', 'POSTGRES_PORT', 'REDIS_PORT', 'LANGFUSE_PORT', 'FLOWISE_PORT', 
+                    'OPENWEBUI_PORT', 'LITELLM_PORT', 'OLLAMA_PORT', 'DASHBOARD_PORT', 'MKDOCS_PORT']
+        },
+        'services': {
+            'title': '⚙️ Service Configuration',
+            'keys': ['TELEMETRY_ENABLED', 'DEBUG', 'LOG_LEVEL', 'WEBUI_SECRET_KEY', 'WEBUI_JWT_SECRET_KEY',
+                    'LITELLM_MASTER_KEY', 'DASHBOARD_TITLE', 'OLLAMA_AUTO_PULL_MODELS', 'OLLAMA_GPU']
+        },
+        'mcp': {
+            'title': '🤖 MCP (Model Context Protocol)',
+            'keys': ['GIT_AUTHOR_NAME', 'GIT_AUTHOR_EMAIL', 'TIMEZONE', 'GITHUB_PERSONAL_ACCESS_TOKEN',
+                    'GITLAB_TOKEN', 'SONARQUBE_URL', 'SONARQUBE_TOKEN']
+        }
+    }
+    
+    try:
+        # Read .env file
+        env_vars = {}
+        with open(env_file, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#') and '=' in line:
+                    key, value = line.split('=', 1)
+                    env_vars[key.strip()] = value.strip()
+        
+        if category:
+            # Show specific category
+            if category not in categories:
+                click.echo(f"❌ Unknown category '{category}'. Available: {', '.join(categories.keys())}")
+                sys.exit(1)
+            
+            cat_info = categories[category]
+            click.echo(f"{cat_info['title']}")
+            click.echo("=" * 50)
+            
+            for key in cat_info['keys']:
+                value = env_vars.get(key, 'Not set')
+                # Mask sensitive values
+                if any(sensitive in key.upper() for sensitive in ['KEY', 'SECRET', 'PASSWORD', 'TOKEN']):
+                    if value != 'Not set' and value != 'your-api-key-here' and not value.startswith('*'):
+                        masked_value = value[:8] + '*' * (len(value) - 8) if len(value) > 8 else '*' * len(value)
+                        click.echo(f"  {key} = {masked_value}")
+                    else:
+                        click.echo(f"  {key} = {value}")
+                else:
+                    click.echo(f"  {key} = {value}")
+        else:
+            # Show all categories
+            for cat_name, cat_info in categories.items():
+                click.echo(f"\n{cat_info['title']}")
+                click.echo("=" * 50)
+                
+                for key in cat_info['keys']:
+                    value = env_vars.get(key, 'Not set')
+                    # Mask sensitive values
+                    if any(sensitive in key.upper() for sensitive in ['KEY', 'SECRET', 'PASSWORD', 'TOKEN']):
+                        if value != 'Not set' and value != 'your-api-key-here' and not value.startswith('*'):
+                            masked_value = value[:8] + '*' * (len(value) - 8) if len(value) > 8 else '*' * len(value)
+                            click.echo(f"  {key} = {masked_value}")
+                        else:
+                            click.echo(f"  {key} = {value}")
+                    else:
+                        click.echo(f"  {key} = {value}")
+            
+            click.echo("\n💡 Use --category to filter by: " + ", ".join(categories.keys()))
+    
+    except Exception as e:
+        click.echo(f"❌ Failed to read .env file: {e}", err=True)
+        sys.exit(1)
+
+@config.command()
+def edit():
+    """Open .env file in default editor."""
+    import os
+    
+    env_file = '.env'
+    
+    if not os.path.exists(env_file):
+        if click.confirm("📝 .env file doesn't exist. Create it from template?"):
+            ctx = click.get_current_context()
+            ctx.invoke(init)
+        else:
+            click.echo("❌ .env file is required", err=True)
+            sys.exit(1)
+    
+    # Try to open with various editors
+    editors = [os.getenv('EDITOR'), 'code', 'nano', 'vim', 'vi']
+    
+    for editor in editors:
+        if editor:
+            try:
+                click.echo(f"📝 Opening .env file with {editor}...")
+                subprocess.run([editor, env_file], check=True)
+                return
+            except (subprocess.CalledProcessError, FileNotFoundError):
+                continue
+    
+    # Fallback: show instructions
+    click.echo("📝 Please edit the .env file manually:")
+    click.echo(f"   {os.path.abspath(env_file)}")
@@ -0,0 +1,328 @@
+import click
+import sys
+
+@click.group()
+def ollama():
+    """Manage Ollama local LLM server."""
+    pass
+
+def _echo_raw(text):
+    click.echo(text, nl=False)
+
+def _ollama_exec(cmd):
+    """Run a command in the Ollama container, streaming its output; returns the exit code."""
+    from ai_dev_local.engine import ComposeEngine, EngineError
+    
+    try:
+        exit_code, _ = ComposeEngine().exec('ollama', cmd, on_output=_echo_raw)
+    except EngineError as e:
+        click.echo(f"❌ {e}", err=True)
+        return 1
+    return exit_code
+
+def _pull_models(model_list, parallel, force):
+    """Pull models through the Ollama API; returns the names of those that failed."""
+    from ai_dev_local.ollama import OllamaClient, OllamaError, PullProgress, pull_models
+    
+    client = OllamaClient()
+    try:
+        client.version()
+    except OllamaError:
+        click.echo("❌ Ollama service is not running. Start it first with: ai-dev-local start --ollama")
+        sys.exit(1)
+    
+    try:
+        results = pull_models(client, model_list, PullProgress(model_list, _echo_raw), parallel=parallel, force=force)
+    except OllamaError as e:
+        click.echo(f"❌ Failed to pull models: {e}", err=True)
+        sys.exit(1)
+    
+    pulled = sum(1 for r in results if r.outcome == 'pulled')
+    skipped = sum(1 for r in results if r.outcome == 'skipped')
+    click.echo(f"📊 {pulled} pulled, {skipped} already up to date, {len(results) - pulled - skipped} failed")
+    return [r.model for r in results if r.outcome == 'failed']
+
+@ollama.command()
+@click.option('--models', help='Comma-separated list of models to pull (e.g., llama2:7b,codellama:7b)')
+@click.option('--parallel', '-p', default=2, show_default=True, type=click.IntRange(min=1), help='Number of models to download at once')
+@click.option('--force', is_flag=True, help='Pull even if the installed version is current')
+def init(models, parallel, force):
+    """Initialize Ollama with common models."""
+    click.echo("🚀 Initializing Ollama...")
+    
+    # Get models to pull
+    if models:
+        model_list = models.split(',')
+    else:
+        import os
+        model_list = os.getenv('OLLAMA_AUTO_PULL_MODELS', 'llama2:7b,codellama:7b,mistral:7b,phi:2.7b').split(',')
+    model_list = [model.strip() for model in model_list if model.strip()]
+    
+    click.echo(f"📥 Pulling models: {', '.join(model_list)}")
+    
+    failed = _pull_models(model_list, parallel, force)
+    if failed:
+        click.echo(f"❌ Failed to pull {', '.join(failed)}", err=True)
+        sys.exit(1)
+    
+    click.echo("🎉 Ollama initialization complete!")
+
+@ollama.command()
+def models():
+    """List available Ollama models."""
+    if _ollama_exec(['ollama', 'list']) != 0:
+        click.echo("❌ Failed to list models. Make sure Ollama is running.", err=True)
+        sys.exit(1)
+
+@ollama.command()
+@click.argument('model', nargs=-1, required=True)
+@click.option('--parallel', '-p', default=2, show_default=True, type=click.IntRange(min=1), help='Number of models to download at once')
+@click.option('--force', is_flag=True, help='Pull even if the installed version is current')
+def pull(model, parallel, force):
+    """Pull one or more Ollama models."""
+    click.echo(f"📥 Pulling model: {', '.join(model)}")
+    failed = _pull_models([m for m in model], parallel, force)
+    if failed:
+        click.echo(f"❌ Failed to pull {', '.join(failed)}", err=True)
+        sys.exit(1)
+    click.echo(f"✅ Successfully pulled {', '.join(model)}")
+
+@ollama.command()
+@click.argument('model')
+def remove(model):
+    """Remove a specific Ollama model."""
+    click.echo(f"🗑️  Removing model: {model}")
+    if _ollama_exec(['ollama', 'rm', model]) != 0:
+        click.echo(f"❌ Failed to remove {model}", err=True)
+        sys.exit(1)
+    click.echo(f"✅ Successfully removed {model}")
+
+@ollama.command('sync-litellm')
+@click.option('--dry-run', is_flag=True, help='Show what would be changed without making modifications')
+@click.option('--backup/--no-backup', default=True, help='Create backup of existing config before changing it (default: true)')
+@click.option('--apply/--no-apply', default=True, help='Apply changes to the running LiteLLM proxy through its model API (default: true)')
+@click.option('--config', 'config_path', default='configs/litellm_config.yaml', show_default=True, help='LiteLLM config file')
+def sync_litellm(dry_run, backup, apply, config_path):
+    """Sync LiteLLM configuration with currently available Ollama models."""
+    import os
+    import yaml
+    from ai_dev_local.ollama import OllamaClient, OllamaError
+    from ai_dev_local.litellm_sync import LiteLLMClient, LiteLLMError, apply_live, env_value, plan_sync, write_config
+    
+    click.echo("🔄 Syncing LiteLLM configuration with Ollama models...")
+    
+    # Get currently installed Ollama models
+    try:
+        ollama_models = sorted(OllamaClient().tags())
+    except OllamaError:
+        click.echo("❌ Ollama service is not running. Start it first with: ai-dev-local start --ollama")
+        sys.exit(1)
+    
+    if not ollama_models:
+        click.echo("⚠️  No Ollama models found. Run 'ai-dev-local ollama init' first.")
+        return
+    
+    click.echo(f"📋 Found {len(ollama_models)} Ollama models: {', '.join(ollama_models)}")
+    
+    # Read current LiteLLM config
+    if not os.path.exists(config_path):
+        click.echo(f"❌ LiteLLM config file not found: {config_path}")
+        sys.exit(1)
+    
+    try:
+        with open(config_path, 'r') as f:
+            config = yaml.safe_load(f) or {}
+    except Exception as e:
+        click.echo(f"❌ Failed to read LiteLLM config: {e}")
+        sys.exit(1)
+    
+    plan = plan_sync(config, ollama_models, env_value('OLLAMA_BASE_URL', 'http://host.docker.internal:11434'))
+    
+    # Show changes
+    click.echo("\n📊 Configuration Changes:")
+    click.echo("=" * 50)
+    for model in plan.removed:
+        click.echo(f"   ➖ {model.get('model_name', 'unnamed')} -> {model['litellm_params']['model']}")
+    for model in plan.added:
+        click.echo(f"   ➕ {model['model_name']} -> {model['litellm_params']['model']}")
+    click.echo(f"   = {len(plan.kept)} Ollama models unchanged")
+    
+    if dry_run:
+        click.echo("\n🔍 DRY RUN - No changes made")
+        click.echo("Run without --dry-run to apply changes")
+        return
+    
+    # Write updated config only when its content actually changes
+    if not plan.changed:
+        click.echo(f"\n✅ {config_path} is already in sync")
+    else:
+        try:
+            backup_path = write_config(config_path, plan.config, backup=backup)
+        except Exception as e:
+            click.echo(f"❌ Failed to write updated config: {e}")
+            sys.exit(1)
+        if backup_path:
+            click.echo(f"💾 Created backup: {backup_path}")
+        click.echo(f"\n✅ Successfully updated {config_path}")
+        click.echo(f"📋 Total models in config: {len(plan.config['model_list'])}")
+        click.echo(f"   • Ollama models: {len(plan.ollama_entries)}")
+        click.echo(f"   • Other models: {len(plan.config['model_list']) - len(plan.ollama_entries)}")
+    
+    if not apply:
+        if plan.changed:
+            click.echo("\n💡 Restart LiteLLM to apply changes:")
+            click.echo("   docker-compose restart litellm")
+        return
+    
+    # Apply to the running proxy, no restart needed
+    try:
+        result = apply_live(LiteLLMClient(), plan)
+    except LiteLLMError as e:
+        click.echo(f"⚠️  Could not update the running LiteLLM proxy: {e}")
+        click.echo("💡 Restart LiteLLM to apply changes:")
+        click.echo("   docker-compose restart litellm")
+        return
+    
+    if result.added or result.removed:
+        click.echo(f"🔌 LiteLLM updated live: {len(result.added)} added, {len(result.removed)} removed")
+    else:
+        click.echo("🔌 LiteLLM proxy already serves these models")
+    for name, error in result.failed:
+        click.echo(f"⚠️  {name}: {error}")
+    if result.failed:
+        click.echo("💡 These changes take effect on the next LiteLLM restart")
+
+@ollama.command('list-available')
+@click.option('--search', '-s', help='Search for models containing this term')
+@click.option('--category', '-c', type=click.Choice(['all', 'popular', 'code', 'embedding', 'vision']), default='popular', help='Filter by model category')
+@click.option('--format', '-f', type=click.Choice(['table', 'list', 'json']), default='table', help='Output format')
+def list_available(search, category, format):
+    """List all available models from Ollama library."""
+    import json
+    import requests
+    from urllib.parse import urlencode
+    
+    click.echo("🔍 Fetching available Ollama models from library...")
+    
+    try:
+        # Note: Ollama library API endpoint may not be publicly available
+        # We'll use a fallback approach with static model data
+        click.echo("📊 Using curated model list (registry API unavailable)")
+        
+        # Curated list of available Ollama models with metadata
+        all_models = [
+            {'name': 'llama2:7b', 'description': 'Meta Llama 2 7B - General purpose model', 'pulls': 1000000, 'tags': ['7b', 'latest']},
+            {'name': 'llama2:13b', 'description': 'Meta Llama 2 13B - Larger general purpose model', 'pulls': 800000, 'tags': ['13b']},
+            {'name': 'llama2:70b', 'description': 'Meta Llama 2 70B - Largest general purpose model', 'pulls': 500000, 'tags': ['70b']},
+            {'name': 'llama3:8b', 'description': 'Meta Llama 3 8B - Latest generation model', 'pulls': 900000, 'tags': ['8b', 'latest']},
+            {'name': 'llama3:70b', 'description': 'Meta Llama 3 70B - Latest large model', 'pulls': 600000, 'tags': ['70b']},
+            {'name': 'codellama:7b', 'description': 'Code Llama 7B - Code generation model', 'pulls': 700000, 'tags': ['7b', 'code']},
+            {'name': 'codellama:13b', 'description': 'Code Llama 13B - Larger code model', 'pulls': 500000, 'tags': ['13b', 'code']},
+            {'name': 'codellama:34b', 'description': 'Code Llama 34B - Large code model', 'pulls': 300000, 'tags': ['34b', 'code']},
+            {'name': 'mistral:7b', 'description': 'Mistral 7B - Fast and efficient model', 'pulls': 800000, 'tags': ['7b', 'instruct']},
+            {'name': 'mistral:instruct', 'description': 'Mistral 7B Instruct - Instruction tuned', 'pulls': 600000, 'tags': ['instruct']},
+            {'name': 'phi:2.7b', 'description': 'Microsoft Phi 2.7B - Small but capable', 'pulls': 400000, 'tags': ['2.7b']},
+            {'name': 'phi3:3.8b', 'description': 'Microsoft Phi 3 3.8B - Latest small model', 'pulls': 350000, 'tags': ['3.8b']},
+            {'name': 'gemma:2b', 'description': 'Google Gemma 2B - Ultra lightweight', 'pulls': 300000, 'tags': ['2b']},
+            {'name': 'gemma:7b', 'description': 'Google Gemma 7B - Lightweight model', 'pulls': 450000, 'tags': ['7b']},
+            {'name': 'qwen:7b', 'description': 'Alibaba Qwen 7B - Multilingual model', 'pulls': 250000, 'tags': ['7b', 'chat']},
+            {'name': 'qwen:14b', 'description': 'Alibaba Qwen 14B - Larger multilingual', 'pulls': 180000, 'tags': ['14b', 'chat']},
+            {'name': 'llava:7b', 'description': 'LLaVA 7B - Vision and language model', 'pulls': 200000, 'tags': ['7b', 'vision']},
+            {'name': 'llava:13b', 'description': 'LLaVA 13B - Larger vision model', 'pulls': 150000, 'tags': ['13b', 'vision']},
+            {'name': 'moondream:1.8b', 'description': 'Moondream 1.8B - Compact vision model', 'pulls': 100000, 'tags': ['1.8b', 'vision']},
+            {'name': 'bakllava:7b', 'description': 'BakLLaVA 7B - Alternative vision model', 'pulls': 80000, 'tags': ['7b', 'vision']},
+            {'name': 'nomic-embed-text', 'description': 'Nomic Embed - Text embedding model', 'pulls': 300000, 'tags': ['embedding']},
+            {'name': 'mxbai-embed-large', 'description': 'MixedBread AI - Large embedding model', 'pulls': 150000, 'tags': ['embedding', 'large']},
+            {'name': 'all-minilm:l6-v2', 'description': 'All MiniLM - Sentence embedding', 'pulls': 200000, 'tags': ['embedding', 'sentence']},
+            {'name': 'codegemma:2b', 'description': 'Google CodeGemma 2B - Code model', 'pulls': 120000, 'tags': ['2b', 'code']},
+            {'name': 'codegemma:7b', 'description': 'Google CodeGemma 7B - Larger code model', 'pulls': 100000, 'tags': ['7b', 'code']},
+            {'name': 'starcoder:1b', 'description': 'StarCoder 1B - Compact code model', 'pulls': 90000, 'tags': ['1b', 'code']},
+            {'name': 'starcoder:3b', 'description': 'StarCoder 3B - Medium code model', 'pulls': 80000, 'tags': ['3b', 'code']},
+            {'name': 'deepseek-coder:1.3b', 'description': 'DeepSeek Coder 1.3B - Efficient code model', 'pulls': 70000, 'tags': ['1.3b', 'code']},
+            {'name': 'deepseek-coder:6.7b', 'description': 'DeepSeek Coder 6.7B - Larger code model', 'pulls': 60000, 'tags': ['6.7b', 'code']}
+        ]
+        
+        models = all_models
+        
+        # Filter by search term if provided
+        if search:
+            search_lower = search.lower()
+            models = [m for m in models if search_lower in m['name'].lower() or search_lower in m['description'].lower()]
+        
+        # Filter by category
+        if category != 'all':
+            category_filters = {
+                'popular': ['llama2', 'llama3', 'codellama', 'mistral', 'phi', 'gemma', 'qwen'],
+                'code': ['codellama', 'codegemma', 'starcoder', 'wizard-coder', 'deepseek-coder'],
+                'embedding': ['nomic-embed', 'mxbai-embed', 'all-minilm'],
+                'vision': ['llava', 'moondream', 'bakllava']
+            }
+            
+            if category in category_filters:
+                filter_terms = category_filters[category]
+                models = [m for m in models if any(term in m['name'].lower() for term in filter_terms)]
+        
+        if not models:
+            click.echo(f"❌ No models found for category '{category}'" + (f" matching '{search}'" if search else ""))
+            return
+        
+        # Sort by popularity (downloads or stars if available)
+        models.sort(key=lambda x: x.get('pulls', 0), reverse=True)
+        
+        if format == 'json':
+            click.echo(json.dumps(models, indent=2))
+        elif format == 'list':
+            click.echo(f"\n📋 Available models ({len(models)} found):")
+            for model in models:
+                name = model.get('name', 'Unknown')
+                description = model.get('description', 'No description')
+                click.echo(f"  • {name}: {description}")
+        else:  # table format
+            click.echo(f"\n📋 Available Ollama Models ({len(models)} found):")
+            click.echo("=" * 80)
+            click.echo(f"{'Name':<20} {'Tags':<15} {'Pulls':<10} {'Description'}")
+            click.echo("-" * 80)
+            
+            for model in models[:50]:  # Limit to top 50 for readability
+                name = model.get('name', 'Unknown')[:18]
+                tags = ', '.join(model.get('tags', [])[:2])[:13]  # Show first 2 tags
+                pulls = str(model.get('pulls', 0))
+                if len(pulls) > 8:
+                    pulls = f"{int(pulls)//1000}k"
+                description = model.get('description', 'No description')[:35]
+                
+                click.echo(f"{name:<20} {tags:<15} {pulls:<10} {description}")
+            
+            if len(models) > 50:
+                click.echo(f"\n... and {len(models) - 50} more models")
+        
+        click.echo(f"\n💡 Use 'ai-dev-local ollama pull <model-name>' to download a model")
+        click.echo("💡 Use --search to filter models by name")
+        click.echo("💡 Use --category to filter by type: popular, code, embedding, vision")
+        
+    except requests.RequestException as e:
+        click.echo(f"❌ Failed to fetch models from Ollama library: {e}", err=True)
+        click.echo("\n🔄 Fallback: Showing common models you can pull:")
+        
+        # Fallback list of popular models
+        fallback_models = [
+            ('llama2:7b', 'Meta Llama 2 7B - General purpose model'),
+            ('llama2:13b', 'Meta Llama 2 13B - Larger general purpose model'),
+            ('codellama:7b', 'Code Llama 7B - Code generation model'),
+            ('mistral:7b', 'Mistral 7B - Fast and efficient model'),
+            ('phi:2.7b', 'Microsoft Phi 2.7B - Small but capable model'),
+            ('gemma:7b', 'Google Gemma 7B - Lightweight model from Google'),
+            ('qwen:7b', 'Alibaba Qwen 7B - Multilingual model'),
+            ('llava:7b', 'LLaVA 7B - Vision and language model'),
+            ('nomic-embed-text', 'Nomic Embed - Text embedding model'),
+            ('all-minilm:l6-v2', 'All MiniLM - Sentence embedding model')
+        ]
+        
+        click.echo("\n📋 Popular Models:")
+        click.echo("-" * 60)
+        for name, description in fallback_models:
+            click.echo(f"  • {name:<20} {description}")
+    
+    except Exception as e:
+        click.echo(f"❌ Unexpected error: {e}", err=True)
+        sys.exit(1)
@@ -0,0 +1,197 @@
+"""
+Docker engine access for the CLI - compose project containers over one daemon connection
+"""
+
+import os
+import re
+import time
+import codecs
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+PROJECT_LABEL = "com.docker.compose.project"
+SERVICE_LABEL = "com.docker.compose.service"
+ONEOFF_LABEL = "com.docker.compose.oneoff"
+
+TIMESTAMP_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2})(?:\.(\d+))?(Z|[+-]\d{2}:\d{2})$")
+
+
+class EngineError(Exception):
+    """The Docker daemon could not be reached or rejected a request"""
+
+
+def project_name(directory: Optional[str] = None) -> str:
+    """Compose project name: COMPOSE_PROJECT_NAME, or the normalized directory name as compose derives it"""
+    name = os.getenv("COMPOSE_PROJECT_NAME") or os.path.basename(os.path.abspath(directory or os.getcwd()))
+    return re.sub(r"[^a-z0-9_-]", "", name.lower())
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of a Docker timestamp (nanosecond RFC 3339), None for unset"""
+    match = TIMESTAMP_PATTERN.match(value or "")
+    if not match or value.startswith("0001-"):
+        return None
+    base, fraction, zone = match.groups()
+    seconds = datetime.fromisoformat(base + ("+00:00" if zone == "Z" else zone)).timestamp()
+    return seconds + float(f"0.{fraction}") if fraction else seconds
+
+
+@dataclass
+class ServiceStatus:
+    service: str
+    container: str
+    state: str
+    # healthy/unhealthy/starting, None when the service has no healthcheck
+    health: Optional[str] = None
+    started_at: Optional[str] = None
+    uptime_seconds: Optional[float] = None
+    exit_code: Optional[int] = None
+    ports: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def running(self) -> bool:
+        return self.state == "running"
+
+    @classmethod
+    def from_inspect(cls, data: Dict[str, Any], now: float) -> "ServiceStatus":
+        state = data.get("State") or {}
+        running = state.get("Status") == "running"
+        started = parse_timestamp(state.get("StartedAt"))
+
+        ports = []
+        for container_port, bindings in sorted(((data.get("NetworkSettings") or {}).get("Ports") or {}).items()):
+            port, _, protocol = container_port.partition("/")
+            for binding in bindings or []:
+                ports.append({
+                    "container_port": int(port),
+                    "protocol": protocol or "tcp",
+                    "host_ip": binding.get("HostIp") or None,
+                    "host_port": int(binding["HostPort"]) if binding.get("HostPort") else None,
+                })
+
+        return cls(
+            service=((data.get("Config") or {}).get("Labels") or {}).get(SERVICE_LABEL, ""),
+            container=data.get("Name", "").lstrip("/"),
+            state=state.get("Status", "unknown"),
+            health=(state.get("Health") or {}).get("Status"),
+            started_at=state.get("StartedAt") if started else None,
+            uptime_seconds=round(now - started, 3) if running and started else None,
+            exit_code=None if running else state.get("ExitCode"),
+            ports=ports,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "service": self.service,
+            "container": self.container,
+            "state": self.state,
+            "health": self.health,
+            "started_at": self.started_at,
+            "uptime_seconds": self.uptime_seconds,
+            "exit_code": self.exit_code,
+            "ports": self.ports,
+        }
+
+
+class ComposeEngine:
+    """Containers of a compose project, resolved by their compose labels
+
+    All calls share one Docker API client, so the daemon socket is opened
+    once and kept alive for the whole CLI invocation instead of starting a
+    ``docker-compose`` process per query. Per-container inspects run in
+    parallel on that client's connection pool.
+    """
+
+    def __init__(self, project: Optional[str] = None, client=None, max_workers: int = 8):
+        self.project = project or project_name()
+        self._client = client
+        self.max_workers = max_workers
+
+    @property
+    def client(self):
+        """Low-level Docker API client, connected on first use"""
+        if self._client is None:
+            import docker
+
+            try:
+                self._client = docker.from_env().api
+            except docker.errors.DockerException as e:
+                raise EngineError(f"Cannot connect to the Docker daemon: {e}") from e
+        return self._client
+
+    def _call(self, method: str, *args, **kwargs):
+        from docker.errors import DockerException
+        from requests.exceptions import RequestException
+
+        try:
+            return getattr(self.client, method)(*args, **kwargs)
+        except (DockerException, RequestException) as e:
+            raise EngineError(str(e)) from e
+
+    def containers(self, service: Optional[str] = None, running_only: bool = False) -> List[Dict[str, Any]]:
+        """Container summaries of the project, one-off ``run`` containers excluded"""
+        labels = [f"{PROJECT_LABEL}={self.project}", f"{ONEOFF_LABEL}=False"]
+        if service:
+            labels.append(f"{SERVICE_LABEL}={service}")
+        return self._call("containers", all=not running_only, filters={"label": labels})
+
+    def _inspect(self, container_id: str) -> Optional[Dict[str, Any]]:
+        from docker.errors import NotFound
+
+        try:
+            return self._call("inspect_container", container_id)
+        except EngineError as e:
+            # Removed between listing and inspecting
+            if isinstance(e.__cause__, NotFound):
+                return None
+            raise
+
+    def status(self, services: Optional[Sequence[str]] = None) -> List[ServiceStatus]:
+        """State, health, uptime and published ports of the project's containers"""
+        summaries = self.containers()
+        if services:
+            summaries = [s for s in summaries if (s.get("Labels") or {}).get(SERVICE_LABEL) in services]
+        if not summaries:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(summaries))) as pool:
+            inspected = list(pool.map(self._inspect, [s["Id"] for s in summaries]))
+        now = time.time()
+        statuses = [ServiceStatus.from_inspect(data, now) for data in inspected if data is not None]
+        return sorted(statuses, key=lambda s: (s.service, s.container))
+
+    def container_for(self, service: str) -> Optional[str]:
+        """ID of a running container of the service"""
+        running = self.containers(service, running_only=True)
+        return running[0]["Id"] if running else None
+
+    def is_running(self, service: str) -> bool:
+        return self.container_for(service) is not None
+
+    def exec(self, service: str, cmd: List[str], on_output: Optional[Callable[[str], None]] = None) -> Tuple[int, str]:
+        """Run a command in the service's container, returning its exit code and output
+
+        With ``on_output`` the output is handed over as it arrives instead of
+        being collected.
+        """
+        container = self.container_for(service)
+        if container is None:
+            raise EngineError(f"Service '{service}' is not running")
+
+        exec_id = self._call("exec_create", container, cmd)["Id"]
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        collected = []
+
+        def emit(text: str):
+            if on_output is not None:
+                if text:
+                    on_output(text)
+            else:
+                collected.append(text)
+
+        for chunk in self._call("exec_start", exec_id, stream=True):
+            emit(decoder.decode(chunk))
+        emit(decoder.decode(b"", final=True))
+        return self._call("exec_inspect", exec_id).get("ExitCode") or 0, "".join(collected)
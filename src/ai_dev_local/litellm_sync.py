@@ -0,0 +1,227 @@
+"""
+LiteLLM sync - incremental model_list updates from Ollama, applied live through the proxy's model API
+"""
+
+import os
+import copy
+import shutil
+import hashlib
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ai_dev_local.ollama import normalize_model
+
+OLLAMA_PREFIXES = ("ollama", "ollama_chat")
+OLLAMA_GROUP = "ollama-group"
+DUMP_OPTIONS = {"default_flow_style": False, "sort_keys": False, "indent": 2}
+
+
+class LiteLLMError(Exception):
+    """The LiteLLM proxy could not be reached or rejected a request"""
+
+
+def env_value(key: str, default: Optional[str] = None, env_file: str = ".env") -> Optional[str]:
+    """A setting from the environment, falling back to the project's .env file"""
+    if os.getenv(key):
+        return os.getenv(key)
+    if os.path.exists(env_file):
+        with open(env_file, "r") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith(f"{key}="):
+                    value = line.split("=", 1)[1].split(" #", 1)[0].strip()
+                    return value or default
+    return default
+
+
+def litellm_url() -> str:
+    """LiteLLM proxy URL as seen from the host, LITELLM_URL or HOST/LITELLM_PORT"""
+    return env_value("LITELLM_URL") or f"http://{env_value('HOST', 'localhost')}:{env_value('LITELLM_PORT', '4000')}"
+
+
+def ollama_model(entry: Dict[str, Any]) -> Optional[str]:
+    """The Ollama model an entry serves (``ollama/phi:2.7b`` -> ``phi:2.7b``), None for other providers"""
+    model = str((entry.get("litellm_params") or {}).get("model", ""))
+    prefix, _, name = model.partition("/")
+    return name if prefix in OLLAMA_PREFIXES and name else None
+
+
+def config_digest(config: Dict[str, Any]) -> str:
+    import yaml
+
+    return hashlib.sha256(yaml.dump(config, **DUMP_OPTIONS).encode()).hexdigest()
+
+
+@dataclass
+class SyncPlan:
+    config: Dict[str, Any]
+    kept: List[Dict[str, Any]] = field(default_factory=list)
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[Dict[str, Any]] = field(default_factory=list)
+    # Whether the updated config differs from the current one at all
+    changed: bool = False
+
+    @property
+    def ollama_entries(self) -> List[Dict[str, Any]]:
+        return [entry for entry in self.config.get("model_list") or [] if ollama_model(entry)]
+
+
+def plan_sync(config: Dict[str, Any], installed: Iterable[str], api_base: str) -> SyncPlan:
+    """Bring the config's Ollama entries in line with the installed models
+
+    Entries for models that are still installed are kept exactly as they
+    are, with any tuning and in their position. Entries for models that are
+    gone are dropped and newly installed models are appended. Entries of
+    other providers are never touched. Names are compared with their
+    implicit ``latest`` tag, so ``ollama/llama2`` serves ``llama2:latest``.
+    """
+    wanted = sorted({normalize_model(model) for model in installed})
+    model_list = []
+    plan = SyncPlan(config={})
+    present = set()
+    for entry in config.get("model_list") or []:
+        model = ollama_model(entry)
+        if model is not None:
+            model = normalize_model(model)
+        if model is None:
+            model_list.append(entry)
+        elif model in wanted and model not in present:
+            plan.kept.append(entry)
+            model_list.append(entry)
+            present.add(model)
+        else:
+            plan.removed.append(entry)
+
+    taken = {entry.get("model_name") for entry in model_list}
+    for model in wanted:
+        if model in present:
+            continue
+        # The base name, unless another tag of the same model already has it
+        model_name = model.split(":")[0]
+        if model_name in taken:
+            model_name = model.replace(":", "-")
+        entry = {"model_name": model_name, "litellm_params": {"model": f"ollama/{model}", "api_base": api_base}}
+        plan.added.append(entry)
+        model_list.append(entry)
+        taken.add(model_name)
+
+    plan.config = copy.deepcopy(config)
+    plan.config["model_list"] = model_list
+    aliases = (plan.config.get("router_settings") or {}).get("model_group_alias")
+    if isinstance(aliases, dict):
+        names = [entry["model_name"] for entry in plan.ollama_entries]
+        if names:
+            aliases[OLLAMA_GROUP] = names
+        else:
+            aliases.pop(OLLAMA_GROUP, None)
+
+    plan.changed = config_digest(plan.config) != config_digest(config)
+    return plan
+
+
+def write_config(path: str, config: Dict[str, Any], backup: bool = True) -> Optional[str]:
+    """Atomically replace the config file, returning the backup's path if one was made"""
+    import yaml
+
+    backup_path = None
+    if backup:
+        backup_path = f"{path}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        shutil.copy2(path, backup_path)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".litellm_config.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            yaml.dump(config, f, **DUMP_OPTIONS)
+            f.flush()
+            os.fsync(f.fileno())
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return backup_path
+
+
+class LiteLLMClient:
+    """Client for the LiteLLM proxy's model management endpoints"""
+
+    def __init__(self, base_url: Optional[str] = None, api_key: Optional[str] = None, timeout: float = 10.0):
+        import requests
+
+        self.base_url = (base_url or litellm_url()).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        api_key = api_key or env_value("LITELLM_MASTER_KEY")
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict[str, Any]:
+        import requests
+
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise LiteLLMError(f"{method} {path} failed: {e}") from e
+        if not response.ok:
+            raise LiteLLMError(f"{method} {path} failed: HTTP {response.status_code} {response.text.strip()[:200]}")
+        return response.json()
+
+    def deployments(self) -> List[Dict[str, Any]]:
+        return self._request("GET", "/model/info").get("data", [])
+
+    def add(self, entry: Dict[str, Any]):
+        self._request("POST", "/model/new", json=entry)
+
+    def delete(self, model_id: str):
+        self._request("POST", "/model/delete", json={"id": model_id})
+
+
+@dataclass
+class LiveResult:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # (model_name, error) of changes the proxy refused, these take effect on its next restart
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+
+
+def apply_live(client: LiteLLMClient, plan: SyncPlan) -> LiveResult:
+    """Make the running proxy's Ollama deployments match the plan without restarting it
+
+    Works from the proxy's live deployments rather than the file diff, so
+    it also catches up on changes written earlier but never applied.
+    """
+    def key(entry):
+        return entry.get("model_name"), (entry.get("litellm_params") or {}).get("model")
+
+    result = LiveResult()
+    live = [deployment for deployment in client.deployments() if ollama_model(deployment)]
+    live_keys = {key(deployment) for deployment in live}
+    desired = plan.ollama_entries
+    desired_keys = {key(entry) for entry in desired}
+
+    for entry in desired:
+        if key(entry) in live_keys:
+            continue
+        try:
+            client.add(entry)
+            result.added.append(entry["model_name"])
+        except LiteLLMError as e:
+            result.failed.append((entry["model_name"], str(e)))
+
+    for deployment in live:
+        if key(deployment) in desired_keys:
+            continue
+        name = deployment.get("model_name", "")
+        model_id = (deployment.get("model_info") or {}).get("id")
+        if not model_id:
+            result.failed.append((name, "deployment has no id"))
+            continue
+        try:
+            client.delete(model_id)
+            result.removed.append(name)
+        except LiteLLMError as e:
+            result.failed.append((name, str(e)))
+    return result
@@ -0,0 +1,293 @@
+"""
+Ollama API client - concurrent model pulls with aggregate progress, resuming interrupted downloads
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_REGISTRY = "registry.ollama.ai"
+MANIFEST_ACCEPT = "application/vnd.docker.distribution.manifest.v2+json"
+
+
+class OllamaError(Exception):
+    """The Ollama server could not be reached or rejected a request"""
+
+
+class PullInterrupted(OllamaError):
+    """A pull broke off for a transient reason (connection lost, server error) and can be resumed"""
+
+
+def ollama_url() -> str:
+    """Ollama API base URL as seen from the host, OLLAMA_URL or HOST/OLLAMA_PORT"""
+    return os.getenv("OLLAMA_URL") or f"http://{os.getenv('HOST', 'localhost')}:{os.getenv('OLLAMA_PORT', '11434')}"
+
+
+def normalize_model(name: str) -> str:
+    """Model name with its implicit ``latest`` tag, as /api/tags lists it"""
+    name = name.strip()
+    return name if ":" in name.rsplit("/", 1)[-1] else f"{name}:latest"
+
+
+def manifest_url(name: str) -> str:
+    """Registry URL of a model's manifest (``library`` namespace unless given, https registry)"""
+    name = normalize_model(name)
+    path, tag = name.rsplit(":", 1)
+    parts = path.split("/")
+    if len(parts) == 1:
+        parts = [DEFAULT_REGISTRY, "library", parts[0]]
+    elif len(parts) == 2:
+        parts = [DEFAULT_REGISTRY, *parts]
+    host, repository = parts[0], "/".join(parts[1:])
+    return f"https://{host}/v2/{repository}/manifests/{tag}"
+
+
+class OllamaClient:
+    """Thin client for the Ollama HTTP API over one pooled session"""
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 10.0):
+        import requests
+
+        self.base_url = (base_url or ollama_url()).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _request(self, method: str, path: str, **kwargs):
+        import requests
+
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            response = self.session.request(method, f"{self.base_url}{path}", **kwargs)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise OllamaError(f"{method} {path} failed: {e}") from e
+        return response
+
+    def version(self) -> str:
+        return self._request("GET", "/api/version").json().get("version", "")
+
+    def tags(self) -> Dict[str, Dict[str, Any]]:
+        """Installed models by name"""
+        return {model["name"]: model for model in self._request("GET", "/api/tags").json().get("models", [])}
+
+    def remote_digest(self, name: str) -> Optional[str]:
+        """Digest of the model's manifest in its registry, None when it can't be looked up"""
+        import requests
+
+        try:
+            response = self.session.head(manifest_url(name), headers={"Accept": MANIFEST_ACCEPT},
+                                         timeout=self.timeout, allow_redirects=True)
+        except requests.RequestException:
+            return None
+        digest = response.headers.get("Docker-Content-Digest") if response.ok else None
+        return digest.removeprefix("sha256:") if digest else None
+
+    def pull(self, name: str) -> Iterator[Dict[str, Any]]:
+        """Progress events of a streaming /api/pull
+
+        Ollama keeps partially downloaded layers, so pulling again after an
+        interruption continues where the last attempt stopped.
+        """
+        import requests
+
+        try:
+            # No read timeout: verifying large layers can stay silent for minutes
+            with self.session.post(f"{self.base_url}/api/pull", json={"model": name, "stream": True},
+                                   stream=True, timeout=(self.timeout, None)) as response:
+                if 400 <= response.status_code < 500:
+                    raise OllamaError(f"pull of {name} rejected: HTTP {response.status_code} {response.text.strip()}")
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if "error" in event:
+                        raise OllamaError(event["error"])
+                    yield event
+        except requests.RequestException as e:
+            raise PullInterrupted(f"pull of {name} interrupted: {e}") from e
+
+
+@dataclass
+class PullState:
+    model: str
+    status: str = "queued"
+    # Layer digest -> (completed, total) bytes
+    layers: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    rate: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+    done: bool = False
+    _sample: Optional[Tuple[float, int]] = None
+
+    @property
+    def completed(self) -> int:
+        return sum(completed for completed, _ in self.layers.values())
+
+    @property
+    def total(self) -> int:
+        return sum(total for _, total in self.layers.values())
+
+    @property
+    def eta(self) -> Optional[float]:
+        if self.done or self.rate <= 0 or not self.total:
+            return None
+        return (self.total - self.completed) / self.rate
+
+    def update(self, event: Dict[str, Any], now: float):
+        self.status = event.get("status", self.status)
+        digest = event.get("digest")
+        if digest and event.get("total"):
+            self.layers[digest] = (event.get("completed", 0), event["total"])
+            completed = self.completed
+            if self._sample is not None and now - self._sample[0] >= 0.5:
+                rate = max(completed - self._sample[1], 0) / (now - self._sample[0])
+                # Smoothed so the ETA doesn't jump with every chunk
+                self.rate = rate if self.rate == 0 else 0.3 * rate + 0.7 * self.rate
+                self._sample = (now, completed)
+            elif self._sample is None:
+                self._sample = (now, completed)
+
+
+def format_bytes(size: float) -> str:
+    if size < 1024:
+        return f"{int(size)} B"
+    for unit in ("KB", "MB", "GB"):
+        size /= 1024
+        if size < 1024 or unit == "GB":
+            break
+    return f"{size:.1f} {unit}"
+
+
+def format_state(state: PullState) -> str:
+    if state.error:
+        return f"❌ {state.model}: {state.error}"
+    if state.done:
+        return f"✅ {state.model}: {state.status}"
+    if not state.total:
+        return f"⏳ {state.model}: {state.status}"
+    percent = state.completed * 100 / state.total
+    eta = f", ETA {int(state.eta) // 60}m{int(state.eta) % 60:02d}s" if state.eta is not None else ""
+    return (f"📥 {state.model}: {percent:5.1f}% of {format_bytes(state.total)}"
+            f" at {format_bytes(state.rate)}/s{eta}")
+
+
+class PullProgress:
+    """Combined progress of concurrent pulls
+
+    On a terminal one line per model is redrawn in place; otherwise only
+    state changes (start, finish, failure) are written.
+    """
+
+    def __init__(self, models: List[str], write: Callable[[str], None], interactive: Optional[bool] = None,
+                 interval: float = 0.5):
+        self.states = {model: PullState(model) for model in models}
+        self.write = write
+        self.interactive = sys.stdout.isatty() if interactive is None else interactive
+        self.interval = interval
+        self.lock = threading.Lock()
+        self._drawn = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def event(self, model: str, event: Dict[str, Any]):
+        with self.lock:
+            self.states[model].update(event, time.monotonic())
+
+    def finish(self, model: str, status: str, error: Optional[str] = None):
+        with self.lock:
+            state = self.states[model]
+            state.status, state.error, state.done = status, error, error is None
+        if not self.interactive:
+            self.write(format_state(state) + "\n")
+
+    def started(self, model: str):
+        if not self.interactive:
+            self.write(f"📥 Pulling {model}...\n")
+
+    def render(self):
+        with self.lock:
+            lines = [format_state(state) for state in self.states.values()]
+        up = f"\x1b[{self._drawn}F" if self._drawn else ""
+        self.write(up + "".join(f"\x1b[2K{line}\n" for line in lines))
+        self._drawn = len(lines)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.render()
+
+    def __enter__(self):
+        if self.interactive:
+            self.render()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self.render()
+
+
+@dataclass
+class PullResult:
+    model: str
+    # pulled, skipped or failed
+    outcome: str
+    detail: str = ""
+
+
+def pull_models(client: OllamaClient, models: List[str], progress: PullProgress, parallel: int = 2,
+                retries: int = 3, force: bool = False, sleep: Callable[[float], None] = time.sleep) -> List[PullResult]:
+    """Pull models with at most ``parallel`` downloads at a time
+
+    Models already installed with the registry's current digest are
+    skipped (as are installed ones when the registry can't be reached).
+    Interrupted pulls are retried with backoff and resume from the layers
+    Ollama has already stored.
+    """
+    if parallel < 1:
+        raise ValueError(f"parallel must be at least 1, got {parallel}")
+    if retries < 0:
+        raise ValueError(f"retries must not be negative, got {retries}")
+    installed = client.tags()
+
+    def pull_one(model: str) -> PullResult:
+        name = normalize_model(model)
+        local = installed.get(name)
+        if local is not None and not force:
+            remote = client.remote_digest(name)
+            if remote is None or remote == local.get("digest"):
+                progress.finish(model, "already up to date")
+                return PullResult(model, "skipped", "up to date" if remote else "installed")
+
+        progress.started(model)
+        error = ""
+        for attempt in range(1, retries + 2):
+            progress.states[model].attempts = attempt
+            try:
+                for event in client.pull(model):
+                    progress.event(model, event)
+                progress.finish(model, "pulled")
+                return PullResult(model, "pulled")
+            except PullInterrupted as e:
+                error = str(e)
+                if attempt > retries:
+                    break
+                progress.event(model, {"status": f"interrupted, resuming (attempt {attempt + 1})"})
+                sleep(min(2 ** attempt, 30))
+            except OllamaError as e:
+                # Reported by Ollama itself (unknown model, disk full), retrying won't help
+                error = str(e)
+                break
+        progress.finish(model, "failed", error)
+        return PullResult(model, "failed", error)
+
+    with progress, ThreadPoolExecutor(max_workers=max(1, min(parallel, len(models)))) as pool:
+        return list(pool.map(pull_one, models))
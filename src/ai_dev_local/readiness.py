@@ -0,0 +1,205 @@
+"""
+Service readiness - waits for compose services in dependency order and reports what held startup up
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ai_dev_local.engine import ComposeEngine, ServiceStatus
+
+# service -> {dependency: depends_on condition}
+Graph = Dict[str, Dict[str, str]]
+
+DEFAULT_COMPOSE_FILES = ("docker-compose.yml", "docker-compose.override.yml")
+
+
+def compose_files() -> List[str]:
+    """Compose files in effect, from COMPOSE_FILE or compose's defaults"""
+    configured = os.getenv("COMPOSE_FILE")
+    if configured:
+        separator = os.getenv("COMPOSE_PATH_SEPARATOR", os.pathsep)
+        return [path for path in configured.split(separator) if path]
+    return [path for path in DEFAULT_COMPOSE_FILES if os.path.exists(path)]
+
+
+def _depends_on(value) -> Dict[str, str]:
+    if isinstance(value, dict):
+        return {name: (spec or {}).get("condition", "service_started") for name, spec in value.items()}
+    return {name: "service_started" for name in value or []}
+
+
+def load_graph(files: Optional[Iterable[str]] = None, profiles: Iterable[str] = ()) -> Graph:
+    """Dependency graph of the services enabled under ``profiles``, merged across compose files"""
+    import yaml
+
+    services: Dict[str, dict] = {}
+    for path in files if files is not None else compose_files():
+        with open(path, "r") as f:
+            data = yaml.safe_load(f) or {}
+        for name, spec in (data.get("services") or {}).items():
+            spec = spec or {}
+            merged = services.setdefault(name, {"profiles": [], "depends_on": {}})
+            if "profiles" in spec:
+                merged["profiles"] = spec["profiles"]
+            merged["depends_on"].update(_depends_on(spec.get("depends_on")))
+
+    active = set(profiles) | {p for p in os.getenv("COMPOSE_PROFILES", "").split(",") if p}
+    enabled = {name for name, spec in services.items() if not spec["profiles"] or active & set(spec["profiles"])}
+    return {
+        name: {dep: condition for dep, condition in services[name]["depends_on"].items() if dep in enabled}
+        for name in sorted(enabled)
+    }
+
+
+def dependency_order(graph: Graph) -> List[str]:
+    """Services with every dependency before its dependents"""
+    order: List[str] = []
+    seen: Set[str] = set()
+
+    def visit(service: str):
+        if service in seen:
+            return
+        seen.add(service)
+        for dep in sorted(graph.get(service, {})):
+            visit(dep)
+        order.append(service)
+
+    for service in sorted(graph):
+        visit(service)
+    return order
+
+
+def closure(graph: Graph, targets: Iterable[str]) -> Set[str]:
+    """The targets and everything they transitively depend on"""
+    unknown = [t for t in targets if t not in graph]
+    if unknown:
+        raise ValueError(f"Unknown service(s): {', '.join(unknown)}")
+    services: Set[str] = set()
+    pending = list(targets)
+    while pending:
+        service = pending.pop()
+        if service not in services:
+            services.add(service)
+            pending.extend(graph[service])
+    return services
+
+
+def dependents(graph: Graph, service: str, within: Set[str]) -> List[str]:
+    """Services in ``within`` that transitively wait on ``service``"""
+    blocked: Set[str] = set()
+    changed = True
+    while changed:
+        changed = False
+        for name in within - blocked:
+            if service in graph[name] or blocked & set(graph[name]):
+                blocked.add(name)
+                changed = True
+    return sorted(blocked)
+
+
+def assess(status: ServiceStatus, may_complete: bool) -> Tuple[bool, Optional[str]]:
+    """Whether a container is ready, and why it never will be if it is failing"""
+    if status.state == "running":
+        if status.health == "unhealthy":
+            return False, "is unhealthy"
+        return status.health in (None, "healthy"), None
+    if status.state == "exited" and status.exit_code == 0 and may_complete:
+        return True, None
+    if status.state in ("exited", "dead"):
+        return False, f"exited with code {status.exit_code}"
+    return False, None
+
+
+def critical_path(graph: Graph, ready: Dict[str, float], targets: Iterable[str]) -> List[str]:
+    """Chain of dependencies that became ready last, ending at the slowest target"""
+    node = max(targets, key=lambda s: ready[s])
+    path = [node]
+    while True:
+        deps = [dep for dep in graph[node] if dep in ready]
+        if not deps:
+            return path[::-1]
+        node = max(deps, key=lambda s: ready[s])
+        path.append(node)
+
+
+@dataclass
+class ReadinessReport:
+    # Seconds from the start of the wait until each service was seen ready
+    ready: Dict[str, float]
+    elapsed: float
+    critical_path: List[str] = field(default_factory=list)
+    # The first service, in dependency order, that failed or never got ready
+    blocking: Optional[str] = None
+    reason: Optional[str] = None
+    blocked: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return self.blocking is None
+
+
+def wait_until_ready(
+    engine: ComposeEngine,
+    graph: Graph,
+    targets: Optional[Iterable[str]] = None,
+    timeout: float = 300.0,
+    min_interval: float = 0.25,
+    max_interval: float = 2.0,
+    on_ready: Optional[Callable[[str, float], None]] = None,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> ReadinessReport:
+    """Poll the targets and their dependencies until all are ready
+
+    Every round inspects all not-yet-ready services at once. The poll
+    interval backs off while nothing changes and drops back to
+    ``min_interval`` whenever a service becomes ready. Returns as soon as
+    the targets are ready, a service fails (exits or turns unhealthy), or
+    ``timeout`` passes.
+    """
+    targets = list(targets or graph)
+    services = closure(graph, targets)
+    order = [service for service in dependency_order(graph) if service in services]
+    may_complete = {
+        dep for service in services for dep, condition in graph[service].items()
+        if condition == "service_completed_successfully"
+    }
+
+    start = clock()
+    ready: Dict[str, float] = {}
+    interval = min_interval
+    while True:
+        containers: Dict[str, List[ServiceStatus]] = {}
+        for status in engine.status([s for s in order if s not in ready]):
+            containers.setdefault(status.service, []).append(status)
+        elapsed = clock() - start
+
+        progressed = False
+        for service in order:
+            if service in ready:
+                continue
+            problem = None if containers.get(service) else "has no container"
+            verdicts = [assess(status, service in may_complete) for status in containers.get(service, [])]
+            problem = problem or next((reason for _, reason in verdicts if reason), None)
+            if problem is not None:
+                return ReadinessReport(ready, elapsed, blocking=service, reason=problem,
+                                       blocked=dependents(graph, service, services))
+            if all(is_ready for is_ready, _ in verdicts):
+                ready[service] = elapsed
+                progressed = True
+                if on_ready is not None:
+                    on_ready(service, elapsed)
+
+        if len(ready) == len(services):
+            return ReadinessReport(ready, elapsed, critical_path=critical_path(graph, ready, targets))
+
+        if elapsed >= timeout:
+            service = next(s for s in order if s not in ready)
+            states = ", ".join(sorted({status.health or status.state for status in containers[service]}))
+            return ReadinessReport(ready, elapsed, blocking=service, reason=f"not ready after {timeout:g}s ({states})",
+                                   blocked=dependents(graph, service, services))
+
+        interval = min_interval if progressed else min(interval * 2, max_interval)
+        sleep(min(interval, timeout - elapsed))
@@ -99,7 +99,7 @@ def test_cli_logs_specific_service(mock_run):
     mock_run.assert_called_once_with(['docker-compose', 'logs', 'langfuse'], check=True)
 
 
-@patch('ai_dev_local.cli.webbrowser.open')
+@patch('webbrowser.open')
 def test_cli_docs(mock_open):
     """Test docs command."""
     runner = CliRunner()
@@ -110,7 +110,7 @@ def test_cli_docs(mock_open):
     mock_open.assert_called_once_with('http://localhost:8000')
 
 
-@patch('ai_dev_local.cli.webbrowser.open')
+@patch('webbrowser.open')
 def test_cli_dashboard(mock_open):
     """Test dashboard command."""
     runner = CliRunner()
@@ -119,3 +119,400 @@ def test_cli_dashboard(mock_open):
     assert result.exit_code == 0
     assert "🎛️ Opening dashboard..." in result.output
     mock_open.assert_called_once_with('http://localhost:3002')
+
+
+def _inspect(service, status='running', health=None, ports=None):
+    state = {'Status': status, 'StartedAt': '2024-01-01T00:00:00.123456789Z', 'ExitCode': 0 if status == 'running' else 137}
+    if health:
+        state['Health'] = {'Status': health}
+    return {
+        'Name': f'/ai-dev-local-{service}-1',
+        'State': state,
+        'Config': {'Labels': {'com.docker.compose.service': service}},
+        'NetworkSettings': {'Ports': ports or {}},
+    }
+
+
+@patch('ai_dev_local.cli.subprocess.run')
+def test_cli_status_json(mock_run):
+    """Test status --json reads structured state from the Docker engine."""
+    import json
+    from ai_dev_local.engine import ComposeEngine
+
+    inspected = {
+        'a': _inspect('litellm', health='healthy', ports={'4000/tcp': [{'HostIp': '0.0.0.0', 'HostPort': '4000'}]}),
+        'b': _inspect('flowise', status='exited', ports={'3000/tcp': None}),
+    }
+    client = MagicMock()
+    client.containers.return_value = [
+        {'Id': 'a', 'Labels': {'com.docker.compose.service': 'litellm'}},
+        {'Id': 'b', 'Labels': {'com.docker.compose.service': 'flowise'}},
+    ]
+    client.inspect_container.side_effect = inspected.__getitem__
+
+    with patch.object(ComposeEngine, 'client', client), patch.dict('os.environ', {'COMPOSE_PROJECT_NAME': 'ai-dev-local'}):
+        result = CliRunner().invoke(cli, ['status', '--json'])
+
+    assert result.exit_code == 0, result.output
+    mock_run.assert_not_called()
+    filters = client.containers.call_args.kwargs['filters']
+    assert 'com.docker.compose.project=ai-dev-local' in filters['label']
+
+    data = json.loads(result.output)
+    assert data['project'] == 'ai-dev-local'
+    flowise, litellm = data['services']
+    assert litellm['service'] == 'litellm'
+    assert litellm['state'] == 'running' and litellm['health'] == 'healthy'
+    assert litellm['uptime_seconds'] > 0
+    assert litellm['ports'] == [{'container_port': 4000, 'protocol': 'tcp', 'host_ip': '0.0.0.0', 'host_port': 4000}]
+    assert flowise['state'] == 'exited' and flowise['exit_code'] == 137
+    assert flowise['uptime_seconds'] is None and flowise['ports'] == []
+
+
+def test_cli_ollama_remove_exec():
+    """Test ollama remove runs inside the running Ollama container through the engine."""
+    from ai_dev_local.engine import ComposeEngine
+
+    client = MagicMock()
+    client.containers.return_value = [{'Id': 'ollama-id'}]
+    client.exec_create.return_value = {'Id': 'exec-id'}
+    client.exec_start.return_value = iter([b'deleted ', b'\xe2\x9c', b'\x93 phi:2.7b\n'])
+    client.exec_inspect.return_value = {'ExitCode': 0}
+
+    with patch.object(ComposeEngine, 'client', client):
+        result = CliRunner().invoke(cli, ['ollama', 'remove', 'phi:2.7b'])
+
+    assert result.exit_code == 0, result.output
+    assert "deleted ✓ phi:2.7b" in result.output
+    assert "✅ Successfully removed phi:2.7b" in result.output
+    client.exec_create.assert_called_once_with('ollama-id', ['ollama', 'rm', 'phi:2.7b'])
+    assert client.containers.call_args.kwargs['all'] is False
+
+    client.exec_start.return_value = iter([b'Error: model not found\n'])
+    client.exec_inspect.return_value = {'ExitCode': 1}
+    with patch.object(ComposeEngine, 'client', client):
+        result = CliRunner().invoke(cli, ['ollama', 'remove', 'nope'])
+    assert result.exit_code == 1
+    assert "❌ Failed to remove nope" in result.output
+
+
+class FakeOllama:
+    """Stands in for OllamaClient, with scripted pull streams per model"""
+
+    def __init__(self, installed, remote, streams):
+        self.installed = installed
+        self.remote = remote
+        self.streams = streams
+        self.pulls = []
+        self.active = 0
+        self.max_active = 0
+
+    def version(self):
+        return '0.5.0'
+
+    def tags(self):
+        return self.installed
+
+    def remote_digest(self, name):
+        return self.remote.get(name)
+
+    def pull(self, name):
+        import time
+        self.pulls.append(name)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.05)
+            for event in self.streams[name].pop(0):
+                if isinstance(event, Exception):
+                    raise event
+                yield event
+        finally:
+            self.active -= 1
+
+
+def test_pull_models_skips_current_and_resumes():
+    """Test pulls run in parallel, skip current models and resume after interruptions."""
+    from ai_dev_local.ollama import OllamaError, PullInterrupted, PullProgress, pull_models
+
+    layer = lambda completed: {'status': 'pulling abc', 'digest': 'sha256:abc', 'total': 1000, 'completed': completed}
+    client = FakeOllama(
+        installed={'phi:2.7b': {'digest': 'aaa'}, 'mistral:7b': {'digest': 'old'}},
+        remote={'phi:2.7b': 'aaa', 'mistral:7b': 'new'},
+        streams={
+            'mistral:7b': [[layer(500), {'status': 'success'}]],
+            'llama2:7b': [[layer(400), PullInterrupted('connection reset')], [layer(1000), {'status': 'success'}]],
+            'nope': [[OllamaError('pull model manifest: file does not exist')]],
+        },
+    )
+    output = []
+    progress = PullProgress(['phi:2.7b', 'mistral:7b', 'llama2:7b', 'nope'], output.append, interactive=False)
+    sleeps = []
+
+    results = pull_models(client, list(progress.states), progress, parallel=2, sleep=sleeps.append)
+
+    assert [(r.model, r.outcome) for r in results] == [
+        ('phi:2.7b', 'skipped'), ('mistral:7b', 'pulled'), ('llama2:7b', 'pulled'), ('nope', 'failed'),
+    ]
+    assert sorted(client.pulls) == ['llama2:7b', 'llama2:7b', 'mistral:7b', 'nope']
+    assert client.max_active == 2
+    assert sleeps == [2]
+    assert progress.states['llama2:7b'].attempts == 2
+    assert progress.states['llama2:7b'].completed == 1000
+    assert "✅ phi:2.7b: already up to date\n" in output
+    assert any(line.startswith("❌ nope: pull model manifest") for line in output)
+
+    with pytest.raises(ValueError):
+        pull_models(client, ['phi:2.7b'], progress, retries=-1)
+
+
+def test_cli_ollama_pull_api():
+    """Test ollama pull goes through the Ollama API and fails when a model can't be pulled."""
+    from ai_dev_local.ollama import OllamaError
+
+    client = FakeOllama(installed={}, remote={}, streams={
+        'phi:2.7b': [[{'status': 'pulling manifest'}, {'status': 'success'}]],
+        'nope': [[OllamaError('file does not exist')]],
+    })
+    with patch('ai_dev_local.ollama.OllamaClient', return_value=client):
+        result = CliRunner().invoke(cli, ['ollama', 'pull', 'phi:2.7b'])
+        assert result.exit_code == 0, result.output
+        assert "✅ Successfully pulled phi:2.7b" in result.output
+        assert "1 pulled, 0 already up to date, 0 failed" in result.output
+
+        result = CliRunner().invoke(cli, ['ollama', 'pull', 'nope'])
+        assert result.exit_code == 1
+        assert "❌ Failed to pull nope" in result.output
+
+        result = CliRunner().invoke(cli, ['ollama', 'pull', '--parallel', '0', 'phi:2.7b'])
+        assert result.exit_code == 2
+
+
+COMPOSE = """
+services:
+  postgres:
+    image: postgres:15
+  redis:
+    image: redis:7-alpine
+  langfuse:
+    image: langfuse/langfuse
+    depends_on:
+      postgres:
+        condition: service_healthy
+  litellm:
+    image: litellm
+    depends_on: [postgres, redis]
+  ollama:
+    image: ollama/ollama
+    profiles: [ollama]
+"""
+
+
+def _status(service, state='running', health='healthy', exit_code=None):
+    from ai_dev_local.engine import ServiceStatus
+    return ServiceStatus(service=service, container=f'{service}-1', state=state, health=health, exit_code=exit_code)
+
+
+def test_wait_until_ready_reports_critical_path(tmp_path):
+    """Test readiness waiting follows dependencies and backs off while nothing changes."""
+    from ai_dev_local.readiness import load_graph, wait_until_ready
+
+    compose = tmp_path / 'docker-compose.yml'
+    compose.write_text(COMPOSE)
+    graph = load_graph([str(compose)])
+    assert 'ollama' not in graph
+    assert graph['litellm'] == {'postgres': 'service_started', 'redis': 'service_started'}
+    assert 'ollama' in load_graph([str(compose)], profiles=['ollama'])
+
+    now = [0.0]
+    sleeps = []
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+    rounds = iter([
+        [_status('postgres', health='starting'), _status('langfuse', health='starting')],
+        [_status('postgres', health='starting'), _status('langfuse', health='starting')],
+        [_status('postgres'), _status('langfuse', health='starting')],
+        [_status('langfuse', health='starting')],
+        [_status('langfuse')],
+    ])
+    engine = MagicMock()
+    engine.status.side_effect = lambda services: next(rounds)
+
+    report = wait_until_ready(engine, graph, ['langfuse'], clock=lambda: now[0], sleep=sleep)
+
+    assert report.ok
+    assert report.ready == {'postgres': 1.5, 'langfuse': 2.25}
+    assert report.critical_path == ['postgres', 'langfuse']
+    assert sleeps == [0.5, 1.0, 0.25, 0.5]
+    # Only the requested service and its dependencies are polled, ready ones drop out
+    assert engine.status.call_args_list[0].args[0] == ['postgres', 'langfuse']
+    assert engine.status.call_args_list[-1].args[0] == ['langfuse']
+
+
+@patch('ai_dev_local.cli.subprocess.run')
+def test_cli_start_wait(mock_run, tmp_path, monkeypatch):
+    """Test start --wait-for waits on the service and its dependencies."""
+    from ai_dev_local.engine import ComposeEngine
+
+    mock_run.return_value = MagicMock(returncode=0, stdout='v1.0.0\n')
+    (tmp_path / 'docker-compose.yml').write_text(COMPOSE)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('COMPOSE_FILE', raising=False)
+
+    with patch.object(ComposeEngine, 'status', return_value=[_status('postgres'), _status('redis', health=None), _status('litellm', health=None)]):
+        result = CliRunner().invoke(cli, ['start', '--wait-for', 'litellm'])
+    assert result.exit_code == 0, result.output
+    assert "✅ redis ready after" in result.output
+    assert "🛤️  Critical path: " in result.output and "litellm" in result.output
+
+    with patch.object(ComposeEngine, 'status', return_value=[_status('postgres', health='unhealthy'), _status('redis')]):
+        result = CliRunner().invoke(cli, ['start', '--wait'])
+    assert result.exit_code == 1
+    assert "❌ postgres is unhealthy (blocking langfuse, litellm)" in result.output
+
+
+LITELLM_CONFIG = """model_list:
+- model_name: gpt-4
+  litellm_params:
+    model: openai/gpt-4
+- model_name: phi
+  litellm_params:
+    model: ollama/phi:2.7b
+    api_base: http://host.docker.internal:11434
+    rpm: 30
+- model_name: codellama
+  litellm_params:
+    model: ollama/codellama:latest
+    api_base: http://host.docker.internal:11434
+router_settings:
+  model_group_alias:
+    ollama-group:
+    - phi
+    - codellama
+"""
+
+
+def test_plan_sync_keeps_unchanged_entries():
+    """Test sync planning keeps tuned entries and only adds/removes what changed."""
+    import yaml
+    from ai_dev_local.litellm_sync import plan_sync
+
+    config = yaml.safe_load(LITELLM_CONFIG)
+    plan = plan_sync(config, ['phi:2.7b', 'llama3:8b', 'llama3:70b'], 'http://ollama:11434')
+
+    assert [e['model_name'] for e in plan.kept] == ['phi']
+    assert [e['model_name'] for e in plan.removed] == ['codellama']
+    assert [e['model_name'] for e in plan.added] == ['llama3', 'llama3-8b']
+    assert plan.changed
+    assert [e['model_name'] for e in plan.config['model_list']] == ['gpt-4', 'phi', 'llama3', 'llama3-8b']
+    assert plan.config['model_list'][1]['litellm_params']['rpm'] == 30
+    assert plan.config['router_settings']['model_group_alias']['ollama-group'] == ['phi', 'llama3', 'llama3-8b']
+    # The input config is left alone
+    assert len(config['model_list']) == 3
+
+    assert not plan_sync(config, ['phi:2.7b', 'codellama:latest'], 'http://ollama:11434').changed
+
+    # A tag-less entry serves the model's latest tag and keeps its tuning
+    config['model_list'][2]['litellm_params'].update(model='ollama/codellama', timeout=600)
+    plan = plan_sync(config, ['phi:2.7b', 'codellama:latest'], 'http://ollama:11434')
+    assert not plan.changed
+    assert plan.config['model_list'][2]['litellm_params']['timeout'] == 600
+
+
+def test_cli_sync_litellm_incremental(tmp_path):
+    """Test sync-litellm writes atomically only on change and applies the diff live."""
+    import yaml
+
+    config_path = tmp_path / 'litellm_config.yaml'
+    config_path.write_text(LITELLM_CONFIG)
+    ollama_client = MagicMock()
+    ollama_client.tags.return_value = {'phi:2.7b': {}, 'mistral:7b': {}}
+    litellm_client = MagicMock()
+    litellm_client.deployments.return_value = [
+        {'model_name': 'gpt-4', 'litellm_params': {'model': 'openai/gpt-4'}, 'model_info': {'id': 'g'}},
+        {'model_name': 'phi', 'litellm_params': {'model': 'ollama/phi:2.7b'}, 'model_info': {'id': 'p'}},
+        {'model_name': 'codellama', 'litellm_params': {'model': 'ollama/codellama:latest'}, 'model_info': {'id': 'c'}},
+    ]
+    args = ['ollama', 'sync-litellm', '--config', str(config_path)]
+
+    with patch('ai_dev_local.ollama.OllamaClient', return_value=ollama_client), \
+            patch('ai_dev_local.litellm_sync.LiteLLMClient', return_value=litellm_client):
+        result = CliRunner().invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        assert "➖ codellama -> ollama/codellama:latest" in result.output
+        assert "➕ mistral -> ollama/mistral:7b" in result.output
+        assert "🔌 LiteLLM updated live: 1 added, 1 removed" in result.output
+        litellm_client.add.assert_called_once()
+        assert litellm_client.add.call_args.args[0]['model_name'] == 'mistral'
+        litellm_client.delete.assert_called_once_with('c')
+
+        written = yaml.safe_load(config_path.read_text())
+        assert [e['model_name'] for e in written['model_list']] == ['gpt-4', 'phi', 'mistral']
+        backups = [p.name for p in tmp_path.iterdir() if '.backup_' in p.name]
+        assert len(backups) == 1
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted(['litellm_config.yaml'] + backups)
+
+        # Nothing changed since: no write, no backup, nothing to apply
+        mtime = config_path.stat().st_mtime_ns
+        litellm_client.reset_mock()
+        litellm_client.deployments.return_value = [
+            {'model_name': 'phi', 'litellm_params': {'model': 'ollama/phi:2.7b'}, 'model_info': {'id': 'p'}},
+            {'model_name': 'mistral', 'litellm_params': {'model': 'ollama/mistral:7b'}, 'model_info': {'id': 'm'}},
+        ]
+        result = CliRunner().invoke(cli, args)
+        assert result.exit_code == 0, result.output
+        assert "is already in sync" in result.output
+        assert "🔌 LiteLLM proxy already serves these models" in result.output
+        assert config_path.stat().st_mtime_ns == mtime
+        assert len([p for p in tmp_path.iterdir() if '.backup_' in p.name]) == 1
+        litellm_client.add.assert_not_called()
+        litellm_client.delete.assert_not_called()
+
+
+HEAVY_MODULES = ('yaml', 'requests', 'docker', 'ai_dev_local.commands.config', 'ai_dev_local.commands.ollama')
+
+
+def _import_times(code, env=None):
+    """Cumulative import time in microseconds per module, from `python -X importtime`."""
+    import os
+    import subprocess as sp
+    import sys
+
+    result = sp.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                    env={**os.environ, **(env or {})}, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line and 'cumulative' not in line:
+            _, cumulative, name = line.split('|')
+            times[name.strip()] = int(cumulative)
+    return times, result.stdout
+
+
+def test_cli_import_time_budget():
+    """Test importing the CLI stays within its start-up budget and defers heavy imports."""
+    import os
+
+    times, _ = _import_times('import ai_dev_local.cli')
+    budget_ms = float(os.getenv('AI_DEV_LOCAL_IMPORT_BUDGET_MS', 150))
+    assert times['ai_dev_local.cli'] / 1000 < budget_ms, f"{times['ai_dev_local.cli'] / 1000:.1f}ms"
+    assert not [module for module in HEAVY_MODULES if module in times]
+
+
+def test_cli_help_and_completion_stay_lazy():
+    """Test --help and shell completion list lazy groups without importing them."""
+    times, output = _import_times("from ai_dev_local.cli import cli; cli(['--help'], prog_name='ai-dev-local')")
+    assert "ollama       Manage Ollama local LLM server." in output
+    assert not [module for module in HEAVY_MODULES if module in times]
+
+    times, output = _import_times(
+        "from ai_dev_local.cli import cli; cli(prog_name='ai-dev-local')",
+        env={'_AI_DEV_LOCAL_COMPLETE': 'bash_complete', 'COMP_WORDS': 'ai-dev-local o', 'COMP_CWORD': '1'},
+    )
+    assert output.split() == ['plain,ollama']
+    assert not [module for module in HEAVY_MODULES if module in times]
+
+    # Running a subcommand loads its group
+    result = CliRunner().invoke(cli, ['ollama', '--help'])
+    assert result.exit_code == 0
+    assert "sync-litellm" in result.output
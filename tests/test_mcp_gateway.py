@@ -0,0 +1,1018 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+httpx = pytest.importorskip("httpx")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "docker", "mcp-gateway"))
+
+import app as gateway_app  # noqa: E402
+
+
+@pytest.fixture
+def gateway(monkeypatch):
+    """Gateway with a single 'files' server backed by a mock upstream."""
+    monkeypatch.setenv("MCP_SERVERS", "files:http://files:8000")
+    gw = gateway_app.MCPGateway()
+    monkeypatch.setattr(gateway_app, "gateway", gw)
+    return gw
+
+
+def mock_upstream(gw, handler):
+    """Route all upstream traffic of the gateway to an httpx mock handler."""
+    for name in gw.clients:
+        gw.clients[name] = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    gw.control_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def call_gateway(method, url, **kwargs):
+    transport = httpx.ASGITransport(app=gateway_app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+        return await client.request(method, url, **kwargs)
+
+
+def test_proxy_streams_upstream_response_unchanged(gateway):
+    """Test that status, headers and body are passed through untouched."""
+    payload = b"x" * (1024 * 1024)
+
+    def handler(request):
+        assert request.url.path == "/read"
+        return httpx.Response(
+            206, stream=httpx.ByteStream(payload), headers={"content-type": "text/plain", "x-upstream": "1"}
+        )
+
+    mock_upstream(gateway, handler)
+    response = asyncio.run(call_gateway("GET", "/mcp/files/read"))
+
+    assert response.status_code == 206
+    assert response.headers["x-upstream"] == "1"
+    assert response.content == payload
+    assert gateway.servers["files"].replicas[0].outstanding == 0
+
+
+def test_proxy_streams_request_body_upstream(gateway):
+    """Test that the request body and query string reach the upstream."""
+    seen = {}
+
+    async def handler(request):
+        seen["body"] = await request.aread()
+        seen["query"] = request.url.params["mode"]
+        return httpx.Response(200, stream=httpx.ByteStream(b'{"ok": true}'), headers={"content-type": "application/json"})
+
+    mock_upstream(gateway, handler)
+    response = asyncio.run(call_gateway("POST", "/mcp/files/write?mode=append", content=b"hello"))
+
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+    assert seen == {"body": b"hello", "query": "append"}
+
+
+def test_proxy_unknown_server_returns_404(gateway):
+    """Test that proxying to an unregistered server is rejected."""
+    response = asyncio.run(call_gateway("GET", "/mcp/missing/anything"))
+    assert response.status_code == 404
+
+
+def test_server_pool_settings_are_parsed_per_entry(monkeypatch):
+    """Test that per-server pool options are read from MCP_SERVERS."""
+    monkeypatch.setenv(
+        "MCP_SERVERS",
+        "git:http://mcp-git:8000,github:http://mcp-github:8000;max_connections=5;read_timeout=60;http2=true",
+    )
+    gw = gateway_app.MCPGateway()
+
+    assert gw.servers["git"].pool == gateway_app.PoolSettings()
+    assert gw.servers["github"].pool.max_connections == 5
+    assert gw.servers["github"].pool.read_timeout == 60.0
+    assert gw.servers["github"].pool.http2 is True
+    assert gw.servers["github"].url == "http://mcp-github:8000"
+    assert gw.clients["git"] is not gw.clients["github"]
+    assert gw.clients["github"].timeout.read == 60.0
+
+
+def test_cache_evicts_least_recently_used_entries_by_size():
+    """Test that the response cache stays within its byte budget."""
+    from cache import CacheEntry, ResponseCache
+
+    cache = ResponseCache(rules=[], max_bytes=10, max_entry_bytes=10)
+    for name in ("a", "b", "c"):
+        cache.put((name, "/", "", ""), CacheEntry(200, {}, b"xxxx", expires_at=0))
+        cache.get(("a", "/", "", ""))
+
+    assert [key[0] for key in cache.entries] == ["c", "a"]
+    assert cache.current_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_cache_rules_and_cache_control():
+    """Test rule matching and Cache-Control handling."""
+    from cache import ResponseCache, parse_rules
+
+    cache = ResponseCache(rules=parse_rules("git:/=5,git:/log=30,time:/=1"))
+    assert cache.ttl_for("git", "log/main") == 30
+    assert cache.ttl_for("git", "status") == 5
+    assert cache.ttl_for("fetch", "page") is None
+
+    assert cache.response_ttl(30, {"cache-control": "max-age=10"}) == 10
+    assert cache.response_ttl(30, {"cache-control": "no-cache"}) == 0
+    assert cache.response_ttl(30, {"cache-control": "no-store"}) is None
+    assert cache.response_ttl(30, {"vary": "Accept-Encoding"}) == 30
+    assert cache.response_ttl(30, {"vary": "Accept-Encoding, Accept"}) is None
+    assert cache.response_ttl(30, {}, credentials=True) is None
+    assert cache.response_ttl(30, {"cache-control": "public, max-age=10"}, credentials=True) == 10
+
+
+def test_cached_get_is_served_and_revalidated_with_etag(gateway, monkeypatch):
+    """Test cache hits and ETag revalidation for repeated GETs."""
+    from cache import ResponseCache, parse_rules
+
+    gateway.cache = ResponseCache(rules=parse_rules("files:/=60"))
+    calls = []
+
+    def handler(request):
+        calls.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, stream=httpx.ByteStream(b"log"), headers={"etag": '"v1"'})
+
+    mock_upstream(gateway, handler)
+
+    first = asyncio.run(call_gateway("GET", "/mcp/files/log"))
+    second = asyncio.run(call_gateway("GET", "/mcp/files/log"))
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+    assert second.content == b"log"
+    assert calls == [None]
+
+    monkeypatch.setattr(next(iter(gateway.cache.entries.values())), "expires_at", 0)
+    third = asyncio.run(call_gateway("GET", "/mcp/files/log"))
+    assert third.headers["x-cache"] == "REVALIDATED"
+    assert third.content == b"log"
+    assert calls == [None, '"v1"']
+
+    stats = asyncio.run(call_gateway("GET", "/admin/cache")).json()
+    assert (stats["hits"], stats["misses"], stats["revalidations"]) == (1, 1, 1)
+
+
+def test_responses_to_credentialed_requests_are_not_shared(gateway):
+    """Test that one caller's personal response is never served to another."""
+    from cache import ResponseCache, parse_rules
+
+    gateway.cache = ResponseCache(rules=parse_rules("files:/=60"))
+
+    def handler(request):
+        user = request.headers.get("authorization", "anonymous")
+        return httpx.Response(200, stream=httpx.ByteStream(user.encode()))
+
+    mock_upstream(gateway, handler)
+
+    alice = asyncio.run(call_gateway("GET", "/mcp/files/me", headers={"authorization": "alice"}))
+    bob = asyncio.run(call_gateway("GET", "/mcp/files/me", headers={"authorization": "bob"}))
+    assert (alice.content, bob.content) == (b"alice", b"bob")
+    assert bob.headers["x-cache"] == "MISS"
+    assert not gateway.cache.entries
+
+    asyncio.run(call_gateway("GET", "/mcp/files/me"))
+    carol = asyncio.run(call_gateway("GET", "/mcp/files/me", headers={"cookie": "user=carol"}))
+    assert carol.headers["x-cache"] == "MISS"
+
+
+def test_cache_fill_releases_the_upstream_when_the_body_breaks_off(gateway):
+    """Test that a read error while buffering for the cache frees the replica and admission slot."""
+    from cache import ResponseCache, parse_rules
+
+    gateway.cache = ResponseCache(rules=parse_rules("files:/=60"))
+
+    class BrokenStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield b"partial"
+            raise httpx.ReadError("connection reset")
+
+    mock_upstream(gateway, lambda request: httpx.Response(200, stream=BrokenStream()))
+
+    response = asyncio.run(call_gateway("GET", "/mcp/files/log"))
+    assert response.status_code == 502
+    assert gateway.servers["files"].replicas[0].outstanding == 0
+    assert gateway.admission["files"].in_flight == 0
+    assert not gateway.cache.entries
+
+
+def test_cache_fill_is_bounded_by_the_deadline(gateway):
+    """Test that a body stalling past the caller's deadline is answered with a 504."""
+    from cache import ResponseCache, parse_rules
+
+    gateway.cache = ResponseCache(rules=parse_rules("files:/=60"))
+
+    class StallingStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield b"partial"
+            await asyncio.sleep(1)
+            yield b"rest"
+
+    mock_upstream(gateway, lambda request: httpx.Response(200, stream=StallingStream()))
+
+    response = asyncio.run(call_gateway("GET", "/mcp/files/log", headers={"x-request-timeout": "0.1"}))
+    assert response.status_code == 504
+    assert gateway.servers["files"].replicas[0].outstanding == 0
+    assert gateway.admission["files"].in_flight == 0
+
+
+def test_circuit_opens_after_consecutive_failures_and_fails_fast(gateway, monkeypatch):
+    """Test that a failing upstream is short-circuited with a 503."""
+    from breaker import CircuitBreaker
+
+    gateway.breakers["http://files:8000"] = CircuitBreaker("files", failure_threshold=2, reset_timeout=30)
+    gateway.retry.max_retries = 0
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        raise httpx.ConnectError("connection refused")
+
+    mock_upstream(gateway, handler)
+
+    statuses = [asyncio.run(call_gateway("GET", "/mcp/files/read")).status_code for _ in range(3)]
+    rejected = asyncio.run(call_gateway("GET", "/mcp/files/read"))
+
+    assert statuses == [502, 502, 503]
+    assert len(calls) == 2
+    assert rejected.headers["retry-after"] == "30"
+
+
+def test_circuit_follows_health_checks():
+    """Test that health results open and half-open the circuit."""
+    from breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+    breaker = CircuitBreaker("files", half_open_max_calls=1)
+    breaker.record_health(False)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    breaker.record_health(True)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_abandoned_half_open_trials_do_not_hold_the_circuit():
+    """Test that trials ending without an outcome give their slot back."""
+    from breaker import HALF_OPEN, CircuitBreaker
+
+    breaker = CircuitBreaker("files", half_open_max_calls=1)
+    breaker.record_health(False)
+    breaker.record_health(True)
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.allow_request()
+
+    # A healthy check frees slots of trials that never reported back
+    assert not breaker.allow_request()
+    breaker.record_health(True)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_replicas_are_parsed_with_weights():
+    """Test that a server name can map to several weighted replicas."""
+    from registry import parse_server_entry
+
+    server = parse_server_entry("git:http://mcp-git-1:8000*3|http://mcp-git-2:8000;max_connections=4")
+
+    assert [(r.url, r.weight) for r in server.replicas] == [
+        ("http://mcp-git-1:8000", 3.0),
+        ("http://mcp-git-2:8000", 1.0),
+    ]
+    assert server.url == "http://mcp-git-1:8000"
+    assert server.pool.max_connections == 4
+
+    # Weights that would break least-outstanding ordering drop the replica
+    server = parse_server_entry("git:http://mcp-git-1:8000*0|http://mcp-git-2:8000*-2|http://mcp-git-3:8000")
+    assert [r.url for r in server.replicas] == ["http://mcp-git-3:8000"]
+
+
+def test_servers_without_a_url_are_skipped(tmp_path):
+    """Test that entries with no usable URL are ignored instead of failing start-up."""
+    from registry import load_registry_file, parse_servers_env
+
+    assert list(parse_servers_env("git:,time:http://mcp-time:8000,fetch:http://mcp-fetch:8000*0")) == ["time"]
+
+    registry_file = tmp_path / "servers.yaml"
+    registry_file.write_text(
+        "servers:\n"
+        "  git:\n"
+        "  fetch:\n"
+        "    pool: {max_connections: 5}\n"
+        "  time: http://mcp-time:8000\n"
+    )
+    assert list(load_registry_file(str(registry_file))) == ["time"]
+
+
+def test_replica_selection_prefers_least_outstanding_healthy_replica(monkeypatch):
+    """Test least-outstanding-requests balancing and unhealthy replica skipping."""
+    monkeypatch.setenv("MCP_SERVERS", "git:http://git-1:8000|http://git-2:8000|http://git-3:8000")
+    gw = gateway_app.MCPGateway()
+    server = gw.servers["git"]
+    git_1, git_2, git_3 = server.replicas
+    git_1.outstanding = 2
+    git_3.status = "unhealthy"
+
+    assert gw._acquire_replica(server) is git_2
+    assert gw._acquire_replica(server) is git_2
+    assert gw._acquire_replica(server) in (git_1, git_2)
+    assert git_3.outstanding == 0
+
+
+def test_metrics_endpoint_reports_proxied_requests(gateway):
+    """Test that /metrics exposes per-server request counts and latency."""
+
+    def handler(request):
+        if request.url.path == "/fail":
+            return httpx.Response(500, stream=httpx.ByteStream(b""))
+        return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+    mock_upstream(gateway, handler)
+    asyncio.run(call_gateway("GET", "/mcp/files/read"))
+    asyncio.run(call_gateway("GET", "/mcp/files/fail"))
+    asyncio.run(call_gateway("GET", "/mcp/nope/read"))
+
+    response = asyncio.run(call_gateway("GET", "/metrics"))
+    body = response.text
+
+    assert response.status_code == 200
+    assert 'mcp_gateway_requests_total{method="GET",server="files",status_class="2xx"} 1.0' in body
+    assert 'mcp_gateway_requests_total{method="GET",server="files",status_class="5xx"} 1.0' in body
+    assert 'mcp_gateway_requests_total{method="GET",server="unknown",status_class="4xx"} 1.0' in body
+    assert 'mcp_gateway_upstream_errors_total{kind="status",server="files"} 1.0' in body
+    assert 'mcp_gateway_request_duration_seconds_count{method="GET",server="files",status_class="2xx"} 1.0' in body
+    assert 'mcp_gateway_in_flight_requests{server="files"} 0.0' in body
+    assert 'mcp_gateway_upstream_max_connections{server="files"} 100.0' in body
+
+
+def test_health_scheduler_backs_off_failing_and_stable_servers(gateway):
+    """Test adaptive probe intervals for failing and stable servers."""
+    from scheduler import HealthScheduler, ProbeState
+
+    scheduler = HealthScheduler(gateway, base_interval=60, min_interval=5, max_interval=300, jitter=0)
+
+    assert scheduler.interval_for(ProbeState()) == 60
+    assert [scheduler.interval_for(ProbeState(consecutive_failures=n)) for n in (1, 2, 3, 5)] == [5, 10, 20, 60]
+    assert scheduler.interval_for(ProbeState(consecutive_successes=4)) == 120
+    assert scheduler.interval_for(ProbeState(consecutive_successes=50)) == 300
+
+
+def test_health_scheduler_rediscovers_capabilities_only_on_change(gateway):
+    """Test that capabilities are fetched again only when the health fingerprint changes."""
+    health = {"version": "1"}
+    discoveries = []
+
+    def handler(request):
+        if request.url.path == "/health":
+            return httpx.Response(200, json=health)
+        discoveries.append(health["version"])
+        return httpx.Response(200, json={"capabilities": ["read_file"]})
+
+    mock_upstream(gateway, handler)
+
+    async def probe_three_times():
+        await gateway.scheduler.probe_all()
+        await gateway.scheduler.probe_all()
+        health["version"] = "2"
+        await gateway.scheduler.probe_all()
+
+    asyncio.run(probe_three_times())
+
+    assert discoveries == ["1", "2"]
+    assert gateway.servers["files"].capabilities == ["read_file"]
+    assert gateway.scheduler.states["files"].consecutive_successes == 3
+
+
+def test_concurrent_identical_reads_share_one_upstream_call(gateway):
+    """Test that single-flight coalesces concurrent identical GETs."""
+    from singleflight import SingleFlight
+
+    gateway.single_flight = SingleFlight(frozenset({"authorization"}))
+    calls = []
+
+    async def handler(request):
+        calls.append(request.headers.get("authorization"))
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, stream=httpx.ByteStream(b"log"))
+
+    mock_upstream(gateway, handler)
+
+    async def burst():
+        requests = [call_gateway("GET", "/mcp/files/log?b=2&a=1", headers={"authorization": "alice"}) for _ in range(5)]
+        requests.append(call_gateway("GET", "/mcp/files/log?a=1&b=2", headers={"authorization": "bob"}))
+        return await asyncio.gather(*requests)
+
+    responses = asyncio.run(burst())
+
+    assert [r.content for r in responses] == [b"log"] * 6
+    assert sorted(calls) == ["alice", "bob"]
+    assert gateway.single_flight.stats() == {"in_flight": 0, "leaders": 2, "coalesced": 4}
+
+
+def test_large_or_deadline_bound_reads_are_not_shared(gateway):
+    """Test that big bodies stream to the leader and deadline-bound reads bypass single-flight."""
+    from singleflight import SingleFlight
+
+    gateway.single_flight = SingleFlight(frozenset(), max_body_bytes=4)
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, stream=httpx.ByteStream(b"0123456789"))
+
+    mock_upstream(gateway, handler)
+
+    async def burst(headers=None):
+        return await asyncio.gather(*[call_gateway("GET", "/mcp/files/big", headers=headers) for _ in range(3)])
+
+    assert [r.content for r in asyncio.run(burst())] == [b"0123456789"] * 3
+    assert len(calls) == 3
+    assert gateway.servers["files"].replicas[0].outstanding == 0
+
+    gateway.single_flight.max_body_bytes = 1024
+    calls.clear()
+    asyncio.run(burst({"x-request-timeout": "5"}))
+    assert len(calls) == 3
+    assert gateway.single_flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 0}
+
+
+def test_coalesced_read_errors_are_a_bad_gateway(gateway):
+    """Test that a body breaking off while shared answers the leader and waiters with a 502."""
+    from singleflight import SingleFlight
+
+    gateway.single_flight = SingleFlight(frozenset())
+
+    class BrokenStream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            await asyncio.sleep(0.05)
+            yield b"partial"
+            raise httpx.ReadError("connection reset")
+
+    mock_upstream(gateway, lambda request: httpx.Response(200, stream=BrokenStream()))
+
+    async def burst():
+        return await asyncio.gather(*[call_gateway("GET", "/mcp/files/log") for _ in range(3)])
+
+    assert [r.status_code for r in asyncio.run(burst())] == [502] * 3
+    assert gateway.single_flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 2}
+    assert gateway.servers["files"].replicas[0].outstanding == 0
+
+
+def test_batch_runs_items_concurrently_and_keeps_order(gateway, monkeypatch):
+    """Test that /mcp/batch returns one ordered result per item."""
+
+    async def handler(request):
+        if request.url.path == "/slow":
+            await asyncio.sleep(1)
+        if request.url.path == "/missing":
+            return httpx.Response(404)
+        return httpx.Response(200, json={"path": request.url.path, "query": dict(request.url.params)})
+
+    mock_upstream(gateway, handler)
+    batch = {
+        "items": [
+            {"server": "files", "path": "read", "params": {"name": "a"}},
+            {"server": "files", "path": "missing"},
+            {"server": "nope", "path": "read"},
+            {"server": "files", "path": "slow"},
+        ],
+        "timeout": 0.2,
+    }
+
+    response = asyncio.run(call_gateway("POST", "/mcp/batch", json=batch))
+    results = response.json()["results"]
+
+    assert [r["status"] for r in results] == [200, 404, 404, 504]
+    assert results[0]["result"] == {"path": "/read", "query": {"name": "a"}}
+    assert response.json()["succeeded"] == 1
+
+    # Each item is measured under its own server, the batch itself isn't
+    metrics = asyncio.run(call_gateway("GET", "/metrics")).text
+    for server, status in (("files", "2xx"), ("files", "4xx"), ("unknown", "4xx"), ("files", "5xx")):
+        assert f'mcp_gateway_requests_total{{method="GET",server="{server}",status_class="{status}"}} 1.0' in metrics
+    assert 'method="POST"' not in metrics
+
+
+def test_batch_streams_ndjson_in_completion_order(gateway):
+    """Test that a streamed batch emits results as items complete."""
+
+    async def handler(request):
+        await asyncio.sleep(0.1 if request.url.path == "/slow" else 0)
+        return httpx.Response(200, json={"path": request.url.path})
+
+    mock_upstream(gateway, handler)
+    batch = {"items": [{"server": "files", "path": "slow"}, {"server": "files", "path": "fast"}], "stream": True}
+
+    response = asyncio.run(call_gateway("POST", "/mcp/batch", json=batch))
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [line["index"] for line in lines] == [1, 0]
+
+
+def test_admission_control_queues_then_sheds():
+    """Test the in-flight limit, the bounded queue and the queue timeout."""
+    from admission import AdmissionController, RequestShed
+
+    async def scenario():
+        admission = AdmissionController("git", max_in_flight=1, max_queue=1, queue_timeout=0.05)
+        await admission.acquire()
+
+        queued = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        assert admission.queue_depth == 1
+
+        with pytest.raises(RequestShed) as full:
+            await admission.acquire()
+        assert full.value.reason == "queue_full"
+
+        admission.release()
+        await queued
+        assert (admission.in_flight, admission.queue_depth) == (1, 0)
+
+        with pytest.raises(RequestShed) as timed_out:
+            await admission.acquire()
+        assert timed_out.value.reason == "queue_timeout"
+
+        admission.release()
+        assert (admission.in_flight, admission.queue_depth) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_overloaded_server_sheds_with_503(monkeypatch):
+    """Test that requests beyond the in-flight limit and queue are rejected fast."""
+    monkeypatch.setenv("MCP_SERVERS", "files:http://files:8000;max_in_flight=1;max_queue=0")
+    gw = gateway_app.MCPGateway()
+    monkeypatch.setattr(gateway_app, "gateway", gw)
+
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+    mock_upstream(gw, handler)
+
+    async def burst():
+        return await asyncio.gather(*(call_gateway("GET", "/mcp/files/read") for _ in range(3)))
+
+    statuses = sorted(r.status_code for r in asyncio.run(burst()))
+
+    assert statuses == [200, 503, 503]
+    assert gw.admission["files"].in_flight == 0
+    metrics = asyncio.run(call_gateway("GET", "/metrics")).text
+    assert 'mcp_gateway_shed_requests_total{reason="queue_full",server="files"} 2.0' in metrics
+
+
+def test_registry_reload_applies_a_diff(tmp_path, monkeypatch):
+    """Test that reloading the registry file keeps unchanged servers intact."""
+    registry_file = tmp_path / "servers.yaml"
+    registry_file.write_text(
+        "servers:\n"
+        "  git: http://mcp-git:8000\n"
+        "  time: http://mcp-time:8000\n"
+        "  fetch:\n"
+        "    url: http://mcp-fetch:8000\n"
+    )
+    monkeypatch.setenv("MCP_SERVERS_FILE", str(registry_file))
+    gw = gateway_app.MCPGateway()
+    monkeypatch.setattr(gateway_app, "gateway", gw)
+    git_client = gw.clients["git"]
+    gw.servers["git"].replicas[0].status = "healthy"
+    time_client = gw.clients["time"]
+
+    registry_file.write_text(
+        "servers:\n"
+        "  git:\n"
+        "    replicas:\n"
+        "      - http://mcp-git:8000\n"
+        "      - {url: 'http://mcp-git-2:8000', weight: 2}\n"
+        "  time:\n"
+        "    url: http://mcp-time:8000\n"
+        "    pool: {max_connections: 5}\n"
+        "  memory: http://mcp-memory:8000\n"
+    )
+    diff = asyncio.run(call_gateway("POST", "/admin/reload")).json()
+
+    assert diff == {"added": ["memory"], "updated": ["git", "time"], "removed": ["fetch"], "unchanged": [], "total": 3}
+    assert gw.clients["git"] is git_client
+    assert gw.clients["time"] is not time_client
+    assert [(r.url, r.weight, r.status) for r in gw.servers["git"].replicas] == [
+        ("http://mcp-git:8000", 1.0, "healthy"),
+        ("http://mcp-git-2:8000", 2.0, "unknown"),
+    ]
+    assert "fetch" not in gw.clients
+    assert "http://mcp-fetch:8000" not in gw.breakers
+
+    diff = asyncio.run(gw.reload())
+    assert diff["unchanged"] == ["git", "time", "memory"]
+
+
+def test_file_store_elects_one_leader_and_shares_its_state(tmp_path, monkeypatch):
+    """Test that only the leader worker probes and followers mirror its results."""
+    from shared_state import FileStore, StateCoordinator
+
+    monkeypatch.setenv("MCP_SERVERS", "files:http://files:8000")
+    leader, follower = gateway_app.MCPGateway(), gateway_app.MCPGateway()
+    probes = []
+
+    def handler(request):
+        probes.append(request.url.path)
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "ok"})
+        return httpx.Response(200, json={"capabilities": ["read_file"]})
+
+    for gw in (leader, follower):
+        mock_upstream(gw, handler)
+        gw.coordinator = StateCoordinator(gw, FileStore(str(tmp_path)))
+
+    async def sync():
+        await leader.coordinator.step()
+        await follower.coordinator.step()
+        await leader.coordinator.store.close()
+        await follower.coordinator.store.close()
+        leader.coordinator._scheduler_task.cancel()
+
+    asyncio.run(sync())
+
+    assert (leader.coordinator.is_leader, follower.coordinator.is_leader) == (True, False)
+    assert probes == ["/health", "/capabilities"]
+    assert follower.servers["files"].status == "healthy"
+    assert follower.servers["files"].replicas[0].status == "healthy"
+    assert follower.servers["files"].capabilities == ["read_file"]
+
+
+def test_tool_calls_route_to_a_healthy_provider(monkeypatch):
+    """Test that the capability index finds providers and skips unhealthy ones."""
+    monkeypatch.setenv("MCP_SERVERS", "git:http://git-a:8000,mirror:http://git-b:8000")
+    gw = gateway_app.MCPGateway()
+    monkeypatch.setattr(gateway_app, "gateway", gw)
+    calls = []
+
+    def handler(request):
+        calls.append((request.url.host, request.url.path, request.content))
+        return httpx.Response(200, stream=httpx.ByteStream(b'{"ok": true}'))
+
+    mock_upstream(gw, handler)
+    gw.update_server_state(gw.servers["git"], "unhealthy", ["git_log", "git_diff"], {})
+    gw.update_server_state(gw.servers["mirror"], "healthy", ["git_log"], {})
+
+    found = asyncio.run(call_gateway("GET", "/capabilities", params={"q": "LOG"})).json()
+    assert found == {"capabilities": {"git_log": ["git", "mirror"]}, "total": 1}
+
+    response = asyncio.run(call_gateway("POST", "/tools/git_log", content=b'{"n": 1}'))
+    assert response.status_code == 200
+    assert response.headers["x-mcp-server"] == "mirror"
+    assert calls == [("git-b", "/tools/git_log", b'{"n": 1}')]
+
+    assert asyncio.run(call_gateway("POST", "/tools/git_diff")).status_code == 503
+    assert asyncio.run(call_gateway("POST", "/tools/missing")).status_code == 404
+
+    metrics = asyncio.run(call_gateway("GET", "/metrics")).text
+    assert 'mcp_gateway_requests_total{method="POST",server="mirror",status_class="2xx"} 1.0' in metrics
+    assert 'mcp_gateway_request_duration_seconds_count{method="POST",server="mirror",status_class="2xx"} 1.0' in metrics
+    assert 'mcp_gateway_requests_total{method="POST",server="unknown",status_class="4xx"} 1.0' in metrics
+    assert 'mcp_gateway_in_flight_requests{server="mirror"} 0.0' in metrics
+
+    gw.update_server_state(gw.servers["mirror"], "healthy", [], {})
+    gw.apply_registry({"mirror": gw.servers["mirror"]})
+    assert gw.capability_index.search() == {}
+
+
+def test_mcp_clients_share_one_initialized_upstream_session(gateway):
+    """Test that client sessions are multiplexed onto a single upstream MCP session."""
+    upstream = []
+
+    def handler(request):
+        message = json.loads(request.content)
+        upstream.append((message.get("method"), request.headers.get("mcp-session-id")))
+        if message["method"] == "initialize":
+            result = {"protocolVersion": "2025-06-18", "capabilities": {"tools": {}}, "serverInfo": {"name": "files"}}
+            return httpx.Response(
+                200, json={"jsonrpc": "2.0", "id": message["id"], "result": result}, headers={"mcp-session-id": "up-1"}
+            )
+        if "id" not in message:
+            return httpx.Response(202)
+        token = message["params"]["_meta"]["progressToken"]
+        events = [
+            {"jsonrpc": "2.0", "method": "notifications/progress", "params": {"progressToken": token, "progress": 1}},
+            {"jsonrpc": "2.0", "id": message["id"], "result": {"content": [], "upstream_id": message["id"]}},
+        ]
+        body = "".join(f"event: message\ndata: {json.dumps(event)}\n\n" for event in events).encode()
+        return httpx.Response(200, stream=httpx.ByteStream(body), headers={"content-type": "text/event-stream"})
+
+    mock_upstream(gateway, handler)
+    accept = {"accept": "application/json, text/event-stream"}
+
+    async def client_session(progress_token):
+        init = await call_gateway("POST", "/mcp/files", headers=accept, json={
+            "jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {},
+        })
+        headers = {**accept, "mcp-session-id": init.headers["mcp-session-id"]}
+        await call_gateway("POST", "/mcp/files", headers=headers, json={
+            "jsonrpc": "2.0", "method": "notifications/initialized",
+        })
+        response = await call_gateway("POST", "/mcp/files", headers=headers, json={
+            "jsonrpc": "2.0", "id": 7, "method": "tools/call",
+            "params": {"name": "read_file", "_meta": {"progressToken": progress_token}},
+        })
+        events = [json.loads(line[5:]) for line in response.text.splitlines() if line.startswith("data:")]
+        return init.json()["result"]["serverInfo"], events
+
+    async def run():
+        return await asyncio.gather(client_session("a"), client_session("b"))
+
+    (info_a, events_a), (_, events_b) = asyncio.run(run())
+
+    assert info_a == {"name": "files"}
+    assert [m for m, _ in upstream].count("initialize") == 1
+    assert all(session == "up-1" for method, session in upstream if method != "initialize")
+    assert events_a[0]["params"]["progressToken"] == "a"
+    assert events_b[0]["params"]["progressToken"] == "b"
+    assert events_a[1]["id"] == events_b[1]["id"] == 7
+    assert events_a[1]["result"]["upstream_id"] != events_b[1]["result"]["upstream_id"]
+    assert len(gateway.sessions.clients) == 2
+    assert gateway.servers["files"].replicas[0].outstanding == 0
+
+    missing = asyncio.run(call_gateway("POST", "/mcp/files", headers={"mcp-session-id": "nope"}, json={
+        "jsonrpc": "2.0", "id": 1, "method": "tools/list",
+    }))
+    assert missing.status_code == 404
+
+
+def test_malformed_initialize_reply_is_a_bad_gateway(gateway):
+    """Test that an initialize reply without result or error is reported, not crashed on."""
+    def handler(request):
+        return httpx.Response(200, json={"jsonrpc": "2.0", "id": 0})
+
+    mock_upstream(gateway, handler)
+    response = asyncio.run(call_gateway("POST", "/mcp/files", json={
+        "jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {},
+    }))
+    assert response.status_code == 502
+    assert "no result" in response.text
+
+
+def test_non_json_upstream_bodies_become_errors(gateway):
+    """Test that HTML error pages and truncated events answer with errors instead of crashing."""
+    replies = {"initialize": httpx.Response(200, text="<html>Bad Gateway</html>")}
+
+    def handler(request):
+        message = json.loads(request.content)
+        if message["method"] == "initialize" and "initialize" not in replies:
+            result = {"protocolVersion": "2025-06-18", "capabilities": {}, "serverInfo": {"name": "files"}}
+            return httpx.Response(200, json={"jsonrpc": "2.0", "id": message["id"], "result": result})
+        if "id" not in message:
+            return httpx.Response(202)
+        return replies[message["method"]]
+
+    mock_upstream(gateway, handler)
+    initialize = {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}}
+    response = asyncio.run(call_gateway("POST", "/mcp/files", json=initialize))
+    assert response.status_code == 502
+    assert "malformed reply" in response.text
+
+    del replies["initialize"]
+    replies["tools/list"] = httpx.Response(
+        200, content=b'data: {"jsonrpc": "2.0", "id"\n\n', headers={"content-type": "text/event-stream"}
+    )
+    session_id = asyncio.run(call_gateway("POST", "/mcp/files", json=initialize)).headers["mcp-session-id"]
+    response = asyncio.run(call_gateway("POST", "/mcp/files", headers={"mcp-session-id": session_id}, json={
+        "jsonrpc": "2.0", "id": 2, "method": "tools/list",
+    }))
+    assert response.json()["id"] == 2
+    assert "malformed" in response.json()["error"]["message"]
+    assert gateway.servers["files"].replicas[0].outstanding == 0
+
+
+def test_responses_are_compressed_unless_already_encoded(gateway):
+    """Test that large bodies are gzipped per client and encoded upstream bodies pass through."""
+    import gzip
+
+    large = json.dumps({"diff": "+" * 4096}).encode()
+    precompressed = gzip.compress(large)
+
+    def handler(request):
+        if request.url.path == "/encoded":
+            assert request.headers["accept-encoding"] == "gzip"
+            headers = {"content-type": "application/json", "content-encoding": "gzip"}
+            return httpx.Response(200, stream=httpx.ByteStream(precompressed), headers=headers)
+        body = large if request.url.path == "/large" else b'{"ok": true}'
+        headers = {"content-type": "application/json", "content-length": str(len(body))}
+        return httpx.Response(200, stream=httpx.ByteStream(body), headers=headers)
+
+    mock_upstream(gateway, handler)
+
+    async def raw(path, accept_encoding):
+        transport = httpx.ASGITransport(app=gateway_app.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+            async with client.stream("GET", path, headers={"accept-encoding": accept_encoding}) as response:
+                return response.headers, b"".join([chunk async for chunk in response.aiter_raw()])
+
+    headers, body = asyncio.run(raw("/mcp/files/large", "gzip"))
+    assert headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in headers["vary"]
+    assert gzip.decompress(body) == large
+
+    headers, body = asyncio.run(raw("/mcp/files/encoded", "gzip"))
+    assert body == precompressed
+
+    headers, body = asyncio.run(raw("/mcp/files/small", "gzip"))
+    assert "content-encoding" not in headers
+    assert body == b'{"ok": true}'
+
+    headers, body = asyncio.run(raw("/mcp/files/large", "identity"))
+    assert "content-encoding" not in headers
+    assert body == large
+
+
+def test_streamed_responses_are_compressed_without_holding_chunks_back():
+    """Test that NDJSON lines are compressed and flushed one by one, and ranges are left alone."""
+    import zlib
+
+    from compression import CompressionMiddleware, CompressionSettings
+
+    async def app(scope, receive, send):
+        status = 206 if scope["path"] == "/range" else 200
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/x-ndjson")]})
+        await send({"type": "http.response.body", "body": b'{"index": 0}\n', "more_body": True})
+        sent.append("first line")
+        await send({"type": "http.response.body", "body": b'{"index": 1}\n', "more_body": False})
+
+    async def call(path):
+        scope = {"type": "http", "method": "POST", "path": path, "headers": [(b"accept-encoding", b"gzip")]}
+        await CompressionMiddleware(app, CompressionSettings(encodings=("gzip",)))(scope, None, record)
+
+    async def record(message):
+        sent.append(message)
+
+    sent = []
+    asyncio.run(call("/mcp/batch"))
+    start, first, marker, last = sent
+    assert (dict(start["headers"])[b"content-encoding"], marker) == (b"gzip", "first line")
+    decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decoder.decompress(first["body"]) == b'{"index": 0}\n'
+    assert decoder.decompress(last["body"]) == b'{"index": 1}\n'
+
+    sent = []
+    asyncio.run(call("/range"))
+    assert sent[1]["body"] == b'{"index": 0}\n'
+
+
+def test_idempotent_calls_retry_within_budget_and_deadline(monkeypatch):
+    """Test that retries move to another replica, respect the budget and carry the deadline."""
+    from retry import RetryPolicy
+
+    monkeypatch.setenv("MCP_SERVERS", "git:http://git-1:8000|http://git-2:8000")
+    gw = gateway_app.MCPGateway()
+    monkeypatch.setattr(gateway_app, "gateway", gw)
+    gw.retry = RetryPolicy(max_retries=2, base_delay=0, budget_ratio=0, budget_min_per_second=0)
+    gw.retry.budget("git").tokens = 1
+    calls = []
+
+    async def handler(request):
+        calls.append((request.method, request.url.host, request.headers.get("x-request-timeout")))
+        if request.url.path == "/slow":
+            await asyncio.sleep(1)
+        if request.url.host == "git-1":
+            return httpx.Response(503, stream=httpx.ByteStream(b""))
+        return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+    mock_upstream(gw, handler)
+    gw.servers["git"].replicas[1].outstanding = 1
+
+    response = asyncio.run(call_gateway("GET", "/mcp/git/log", headers={"x-request-timeout": "5"}))
+    assert response.status_code == 200
+    assert [(method, host) for method, host, _ in calls] == [("GET", "git-1"), ("GET", "git-2")]
+    assert 0 < float(calls[0][2]) <= 5
+
+    # The budget is spent and POST is never retried
+    calls.clear()
+    gw.servers["git"].replicas[1].outstanding = 1
+    assert asyncio.run(call_gateway("GET", "/mcp/git/log")).status_code == 503
+    assert asyncio.run(call_gateway("POST", "/mcp/git/log", content=b"{}")).status_code == 503
+    assert len(calls) == 2
+
+    slow = asyncio.run(call_gateway("GET", "/mcp/git/slow", headers={"x-request-timeout": "0.1"}))
+    assert slow.status_code == 504
+    assert gw.admission["git"].in_flight == 0
+
+
+def test_access_log_is_json_and_keeps_errors_when_sampling(gateway, caplog):
+    """Test that access log lines carry upstream details and errors skip sampling."""
+    from access_log import ACCESS_LOGGER, AccessLogSettings
+
+    def handler(request):
+        return httpx.Response(200, stream=httpx.ByteStream(b"12345"))
+
+    mock_upstream(gateway, handler)
+    with caplog.at_level("INFO", logger=ACCESS_LOGGER):
+        asyncio.run(call_gateway("POST", "/mcp/files/read", content=b"abc"))
+
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert (entry["method"], entry["path"], entry["server"], entry["status"]) == ("POST", "/mcp/files/read", "files", 200)
+    assert (entry["bytes_in"], entry["bytes_out"], entry["attempts"], entry["upstream_calls"]) == (3, 5, 1, 1)
+    assert entry["replica"] == "http://files:8000"
+    assert entry["upstream_ms"] <= entry["duration_ms"]
+
+    settings = AccessLogSettings(sample_rate=0, slow_ms=500)
+    assert settings.reason(200, 10) is None
+    assert settings.reason(502, 10) == "error"
+    assert settings.reason(200, 600) == "slow"
+
+
+def test_batch_access_log_line_covers_every_upstream_call(monkeypatch, caplog):
+    """Test that a batch is logged with all servers it reached and its slowest call."""
+    from access_log import ACCESS_LOGGER
+
+    monkeypatch.setenv("MCP_SERVERS", "files:http://files:8000,slow:http://slow:8000")
+    gw = gateway_app.MCPGateway()
+    monkeypatch.setattr(gateway_app, "gateway", gw)
+
+    async def handler(request):
+        if request.url.host == "slow":
+            await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"ok": True})
+
+    mock_upstream(gw, handler)
+    batch = {"items": [{"server": "slow", "path": "read"}, {"server": "files", "path": "read"}]}
+    with caplog.at_level("INFO", logger=ACCESS_LOGGER):
+        asyncio.run(call_gateway("POST", "/mcp/batch", json=batch))
+
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["server"] is None and entry["replica"] is None
+    assert sorted(entry["servers"]) == ["files", "slow"]
+    assert (entry["upstream_calls"], entry["attempts"]) == (2, 2)
+    assert entry["upstream_ms"] >= 100
+
+
+def test_registry_endpoints_serve_cached_snapshots_with_etags(gateway):
+    """Test that registry reads reuse one snapshot and answer 304 until state changes."""
+    servers = asyncio.run(call_gateway("GET", "/servers"))
+    info = asyncio.run(call_gateway("GET", "/"))
+    files = asyncio.run(call_gateway("GET", "/servers/files"))
+    snapshot = gateway.snapshot
+
+    assert servers.json()["total"] == info.json()["servers"] == 1
+    assert files.json()["replicas"] == [{"url": "http://files:8000", "weight": 1.0, "status": "unknown"}]
+    assert asyncio.run(call_gateway("GET", "/servers/nope")).status_code == 404
+
+    gateway.servers["files"].replicas[0].outstanding = 3
+    etag = servers.headers["etag"]
+    unchanged = asyncio.run(call_gateway("GET", "/servers", headers={"if-none-match": etag}))
+    assert unchanged.status_code == 304
+    assert gateway.snapshot is snapshot
+
+    gateway.update_server_state(gateway.servers["files"], "healthy", ["read_file"], {})
+    changed = asyncio.run(call_gateway("GET", "/servers", headers={"if-none-match": etag}))
+    assert changed.status_code == 200
+    assert changed.json()["servers"]["files"]["capabilities"] == ["read_file"]
+    assert changed.headers["etag"] != etag
+    assert asyncio.run(call_gateway("GET", "/", headers={"if-none-match": info.headers["etag"]})).status_code == 304
+
+
+def test_trace_context_is_continued_upstream_and_spans_exported(gateway, tmp_path):
+    """Test traceparent propagation and the queue, upstream and phase spans."""
+    from tracing import Tracer, TracingMiddleware
+
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    seen = {}
+
+    def handler(request):
+        seen.update(traceparent=request.headers["traceparent"], tracestate=request.headers["tracestate"])
+        return httpx.Response(200, stream=httpx.ByteStream(b"ok"))
+
+    mock_upstream(gateway, handler)
+    tracer = Tracer("file", path=str(tmp_path / "traces.jsonl"))
+
+    async def traced_call():
+        transport = httpx.ASGITransport(app=TracingMiddleware(gateway_app.app, tracer))
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+            headers = {"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01", "tracestate": "vendor=1"}
+            response = await client.get("/mcp/files/read", headers=headers)
+        await tracer.aclose()
+        return response
+
+    assert asyncio.run(traced_call()).status_code == 200
+    spans = {
+        span["name"]: span
+        for line in (tmp_path / "traces.jsonl").read_text().splitlines()
+        for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    }
+
+    server, upstream = spans["GET /mcp/files/read"], spans["upstream GET"]
+    assert {span["traceId"] for span in spans.values()} == {trace_id}
+    assert server["parentSpanId"] == "00f067aa0ba902b7"
+    assert spans["queue"]["parentSpanId"] == upstream["parentSpanId"] == server["spanId"]
+    assert spans["ttfb"]["parentSpanId"] == spans["body"]["parentSpanId"] == upstream["spanId"]
+    assert seen == {"traceparent": f"00-{trace_id}-{upstream['spanId']}-01", "tracestate": "vendor=1"}